@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import BlogPost, AudioTranscription
+from .models import BlogPost, AudioTranscription, TranscriptionCacheEntry, TranscriptSegment, UploadSession
 
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
@@ -10,6 +10,28 @@ class BlogPostAdmin(admin.ModelAdmin):
 
 @admin.register(AudioTranscription)
 class AudioTranscriptionAdmin(admin.ModelAdmin):
-    list_display = ['id', 'audio_file', 'created_at']
+    list_display = ['id', 'audio_file', 'duration', 'audio_format', 'status', 'progress', 'created_at']
+    list_filter = ['status', 'audio_format', 'created_at']
+    readonly_fields = ['job_id', 'content_hash', 'duration', 'sample_rate', 'channels', 'audio_format',
+                       'created_at', 'updated_at', 'transcription']
+
+@admin.register(TranscriptionCacheEntry)
+class TranscriptionCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ['digest', 'transcription', 'file_size', 'hit_count', 'created_at', 'last_hit_at']
     list_filter = ['created_at']
-    readonly_fields = ['created_at', 'transcription']
+    search_fields = ['digest']
+    readonly_fields = ['created_at', 'last_hit_at', 'hit_count']
+
+@admin.register(TranscriptSegment)
+class TranscriptSegmentAdmin(admin.ModelAdmin):
+    list_display = ['transcription', 'position', 'start', 'end', 'speaker']
+    list_filter = ['speaker']
+    search_fields = ['text']
+    raw_id_fields = ['transcription']
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['upload_id', 'file_name', 'received', 'total_size', 'status', 'updated_at']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['upload_id', 'partial_name', 'received', 'created_at', 'updated_at']
+    raw_id_fields = ['transcription']
@@ -1,5 +1,45 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def _serving_requests() -> bool:
+    """
+    True in processes that serve requests: the WSGI/ASGI entry points set
+    DARWIX_SERVER, and runserver is recognised from its command line (the
+    autoreloaded child only). Other management commands, tests, Celery and
+    scripts importing Django get False.
+    """
+    if settings.DARWIX_SERVER:
+        return True
+    if len(sys.argv) < 2 or os.path.basename(sys.argv[0]) != 'manage.py' or sys.argv[1] != 'runserver':
+        return False
+    return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+
 
 class AiFeaturesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai_features'
+
+    def ready(self):
+        # Build the services and their HTTP clients before the first request arrives
+        if settings.SERVICE_WARMUP and _serving_requests():
+            from .services.registry import service_registry
+            service_registry.warmup(settings.SERVICE_WARMUP)
+
+        # Start probing now so readiness has results by the time the load balancer asks
+        if settings.HEALTH_PROBE_ON_STARTUP and _serving_requests():
+            from .services.health_probes import get_health_prober
+            get_health_prober()
+
+        # Pick up the jobs a previous run of the server left pending or processing
+        if settings.TRANSCRIPTION_JOB_STALE_AFTER and _serving_requests():
+            from .services.registry import service_registry
+            service_registry.get('job_queue').start_monitor()
+
+        # Reclaim files left behind by crashed requests and apply audio retention (opt-in)
+        if settings.STORAGE_SWEEP_INTERVAL and _serving_requests():
+            from .services.storage_manager import start_storage_sweeper
+            start_storage_sweeper()
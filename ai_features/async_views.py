@@ -0,0 +1,127 @@
+"""
+Async endpoints for ASGI deployments (darwix_ai.asgi).
+
+These are plain Django async views: DRF 3.14 has no async support, and its
+views would each hold a worker thread for the full Groq/Gemini round trip.
+Title generation awaits Groq on AsyncGroq; work that has no async client
+(Gemini uploads, file and DB I/O) runs on a bounded thread pool so it never
+blocks the event loop.
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+
+from .serializers import TitleSuggestionSerializer
+from .views import get_title_service, transcribe_audio
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_blocking_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_BLOCKING_WORKERS,
+                thread_name_prefix='async-blocking'
+            )
+        return _executor
+
+
+def _call_blocking(func, *args):
+    try:
+        return func(*args)
+    finally:
+        # Executor threads never see request_finished, so release DB connections here
+        close_old_connections()
+
+
+async def run_blocking(func, *args):
+    """Run a blocking call on the bounded executor and await its result."""
+    loop = asyncio.get_running_loop()
+    # Carry the context over so spans in the blocking call count towards this request
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, _call_blocking, func, *args)
+    return await loop.run_in_executor(_get_blocking_executor(), call)
+
+
+def _method_not_allowed(request):
+    response = JsonResponse({
+        'success': False,
+        'error': f'Method "{request.method}" not allowed.'
+    }, status=405)
+    response['Allow'] = 'POST'
+    return response
+
+
+async def async_suggest_titles(request):
+    """
+    Async variant of suggest_titles
+
+    Expected input: {"content": "blog post content here"}
+    Returns: JSON with 3 title suggestions
+    """
+    if request.method != 'POST':
+        return _method_not_allowed(request)
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'error': 'Request body must be JSON'
+        }, status=400)
+
+    serializer = TitleSuggestionSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse({
+            'success': False,
+            'error': 'Invalid input data',
+            'details': serializer.errors
+        }, status=400)
+
+    try:
+        result = await get_title_service().agenerate_title_suggestions(
+            serializer.validated_data['content'],
+            use_cache=not serializer.validated_data['refresh']
+        )
+        if result.get('retry_after') is not None:
+            response = JsonResponse(result, status=503)
+            response['Retry-After'] = str(math.ceil(result['retry_after']))
+            return response
+        return JsonResponse(result, status=200)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Title generation failed: {str(e)}',
+            'suggestions': []
+        }, status=500)
+
+
+async def async_transcribe_audio(request):
+    """
+    Async variant of transcribe_audio
+
+    Same input and responses. The Gemini SDK is blocking, so the upload is
+    handled by transcribe_audio on the bounded executor; the event loop stays
+    free for other requests while it runs.
+    """
+    if request.method != 'POST':
+        return _method_not_allowed(request)
+    return await run_blocking(transcribe_audio, request)
+
+
+# CSRF-exempt like the DRF views (APIView.as_view does the same). Django 4.2's
+# csrf_exempt wraps the view in a sync function that would hide the coroutine,
+# so the flag is set directly.
+async_suggest_titles.csrf_exempt = True
+async_transcribe_audio.csrf_exempt = True
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ai_features.models import BlogPost
+from ai_features.services.title_suggestion_service import TitleSuggestionService
+
+
+class Command(BaseCommand):
+    help = "Generate titles for every stored BlogPost that has none, using batched Groq calls"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help='Posts sent to the batch generator per round (default: 50)')
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Concurrent Groq requests (default: TITLE_BATCH_CONCURRENCY)')
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Stop after this many posts')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Print the chosen titles without saving them')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        service = TitleSuggestionService()
+
+        queryset = BlogPost.objects.filter(title='').order_by('pk')
+        post_ids = list(queryset.values_list('pk', flat=True))
+        if options['limit'] is not None:
+            post_ids = post_ids[:options['limit']]
+
+        self.stdout.write(f"Backfilling titles for {len(post_ids)} posts")
+        updated = failed = 0
+
+        for offset in range(0, len(post_ids), batch_size):
+            posts = list(BlogPost.objects.filter(pk__in=post_ids[offset:offset + batch_size]).order_by('pk'))
+            batch = service.generate_title_suggestions_batch(
+                [post.content for post in posts],
+                max_concurrency=options['concurrency']
+            )
+
+            to_save = []
+            now = timezone.now()
+            for post, result in zip(posts, batch['results']):
+                if result['success'] and result['suggestions']:
+                    post.title = result['suggestions'][0][:200]
+                    post.updated_at = now
+                    to_save.append(post)
+                    self.stdout.write(f"  #{post.pk}: {post.title}")
+                else:
+                    failed += 1
+                    self.stderr.write(f"  #{post.pk}: {result.get('error', 'no suggestions returned')}")
+
+            if to_save and not options['dry_run']:
+                BlogPost.objects.bulk_update(to_save, ['title', 'updated_at'])
+            updated += len(to_save)
+
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {updated} posts, {failed} failed"))
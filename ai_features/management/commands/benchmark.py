@@ -0,0 +1,382 @@
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+ENDPOINTS = ('transcribe', 'suggest-titles', 'blog-posts', 'transcriptions')
+
+
+class FakeGroqClient:
+    """Stands in for groq.Groq: sleeps for the configured latency and returns three fixed titles."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        message = types.SimpleNamespace(content=(
+            "Benchmarking Django Services Under Realistic Load\n"
+            "What Latency Percentiles Tell You About Your API\n"
+            "Measuring Throughput Before It Becomes a Problem"
+        ))
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+class TestClientTransport:
+    """In-process requests through django.test.Client (one client per worker thread)."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = Client()
+        return self._local.client
+
+    def get(self, path, params):
+        return self.client.get(path, params).status_code
+
+    def post_json(self, path, payload):
+        return self.client.post(path, payload, content_type='application/json').status_code
+
+    def post_file(self, path, field, name, data):
+        upload = io.BytesIO(data)
+        upload.name = name
+        return self.client.post(path, {field: upload}).status_code
+
+
+class HttpTransport:
+    """Requests against a running server, e.g. one started with the fake backend and fake_upstream."""
+
+    def __init__(self, base_url):
+        import httpx
+        self.client = httpx.Client(base_url=base_url.rstrip('/'), timeout=300)
+
+    def get(self, path, params):
+        return self.client.get(path, params=params).status_code
+
+    def post_json(self, path, payload):
+        return self.client.post(path, json=payload).status_code
+
+    def post_file(self, path, field, name, data):
+        return self.client.post(path, files={field: (name, data, 'audio/wav')}).status_code
+
+
+def make_wav(seconds, variant, sample_rate=16000):
+    """Mono 16-bit WAV; variant changes the first sample so every upload hashes differently."""
+    frames = bytearray(b'\x00\x01' * int(seconds * sample_rate))
+    frames[0:4] = variant.to_bytes(4, 'little', signed=False)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(bytes(frames))
+    return buffer.getvalue()
+
+
+def make_content(chars, variant):
+    sentence = (
+        "Load testing shows where request time goes: parsing, cleaning, upstream calls and the database. "
+    )
+    text = f"Article {variant}. " + sentence * (chars // len(sentence) + 1)
+    return text[:chars]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[int(fraction * 100) - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main API endpoints with deterministic fake Groq/Gemini backends. "
+        "Reports req/s, p50/p95/p99 latency and peak RSS per endpoint, payload size and "
+        "concurrency level, and writes the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS),
+                            help=f"Comma-separated subset of: {', '.join(ENDPOINTS)}")
+        parser.add_argument('--concurrency', default='1,4,16',
+                            help='Comma-separated concurrency levels (default: 1,4,16)')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Timed requests per scenario (default: 50)')
+        parser.add_argument('--warmup', type=int, default=2,
+                            help='Untimed requests before each scenario (default: 2)')
+        parser.add_argument('--latency', type=float, default=0.05,
+                            help='Simulated Groq/Gemini latency in seconds (default: 0.05)')
+        parser.add_argument('--audio-seconds', default='5,60',
+                            help='Audio payload lengths for /api/transcribe/ (default: 5,60)')
+        parser.add_argument('--content-chars', default='500,8000',
+                            help='Content sizes for /api/suggest-titles/ (default: 500,8000)')
+        parser.add_argument('--page-sizes', default='20,200',
+                            help='page_size values for the list endpoints (default: 20,200)')
+        parser.add_argument('--seed-rows', type=int, default=500,
+                            help='Blog posts and transcriptions created before the list scenarios (default: 500)')
+        parser.add_argument('--base-url', default=None,
+                            help='Drive a running server instead of the in-process test client. The server '
+                                 'must be started with the fakes itself (TRANSCRIPTION_BACKEND=fake, '
+                                 'GROQ_BASE_URL pointing at manage.py fake_upstream); nothing is seeded.')
+        parser.add_argument('--output', default=None,
+                            help='JSON results file (default: benchmark-<timestamp>.json)')
+        parser.add_argument('--compare', default=None,
+                            help='Earlier results file to print req/s and p95 changes against')
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(endpoints) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        self.options = options
+        self.concurrency_levels = self._int_list(options['concurrency'])
+        self.counter = 0
+        self.counter_lock = threading.Lock()
+
+        # Per-request log lines would dominate the measurement
+        logging.getLogger('ai_features').setLevel(logging.WARNING)
+
+        if options['base_url']:
+            self.transport = HttpTransport(options['base_url'])
+            results = self._run_scenarios(endpoints)
+        else:
+            results = self._run_in_process(endpoints)
+
+        report = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'git_commit': self._git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'transport': 'http' if options['base_url'] else 'test_client',
+                'upstream_latency': options['latency'],
+                'requests_per_scenario': options['requests'],
+            },
+            'results': results,
+        }
+        output = options['output'] or time.strftime('benchmark-%Y%m%d-%H%M%S.json')
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {output}"))
+
+        if options['compare']:
+            self._compare(options['compare'], results)
+
+    def _run_in_process(self, endpoints):
+        from ai_features.services.registry import service_registry
+        from ai_features.services.title_suggestion_service import TitleSuggestionService
+        from ai_features.services.transcription_backends import FakeBackend
+        from ai_features.services.transcription_service import AudioTranscriptionService
+
+        workdir = tempfile.mkdtemp(prefix='darwix-benchmark-')
+        # A file database so concurrent workers share it; SQLite's in-memory test DB doesn't handle that well
+        if connection.vendor == 'sqlite':
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(workdir, 'benchmark.sqlite3')
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(DEBUG=False, MEDIA_ROOT=os.path.join(workdir, 'media')):
+                service_registry.set('transcription', AudioTranscriptionService(
+                    backend=FakeBackend(latency=self.options['latency'])
+                ))
+                title_service = TitleSuggestionService()
+                title_service.groq_client = FakeGroqClient(self.options['latency'])
+                service_registry.set('title', title_service)
+
+                self.transport = TestClientTransport()
+                if {'blog-posts', 'transcriptions'} & set(endpoints):
+                    self._seed(self.options['seed_rows'])
+                return self._run_scenarios(endpoints)
+        finally:
+            # Drop the fakes (and whatever was built around them) so later use builds the real services
+            service_registry.reset()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _seed(self, rows):
+        from ai_features.models import AudioTranscription, BlogPost
+        from ai_features.services.segment_store import compact_result, store_segments
+
+        BlogPost.objects.bulk_create(
+            [BlogPost(title=f"Seeded post {i}", content=make_content(2000, i)) for i in range(rows)],
+            batch_size=500
+        )
+        result = {
+            'success': True,
+            'language': 'auto-detected',
+            'full_text': '',
+            'segments': [
+                {'start': i * 5.0, 'end': i * 5.0 + 5, 'text': f"Seeded segment {i} of a benchmark call.",
+                 'speaker': f"SPEAKER_{i % 2:02d}", 'confidence': 1.0}
+                for i in range(20)
+            ],
+            'speakers_count': 2,
+            'duration': 100.0,
+        }
+        stored, segments = compact_result(result)
+        records = AudioTranscription.objects.bulk_create(
+            [AudioTranscription(audio_file=f"audio/seed_{i}.wav", transcription=stored, progress=100) for i in range(rows)],
+            batch_size=500
+        )
+        for record in records:
+            store_segments(record.pk, segments)
+
+    def _scenarios(self, endpoints):
+        transport = self.transport
+        for endpoint in endpoints:
+            if endpoint == 'transcribe':
+                for seconds in self._float_list(self.options['audio_seconds']):
+                    yield endpoint, f"{seconds:g}s audio", lambda seconds=seconds: transport.post_file(
+                        '/api/transcribe/?async=0', 'audio_file', 'benchmark.wav', make_wav(seconds, self._next())
+                    )
+            elif endpoint == 'suggest-titles':
+                for chars in self._int_list(self.options['content_chars']):
+                    yield endpoint, f"{chars} chars", lambda chars=chars: transport.post_json(
+                        '/api/suggest-titles/', {'content': make_content(chars, self._next()), 'refresh': True}
+                    )
+            else:
+                path = '/api/blog-posts/' if endpoint == 'blog-posts' else '/api/transcriptions/'
+                for page_size in self._int_list(self.options['page_sizes']):
+                    yield endpoint, f"page_size={page_size}", lambda path=path, page_size=page_size: transport.get(
+                        path, {'page_size': page_size}
+                    )
+
+    def _run_scenarios(self, endpoints):
+        results = []
+        self.stdout.write(
+            f"{'endpoint':<16}{'payload':<16}{'conc':>5}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}"
+            f"{'p99 ms':>9}{'errors':>8}{'rss MB':>9}"
+        )
+        for endpoint, payload, call in self._scenarios(endpoints):
+            for _ in range(self.options['warmup']):
+                call()
+            for concurrency in self.concurrency_levels:
+                result = self._measure(call, concurrency, self.options['requests'])
+                result.update(endpoint=endpoint, payload=payload, concurrency=concurrency)
+                results.append(result)
+                self.stdout.write(
+                    f"{endpoint:<16}{payload:<16}{concurrency:>5}{result['requests_per_second']:>9.1f}"
+                    f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                    f"{result['errors']:>8}{result['peak_rss_mb']:>9.1f}"
+                )
+        return results
+
+    @staticmethod
+    def _measure(call, concurrency, total):
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+
+        def one(_):
+            nonlocal errors
+            started = time.perf_counter()
+            try:
+                status = call()
+            except Exception:
+                status = None
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if status is None or status >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(one, range(total)))
+        wall = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': total,
+            'errors': errors,
+            'wall_seconds': round(wall, 4),
+            'requests_per_second': round(total / wall, 2) if wall else 0.0,
+            'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2),
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+    def _compare(self, path, results):
+        with open(path) as f:
+            previous = {
+                (r['endpoint'], r['payload'], r['concurrency']): r for r in json.load(f)['results']
+            }
+        self.stdout.write(f"\nCompared with {path}:")
+        matched = 0
+        for result in results:
+            before = previous.get((result['endpoint'], result['payload'], result['concurrency']))
+            if before is None:
+                continue
+            matched += 1
+            self.stdout.write(
+                f"{result['endpoint']:<16}{result['payload']:<16}{result['concurrency']:>5}"
+                f"  req/s {self._delta(before['requests_per_second'], result['requests_per_second'])}"
+                f"  p95 {self._delta(before['p95_ms'], result['p95_ms'])}"
+            )
+        if not matched:
+            self.stdout.write("  no scenarios in common (same endpoints, payloads and concurrency levels needed)")
+
+    @staticmethod
+    def _delta(before, after):
+        if not before:
+            return f"{after:.1f}"
+        return f"{before:.1f} -> {after:.1f} ({(after - before) / before * 100:+.1f}%)"
+
+    def _next(self):
+        with self.counter_lock:
+            self.counter += 1
+            return self.counter
+
+    @staticmethod
+    def _int_list(value):
+        return [int(v) for v in value.split(',') if v.strip()]
+
+    @staticmethod
+    def _float_list(value):
+        return [float(v) for v in value.split(',') if v.strip()]
+
+    @staticmethod
+    def _git_commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                cwd=settings.BASE_DIR, timeout=5
+            ).stdout.strip() or None
+        except Exception:
+            return None
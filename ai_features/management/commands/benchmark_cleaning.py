@@ -0,0 +1,78 @@
+import random
+import re
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai_features.services.text_cleaning import clean_content
+
+WORDS = (
+    "the launch went well but churn is still the number one risk for next quarter so "
+    "support needs new scripts café naïve résumé approx. don't it's \"quoted\" well-known"
+).split()
+NOISE = ("#growth", "@team", "<b>", "</b>", "(see below)", "$5", "50%", "😀", "🚀", "*", "—", "https://example.com/a?b=c")
+SEPARATORS = (" ", " ", " ", "  ", "\n", "\n\n", "\t", " \n ")
+
+
+def legacy_clean(content, max_chars):
+    """
+    The cleaner TitleSuggestionService used before text_cleaning: two
+    whole-input substitutions, then a cut at the limit.
+    """
+    content = re.sub(r'\s+', ' ', content)
+    content = re.sub(r'[^\w\s.,!?’\'":-]', '', content)
+    if len(content) > max_chars:
+        content = content[:max_chars]
+    return content.strip()
+
+
+def synthetic_post(size, seed=0):
+    """About `size` characters of post-like text with markup, emoji and ragged whitespace."""
+    rng = random.Random(seed)
+    parts, length = [], 0
+    while length < size:
+        word = rng.choice(NOISE) if rng.random() < 0.1 else rng.choice(WORDS)
+        separator = rng.choice(SEPARATORS)
+        if rng.random() < 0.08:
+            word += '.'
+        parts.append(word + separator)
+        length += len(word) + len(separator)
+    return ''.join(parts)[:size]
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark the title content cleaner on large synthetic posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1024',
+                            help='Comma-separated input sizes in KB (default: 10,100,1024)')
+        parser.add_argument('--max-chars', type=int, default=settings.TITLE_MAX_CONTENT_LENGTH,
+                            help='Cleaning limit (default: TITLE_MAX_CONTENT_LENGTH)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per cleaner; the best is reported (default: 5)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        repeat = max(1, options['repeat'])
+        max_chars = options['max_chars']
+        cleaners = {
+            'legacy': lambda text: legacy_clean(text, max_chars),
+            'full': lambda text: clean_content(text),
+            'limited': lambda text: clean_content(text, max_chars),
+        }
+
+        self.stdout.write(f"max_chars={max_chars}")
+        self.stdout.write(f"{'KB':>6}  {'cleaner':<8} {'best ms':>9} {'MB/s':>9} {'output':>9}")
+        for size_kb in (int(s) for s in options['sizes'].split(',') if s.strip()):
+            text = synthetic_post(size_kb * 1024, options['seed'])
+            for name, clean in cleaners.items():
+                best = float('inf')
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    output = clean(text)
+                    best = min(best, time.perf_counter() - started)
+                self.stdout.write(
+                    f"{size_kb:>6}  {name:<8} {best * 1000:>9.2f} "
+                    f"{len(text.encode('utf-8')) / best / 2 ** 20:>9.1f} {len(output):>9}"
+                )
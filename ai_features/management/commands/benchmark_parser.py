@@ -0,0 +1,124 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from ai_features.services.audio_chunking import format_timestamp
+from ai_features.services.transcript_parser import parse_json_transcript, parse_transcript
+
+WORDS = (
+    "so the quarterly numbers look good but we need to revisit churn before the next "
+    "release and make sure support has the new scripts ready for launch week okay"
+).split()
+
+
+def legacy_parse(full_text):
+    """
+    The line parser GeminiBackend used before transcript_parser (without its
+    per-line warning log), kept here as the baseline.
+    """
+    segments = []
+    speaker_labels = set()
+    for line in full_text.split('\n'):
+        line = line.strip()
+        if line.startswith('[') and ']' in line and ':' in line:
+            try:
+                time_speaker_part, text_part = line.split(':', 1)
+                time_range_str = time_speaker_part[1:time_speaker_part.find(']')]
+                start_str, end_str = time_range_str.split(' - ')
+                start_time = sum(float(x) * 60 ** i for i, x in enumerate(reversed(start_str.split(':'))))
+                end_time = sum(float(x) * 60 ** i for i, x in enumerate(reversed(end_str.split(':'))))
+                speaker = time_speaker_part[time_speaker_part.find(']') + 2:].strip()
+                segments.append({"start": start_time, "end": end_time, "text": text_part.strip(),
+                                 "speaker": speaker, "confidence": 1.0})
+                speaker_labels.add(speaker)
+            except Exception:
+                segments.append({"start": 0, "end": 0, "text": line, "speaker": "UNKNOWN", "confidence": 0.0})
+    return segments, len(speaker_labels)
+
+
+def _short(seconds):
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def _line(start, end, speaker, text, style):
+    """One transcript line in the given style ('canonical' or any of the drifted formats)."""
+    if style == 'canonical':
+        return f"[{format_timestamp(start)} - {format_timestamp(end)}] {speaker}: {text}"
+    if style == 'short':
+        return f"[{_short(start)} - {_short(end)}] {speaker}: {text}"
+    if style == 'bold':
+        return f"**[{format_timestamp(start)} - {format_timestamp(end)}] {speaker}:** {text}"
+    if style == 'dash':
+        return f"- ({_short(start)}–{_short(end)}) **{speaker}**: {text}"
+    if style == 'comma':
+        return f"[{format_timestamp(start).replace('.', ',')} to {format_timestamp(end).replace('.', ',')}] {speaker}: {text}"
+    if style == 'single':
+        return f"[{format_timestamp(start)}] {speaker}: {text}"
+    # 'wrapped': the text continues on the next line
+    cut = max(1, len(text) // 2)
+    return f"[{format_timestamp(start)} - {format_timestamp(end)}] {speaker}: {text[:cut]}\n{text[cut:]}"
+
+
+STYLES = ('short', 'bold', 'dash', 'comma', 'single', 'wrapped')
+
+
+def synthetic_transcript(hours, mixed, seed=0):
+    """(text, JSON equivalent, segment count) for `hours` of ~6 second segments from 4 speakers."""
+    rng = random.Random(seed)
+    lines, items = [], []
+    position = 0.0
+    while position < hours * 3600:
+        length = rng.uniform(2.0, 10.0)
+        speaker = f"SPEAKER_{rng.randrange(4):02d}"
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 24)))
+        style = rng.choice(STYLES) if mixed and rng.random() < 0.4 else 'canonical'
+        lines.append(_line(position, position + length, speaker, text, style))
+        items.append({"start": round(position, 3), "end": round(position + length, 3),
+                      "speaker": speaker, "text": text})
+        position += length
+    speakers = sorted({item['speaker'] for item in items})
+    lines.append(f"\nSpeakers: {', '.join(speakers)}")
+    return "\n".join(lines), json.dumps({"segments": items, "speakers": speakers}), len(items)
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark the Gemini transcript parsers on synthetic multi-hour transcripts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', default='1,4',
+                            help='Comma-separated transcript lengths in hours (default: 1,4)')
+        parser.add_argument('--repeat', type=int, default=5,
+                            help='Timed runs per parser; the best is reported (default: 5)')
+        parser.add_argument('--canonical-only', action='store_true',
+                            help='Only emit the requested line format (default mixes in drifted formats)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        repeat = max(1, options['repeat'])
+        parsers = {
+            'legacy': lambda text, payload: legacy_parse(text)[0],
+            'lines': lambda text, payload: parse_transcript(text)[0],
+            'json': lambda text, payload: parse_json_transcript(payload)[0],
+        }
+
+        self.stdout.write(
+            f"{'hours':>5}  {'parser':<7} {'lines':>8} {'best ms':>9} {'lines/s':>11} {'parsed':>8} {'dropped':>8}"
+        )
+        for hours in (float(h) for h in options['hours'].split(',') if h.strip()):
+            text, payload, expected = synthetic_transcript(hours, not options['canonical_only'], options['seed'])
+            line_count = text.count('\n') + 1
+            for name, parse in parsers.items():
+                best = float('inf')
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    segments = parse(text, payload)
+                    best = min(best, time.perf_counter() - started)
+                # Placeholder segments (no usable timestamp) count as dropped
+                parsed = sum(1 for s in segments if s['confidence'] > 0)
+                self.stdout.write(
+                    f"{hours:>5g}  {name:<7} {line_count:>8} {best * 1000:>9.1f} "
+                    f"{line_count / best:>11,.0f} {parsed:>8} {expected - parsed:>8}"
+                )
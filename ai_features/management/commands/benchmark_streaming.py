@@ -0,0 +1,116 @@
+import array
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from ai_features.services.registry import service_registry
+from ai_features.services.transcription_service import AudioTranscriptionService
+from ai_features.services.transcription_backends import FakeBackend
+from ai_features.streaming import websocket_application
+
+
+def synthetic_call(seconds, sample_rate, seed=0):
+    """
+    16-bit mono PCM alternating "utterances" (modulated tones, 1-6s) and
+    pauses (0.3-1.5s) of low noise, plus the utterance boundaries in seconds.
+    """
+    rng = random.Random(seed)
+    samples = array.array('h')
+    utterances = []
+    position = 0.0
+    while position < seconds:
+        length = min(rng.uniform(1.0, 6.0), seconds - position)
+        frequency = rng.uniform(120, 300)
+        count = int(length * sample_rate)
+        offset = len(samples)
+        samples.extend(
+            int(8000 * math.sin(2 * math.pi * frequency * (offset + i) / sample_rate)
+                * (0.6 + 0.4 * math.sin(2 * math.pi * 3 * i / sample_rate)))
+            for i in range(count)
+        )
+        utterances.append((round(position, 2), round(position + length, 2)))
+        position += length
+        pause = rng.uniform(0.3, 1.5)
+        samples.extend(rng.randint(-30, 30) for _ in range(int(pause * sample_rate)))
+        position += pause
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes(), utterances
+
+
+class Command(BaseCommand):
+    help = "Stream a synthetic call through the live transcription WebSocket (in-process) and report latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=30, help='Length of the call (default: 30)')
+        parser.add_argument('--sample-rate', type=int, default=16000)
+        parser.add_argument('--message-ms', type=int, default=100,
+                            help='Audio per WebSocket message in milliseconds (default: 100)')
+        parser.add_argument('--speed', type=float, default=1.0,
+                            help='Send rate relative to real time; 0 sends as fast as possible (default: 1)')
+        parser.add_argument('--latency', type=float, default=None,
+                            help='Use the fake backend with this latency in seconds (default: configured backend)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['latency'] is not None:
+            service_registry.set('transcription', AudioTranscriptionService(FakeBackend(latency=options['latency'])))
+        pcm, utterances = synthetic_call(options['seconds'], options['sample_rate'], options['seed'])
+        messages = asyncio.run(self._stream(pcm, options))
+
+        windows = [m for m in messages if m['type'] in ('segments', 'error') and 'window' in m]
+        for message in windows:
+            if message['type'] == 'segments':
+                self.stdout.write(
+                    f"window {message['window']:>3}  {message['start']:>7.2f}-{message['end']:<7.2f} "
+                    f"{len(message['segments']):>3} segments  {message['latency_ms']:>6} ms"
+                )
+            else:
+                self.stdout.write(f"window {message['window']:>3}  error: {message['error']}")
+        done = next((m for m in messages if m['type'] == 'done'), None)
+        latencies = sorted(m['latency_ms'] for m in windows)
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f"{len(utterances)} utterances -> {len(windows)} windows; "
+                f"latency after window close p50 {p50} ms, p95 {p95} ms, max {latencies[-1]} ms"
+            )
+        if done is None:
+            self.stdout.write(self.style.ERROR(f"Stream did not finish: {messages[-1] if messages else 'no messages'}"))
+
+    async def _stream(self, pcm, options):
+        incoming = asyncio.Queue()
+        messages = []
+        chunk = options['sample_rate'] * 2 * options['message_ms'] // 1000
+        scope = {
+            'type': 'websocket',
+            'path': '/ws/transcribe/',
+            'query_string': f"encoding=pcm_s16le&sample_rate={options['sample_rate']}".encode(),
+        }
+
+        async def receive():
+            return await incoming.get()
+
+        async def send(message):
+            if message['type'] == 'websocket.send':
+                messages.append(json.loads(message['text']))
+
+        async def client():
+            await incoming.put({'type': 'websocket.connect'})
+            started = time.perf_counter()
+            for index, offset in enumerate(range(0, len(pcm), chunk)):
+                if options['speed']:
+                    # Pace the messages like a live microphone
+                    due = started + index * options['message_ms'] / 1000 / options['speed']
+                    await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await incoming.put({'type': 'websocket.receive', 'bytes': pcm[offset:offset + chunk]})
+            await incoming.put({'type': 'websocket.receive', 'text': json.dumps({'type': 'stop'})})
+
+        await asyncio.gather(websocket_application(scope, receive, send), client())
+        return messages
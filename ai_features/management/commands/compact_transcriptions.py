@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ai_features.models import AudioTranscription
+from ai_features.services.segment_store import compact_result, ensure_search_index, store_segments
+
+
+class Command(BaseCommand):
+    help = "Move inline transcription segments into the segment table and (re)build the search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Transcriptions loaded per round (default: 100)')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        # Rows written before segments had their own table still carry them in the JSON
+        pending = list(
+            AudioTranscription.objects
+            .filter(transcription__has_key='segments')
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        self.stdout.write(f"Compacting {len(pending)} transcriptions")
+
+        moved = 0
+        for offset in range(0, len(pending), batch_size):
+            for record in AudioTranscription.objects.filter(pk__in=pending[offset:offset + batch_size]):
+                stored, segments = compact_result(record.transcription)
+                with transaction.atomic():
+                    AudioTranscription.objects.filter(pk=record.pk).update(transcription=stored)
+                    store_segments(record.pk, segments)
+                moved += len(segments)
+
+        if ensure_search_index():
+            self.stdout.write("Segment search index is in place")
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} segments out of {len(pending)} transcriptions"))
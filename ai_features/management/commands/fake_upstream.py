@@ -0,0 +1,151 @@
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+FAKE_TITLES = [
+    "Scaling Async Django Services Without Losing Your Mind",
+    "What Load Testing Taught Us About Upstream Latency",
+    "Designing APIs That Stay Fast When Providers Are Slow",
+]
+
+
+class FakeUpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # load tests open hundreds of connections at once
+
+    def __init__(self, address, latency, jitter, error_rate, verbose):
+        super().__init__(address, FakeGroqHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.verbose = verbose
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    """Answers POST /openai/v1/chat/completions the way Groq does, streaming or not."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        # Model listing, used by the Groq health probe
+        if self.path.rstrip('/') != '/openai/v1/models':
+            return self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+        self._send_json(200, {"object": "list", "data": [{"id": "fake-model", "object": "model"}]})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.path.rstrip('/') != '/openai/v1/chat/completions':
+            return self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return self._send_json(400, {"error": {"message": "Invalid JSON"}})
+
+        number = self.server.count_request()
+        time.sleep(self.server.latency + random.uniform(0, self.server.jitter))
+        if random.random() < self.server.error_rate:
+            return self._send_json(429, {"error": {"message": "Rate limit reached (fake)"}},
+                                   headers={'retry-after': '1'})
+
+        titles = [f"{title} #{number}" for title in FAKE_TITLES]
+        model = payload.get('model', 'fake-model')
+        if payload.get('stream'):
+            self._send_stream(model, "\n".join(titles))
+        else:
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "\n".join(titles)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            })
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model, text):
+        # Close-delimited SSE body, a few characters per chunk like a real token stream
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        for start in range(0, len(text), 8):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": text[start:start + 8]}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a fake Groq chat-completions API for load testing. Run the app with "
+        "GROQ_BASE_URL=http://<host>:<port> (and any GROQ_API_KEY); for transcription "
+        "use TRANSCRIPTION_BACKEND=fake with FAKE_TRANSCRIPTION_LATENCY."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8787)
+        parser.add_argument('--latency', type=float, default=0.5,
+                            help='Seconds to wait before answering each request (default: 0.5)')
+        parser.add_argument('--jitter', type=float, default=0.0,
+                            help='Extra random latency of up to this many seconds')
+        parser.add_argument('--error-rate', type=float, default=0.0,
+                            help='Fraction of requests answered with 429 + retry-after (default: 0)')
+        parser.add_argument('--verbose', action='store_true', help='Log every request')
+
+    def handle(self, *args, **options):
+        server = FakeUpstreamServer(
+            (options['host'], options['port']),
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            verbose=options['verbose']
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake Groq upstream on http://{host}:{port} (latency {options['latency']}s); "
+            f"set GROQ_BASE_URL=http://{host}:{port}"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Served {server.requests} requests")
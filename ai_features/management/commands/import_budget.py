@@ -0,0 +1,98 @@
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# SDKs that must only load on first use (see services/registry.py)
+HEAVY_MODULES = (
+    'google.generativeai', 'groq', 'httpx', 'torch', 'torchaudio', 'whisper',
+    'transformers', 'pyannote', 'librosa', 'soundfile',
+)
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def _scenarios():
+    manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+    # A worker: load the WSGI app and resolve a URL, which imports the URLconf and views
+    worker = (
+        "from darwix_ai.wsgi import application\n"
+        "from django.urls import resolve\n"
+        "resolve('/api/health/')\n"
+    )
+    return {
+        'check': [sys.executable, '-X', 'importtime', manage_py, 'check'],
+        'worker': [sys.executable, '-X', 'importtime', '-c', worker],
+    }
+
+
+def measure(command):
+    """
+    Run `command` with -X importtime. Returns (wall seconds, total import
+    seconds, {module: (cumulative seconds, top_level)}).
+    """
+    # Warmup off: this measures what every process pays before its first request
+    env = dict(os.environ, SERVICE_WARMUP='', PYTHONWARNINGS='ignore')
+    started = time.perf_counter()
+    completed = subprocess.run(command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise CommandError(f"{' '.join(command)} failed:\n{completed.stderr[-2000:]}")
+
+    modules = {}
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        total_us += int(self_us)
+        # Imports triggered by another import are indented under it
+        modules[name] = (int(cumulative_us) / 1e6, len(indent) == 1)
+    return wall, total_us / 1e6, modules
+
+
+class Command(BaseCommand):
+    help = ("Measure import time (python -X importtime) of `manage.py check` and of a worker "
+            "serving its first URL, and fail if over budget or if a heavy SDK is imported")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget-ms', type=float, default=1500,
+                            help='Maximum total import time per scenario in ms (default: 1500)')
+        parser.add_argument('--top', type=int, default=10,
+                            help='Slowest modules to list per scenario (default: 10)')
+        parser.add_argument('--allow', default='',
+                            help='Comma-separated heavy modules that may be imported')
+
+    def handle(self, *args, **options):
+        allowed = {name.strip() for name in options['allow'].split(',') if name.strip()}
+        heavy = [name for name in HEAVY_MODULES if name not in allowed]
+        failures = []
+
+        for scenario, command in _scenarios().items():
+            wall, total, modules = measure(command)
+            self.stdout.write(
+                f"{scenario}: {total * 1000:.0f} ms importing {len(modules)} modules "
+                f"({wall * 1000:.0f} ms wall, budget {options['budget_ms']:.0f} ms)"
+            )
+            # Top-level imports only, so nothing is counted twice
+            slowest = sorted(
+                ((name, cumulative) for name, (cumulative, top_level) in modules.items() if top_level),
+                key=lambda item: item[1], reverse=True
+            )[:options['top']]
+            for name, cumulative in slowest:
+                self.stdout.write(f"  {cumulative * 1000:8.1f} ms  {name}")
+
+            if total * 1000 > options['budget_ms']:
+                failures.append(f"{scenario} imports take {total * 1000:.0f} ms (budget {options['budget_ms']:.0f} ms)")
+            loaded = [name for name in heavy if name in modules]
+            if loaded:
+                failures.append(f"{scenario} imports {', '.join(loaded)} at startup")
+
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Import time within budget"))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+
+from ai_features.services.storage_manager import AudioStorageManager
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+class Command(BaseCommand):
+    help = "Report media storage usage and reclaim space from orphaned, expired and duplicate audio"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reclaim', action='store_true',
+                            help='Delete what the report lists as reclaimable (default: report only)')
+        parser.add_argument('--dedupe', action='store_true',
+                            help='Also move audio stored before content addressing to content-addressed names, '
+                                 'deleting duplicate copies')
+        parser.add_argument('--retention-days', type=int, default=None,
+                            help='Delete audio of transcriptions older than this (default: AUDIO_RETENTION_DAYS)')
+        parser.add_argument('--grace', type=int, default=None,
+                            help='Leave unreferenced files younger than this many seconds (default: STORAGE_ORPHAN_GRACE)')
+
+    def handle(self, *args, **options):
+        manager = AudioStorageManager(orphan_grace=options['grace'], retention_days=options['retention_days'])
+        dry_run = not options['reclaim']
+
+        self.stdout.write("Usage:")
+        usage = manager.usage()
+        for area, totals in sorted(usage.items()):
+            self.stdout.write(f"  {area:<20} {totals['files']:>8} files {_mb(totals['bytes']):>12}")
+        total = sum(totals['bytes'] for totals in usage.values())
+        self.stdout.write(f"  {'total':<20} {sum(t['files'] for t in usage.values()):>8} files {_mb(total):>12}")
+
+        freed = 0
+        self.stdout.write("Removed:" if not dry_run else "Reclaimable:")
+        for area, totals in manager.sweep(dry_run=dry_run).items():
+            self.stdout.write(f"  {area:<20} {totals['files']:>8} files {_mb(totals['bytes']):>12}")
+            freed += totals['bytes']
+
+        retention = manager.apply_retention(dry_run=dry_run)
+        if manager.retention_days:
+            self.stdout.write(
+                f"  {'retention':<20} {retention['files']:>8} files {_mb(retention['bytes']):>12}"
+                f"  ({retention['transcriptions']} transcriptions older than {manager.retention_days} days)"
+            )
+            freed += retention['bytes']
+
+        # Without --dedupe this only counts what merging duplicates would save
+        merge = options['dedupe'] and not dry_run
+        dedupe = manager.dedupe_existing(dry_run=not merge)
+        self.stdout.write(
+            f"  {'duplicates':<20} {dedupe['duplicates']:>8} files {_mb(dedupe['bytes']):>12}"
+            f"  ({dedupe['moved']} {'moved' if merge else 'to move'} to content-addressed names, "
+            f"{dedupe['missing']} missing)"
+        )
+        if merge or dry_run:
+            freed += dedupe['bytes']
+
+        verb = "Would free" if dry_run else "Freed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {_mb(freed)}"))
+        if dry_run:
+            self.stdout.write("Run with --reclaim to delete (and --dedupe to merge duplicate audio).")
@@ -0,0 +1,166 @@
+"""
+In-process latency metrics.
+
+span("name") times a block of code. Every span feeds a per-name histogram
+and, while RequestTimingMiddleware is timing the current request, that
+request's phase breakdown (returned in a Server-Timing header when
+METRICS_RESPONSE_TIMINGS is on). /api/metrics/ renders the histograms in the
+Prometheus text format. Values are per process, so scrape every worker.
+"""
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+# Seconds; wide enough for both sub-millisecond cleaning and multi-minute Gemini jobs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+SPAN_METRIC = 'darwix_span_duration_seconds'
+REQUEST_METRIC = 'darwix_request_duration_seconds'
+
+_METRIC_HELP = {
+    SPAN_METRIC: ('span', 'Time spent in instrumented phases (upload, Gemini, Groq, DB, ...)'),
+    REQUEST_METRIC: ('view', 'Time to produce a response, by URL name'),
+}
+
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    'request_timings', default=None
+)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+            if error:
+                self.errors += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count, self.errors
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, label: str, seconds: float, error: bool = False) -> None:
+        histogram = self._histograms.get((metric, label))
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault((metric, label), Histogram())
+        histogram.observe(seconds, error)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self, metric: str = SPAN_METRIC) -> Dict[str, Dict[str, float]]:
+        """Count/total/mean per label, for JSON consumers (health check, benchmarks)."""
+        result = {}
+        for (name, label), histogram in sorted(self._histograms.items()):
+            if name != metric:
+                continue
+            _, total, count, errors = histogram.snapshot()
+            result[label] = {
+                'count': count,
+                'errors': errors,
+                'total_seconds': round(total, 6),
+                'mean_seconds': round(total / count, 6) if count else 0.0,
+            }
+        return result
+
+    def render_prometheus(self) -> str:
+        lines = []
+        items = sorted(self._histograms.items())
+        for metric, (label_name, help_text) in _METRIC_HELP.items():
+            series = [(label, histogram) for (name, label), histogram in items if name == metric]
+            if not series:
+                continue
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for label, histogram in series:
+                counts, total, count, _ = histogram.snapshot()
+                label_value = _escape_label(label)
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{{label_name}="{label_value}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{label_name}="{label_value}",le="+Inf"}} {count}')
+                lines.append(f'{metric}_sum{{{label_name}="{label_value}"}} {total}')
+                lines.append(f'{metric}_count{{{label_name}="{label_value}"}} {count}')
+
+            errors_metric = metric.replace('_duration_seconds', '_errors_total')
+            lines.append(f"# HELP {errors_metric} Failures counted in {metric}")
+            lines.append(f"# TYPE {errors_metric} counter")
+            for label, histogram in series:
+                lines.append(f'{errors_metric}{{{label_name}="{_escape_label(label)}"}} {histogram.snapshot()[3]}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def record(name: str, seconds: float, error: bool = False) -> None:
+    """Record an already measured phase as if it had run inside span(name)."""
+    if not settings.METRICS_ENABLED:
+        return
+    registry.observe(SPAN_METRIC, name, seconds, error)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class span:
+    """
+    Context manager timing one phase. The measured time is available as
+    .seconds afterwards, even with metrics disabled.
+
+        with span('groq_call'):
+            ...
+    """
+    __slots__ = ('name', 'started', 'seconds')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.started
+        record(self.name, self.seconds, exc_type is not None)
+        return False
+
+
+@contextmanager
+def collect_timings():
+    """Collect the spans run in this context (thread or task) into a dict of name -> seconds."""
+    timings: Dict[str, float] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
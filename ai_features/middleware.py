@@ -0,0 +1,58 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import REQUEST_METRIC, collect_timings, registry
+
+
+class RequestTimingMiddleware:
+    """
+    Times every request into darwix_request_duration_seconds (labelled with the
+    URL name) and collects the spans run while handling it. With
+    METRICS_RESPONSE_TIMINGS on, the breakdown is sent back as a Server-Timing
+    header, which browser dev tools display per request.
+
+    Streaming responses are measured up to the point the stream starts.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with collect_timings() as timings:
+            response = self.get_response(request)
+        self._finish(request, response, time.perf_counter() - started, timings)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        with collect_timings() as timings:
+            response = await self.get_response(request)
+        self._finish(request, response, time.perf_counter() - started, timings)
+        return response
+
+    @staticmethod
+    def _finish(request, response, elapsed, timings):
+        resolver_match = getattr(request, 'resolver_match', None)
+        view = (resolver_match.url_name or resolver_match.view_name) if resolver_match else 'unmatched'
+        registry.observe(REQUEST_METRIC, view, elapsed, error=response.status_code >= 500)
+
+        if settings.METRICS_RESPONSE_TIMINGS:
+            entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+            entries.append(f"total;dur={elapsed * 1000:.1f}")
+            response['Server-Timing'] = ', '.join(entries)
@@ -0,0 +1,123 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AudioTranscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audio_file', models.FileField(upload_to='audio/')),
+                ('transcription', models.JSONField(blank=True, default=dict)),
+                ('content_hash', models.CharField(blank=True, db_index=True, default='', max_length=64)),
+                ('duration', models.FloatField(blank=True, null=True)),
+                ('sample_rate', models.PositiveIntegerField(blank=True, null=True)),
+                ('channels', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('audio_format', models.CharField(blank=True, default='', max_length=16)),
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='completed', max_length=20)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('upload_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('partial_name', models.CharField(max_length=100)),
+                ('total_size', models.BigIntegerField()),
+                ('received', models.BigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('completed', 'Completed')], default='active', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('transcription', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='ai_features.audiotranscription')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TranscriptSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('start', models.FloatField(default=0)),
+                ('end', models.FloatField(default=0)),
+                ('speaker', models.CharField(blank=True, default='', max_length=100)),
+                ('text', models.TextField()),
+                ('confidence', models.FloatField(default=1.0)),
+                ('transcription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='segment_rows', to='ai_features.audiotranscription')),
+            ],
+            options={
+                'ordering': ['transcription', 'position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TranscriptionCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('file_size', models.BigIntegerField(default=0)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+                ('transcription', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cache_entries', to='ai_features.audiotranscription')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BlogPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='audiotranscription',
+            index=models.Index(fields=['-created_at', '-id'], name='transcription_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audiotranscription',
+            index=models.Index(fields=['updated_at'], name='transcription_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadsession',
+            index=models.Index(fields=['status', 'updated_at'], name='upload_status_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transcriptsegment',
+            index=models.Index(fields=['speaker'], name='segment_speaker_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='transcriptsegment',
+            constraint=models.UniqueConstraint(fields=('transcription', 'position'), name='segment_position_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='transcriptioncacheentry',
+            index=models.Index(fields=['created_at'], name='ai_features_created_d2cabc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['-created_at', '-id'], name='blogpost_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['updated_at'], name='blogpost_updated_idx'),
+        ),
+    ]
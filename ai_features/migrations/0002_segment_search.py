@@ -0,0 +1,58 @@
+from django.db import migrations
+
+FTS_TABLE = 'ai_features_segment_fts'
+SEGMENT_TABLE = 'ai_features_transcriptsegment'
+
+# External-content FTS5 index over TranscriptSegment.text, kept in sync by triggers.
+# The rebuild fills it from segments already stored (databases created before this migration).
+CREATE_INDEX = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(text, content='{SEGMENT_TABLE}', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {SEGMENT_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {SEGMENT_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {SEGMENT_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+DROP_INDEX = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+class SQLiteFTS5SQL(migrations.RunSQL):
+    """
+    RunSQL that only runs on SQLite builds with FTS5. Elsewhere the migration
+    is a no-op and segment search falls back to LIKE queries.
+    """
+
+    @staticmethod
+    def _applies(connection):
+        if connection.vendor != 'sqlite':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            return any(option == 'ENABLE_FTS5' for option, in cursor.fetchall())
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if self._applies(schema_editor.connection):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if self._applies(schema_editor.connection):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_features', '0001_initial'),
+    ]
+
+    operations = [
+        SQLiteFTS5SQL(CREATE_INDEX, reverse_sql=DROP_INDEX),
+    ]
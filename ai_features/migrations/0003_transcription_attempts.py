@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_features', '0002_segment_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audiotranscription',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
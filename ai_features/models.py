@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -7,14 +9,150 @@ class BlogPost(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='blogpost_created_idx'),
+            models.Index(fields=['updated_at'], name='blogpost_updated_idx'),
+        ]
     
     def __str__(self):
         return self.title
 
 class AudioTranscription(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
     audio_file = models.FileField(upload_to='audio/')
-    transcription = models.JSONField()
+    transcription = models.JSONField(default=dict, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)  # sha256 of the upload
+    # Read from the container headers at upload time (services/audio_probe.py); empty if unrecognised
+    duration = models.FloatField(null=True, blank=True)  # seconds
+    sample_rate = models.PositiveIntegerField(null=True, blank=True)
+    channels = models.PositiveSmallIntegerField(null=True, blank=True)
+    audio_format = models.CharField(max_length=16, blank=True, default='')
+    # Background job tracking (synchronous uploads are stored as completed)
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_COMPLETED)
+    progress = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)  # times a worker has started the job
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='transcription_created_idx'),
+            models.Index(fields=['updated_at'], name='transcription_updated_idx'),
+        ]
     
     def __str__(self):
         return f"Transcription {self.id} - {self.created_at}"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_COMPLETED, self.STATUS_FAILED)
+
+    def result_payload(self):
+        """
+        The transcription result as the API returns it. Segments are stored as
+        TranscriptSegment rows rather than inside the JSON, so they are put
+        back here; rows written before that still carry them inline.
+        """
+        payload = dict(self.transcription or {})
+        if 'segments_count' in payload:
+            count = payload.pop('segments_count')
+            payload['segments'] = [segment.as_dict() for segment in self.segment_rows.all()] if count else []
+        return payload
+
+class TranscriptionCacheEntry(models.Model):
+    """
+    Maps the sha256 digest of an uploaded file to the transcription produced
+    for it, so identical re-uploads can skip the Gemini round trip.
+    """
+    digest = models.CharField(max_length=64, unique=True)
+    transcription = models.ForeignKey(AudioTranscription, on_delete=models.CASCADE, related_name='cache_entries')
+    file_size = models.BigIntegerField(default=0)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at'])]
+
+    def __str__(self):
+        return f"Cache {self.digest[:12]} -> Transcription {self.transcription_id}"
+
+class TranscriptSegment(models.Model):
+    """
+    One diarized line of a transcription. Kept out of the result JSON so rows
+    stay small and segments can be indexed and searched individually.
+    """
+    transcription = models.ForeignKey(AudioTranscription, on_delete=models.CASCADE, related_name='segment_rows')
+    position = models.PositiveIntegerField()
+    start = models.FloatField(default=0)
+    end = models.FloatField(default=0)
+    speaker = models.CharField(max_length=100, blank=True, default='')
+    text = models.TextField()
+    confidence = models.FloatField(default=1.0)
+
+    class Meta:
+        ordering = ['transcription', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['transcription', 'position'], name='segment_position_unique'),
+        ]
+        indexes = [models.Index(fields=['speaker'], name='segment_speaker_idx')]
+
+    def __str__(self):
+        return f"Transcription {self.transcription_id} segment {self.position}"
+
+    def as_dict(self):
+        return {
+            "start": self.start,
+            "end": self.end,
+            "text": self.text,
+            "speaker": self.speaker,
+            "confidence": self.confidence,
+        }
+
+class UploadSession(models.Model):
+    """
+    A resumable upload in progress. Chunks are appended to a partial file in
+    storage until `received` reaches `total_size`; finalizing moves it to
+    audio/ and hands it to transcription.
+    """
+    STATUS_ACTIVE = 'active'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Active'),
+        (STATUS_COMPLETED, 'Completed'),
+    ]
+
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    file_name = models.CharField(max_length=255)
+    partial_name = models.CharField(max_length=100)  # storage name of the partial file
+    total_size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    transcription = models.ForeignKey(AudioTranscription, on_delete=models.SET_NULL, null=True, blank=True,
+                                      related_name='upload_sessions')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'updated_at'], name='upload_status_updated_idx')]
+
+    def __str__(self):
+        return f"Upload {self.upload_id} ({self.received}/{self.total_size} bytes)"
+
+    @property
+    def is_complete(self):
+        return self.received >= self.total_size
@@ -0,0 +1,70 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.http import parse_etags, quote_etag
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (created_at, id), newest first. Backed by the
+    composite indexes on both list models, so every page is an index range
+    scan no matter how deep the client pages.
+    """
+
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = settings.LIST_PAGE_SIZE
+        self.max_page_size = settings.LIST_MAX_PAGE_SIZE
+
+
+def select_fields(request, serializer_class, heavy_fields):
+    """
+    Resolve the serializer fields for a list request.
+
+    ?fields=a,b picks fields explicitly, ?summary=1 drops the heavy ones.
+    Returns (fields, deferred_model_fields); raises ValueError on unknown names.
+    """
+    all_fields = list(serializer_class.Meta.fields)
+    requested = request.query_params.get('fields')
+    if requested:
+        fields = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in fields if name not in all_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(all_fields)}")
+    elif str(request.query_params.get('summary', '')).lower() in ('1', 'true', 'yes'):
+        fields = [name for name in all_fields if name not in heavy_fields]
+    else:
+        fields = all_fields
+    return fields, [name for name in heavy_fields if name not in fields]
+
+
+def list_etag(request, queryset):
+    """
+    Weak ETag for a list response: row count and newest updated_at of the
+    table plus the full request path (cursor, page size and field selection).
+    Both aggregates are answered from indexes, so it is much cheaper than
+    rendering the page. Weak because it tracks the data, not the bytes: the
+    JSON and browsable API renderings share it.
+    """
+    state = queryset.aggregate(count=Count('id'), latest=Max('updated_at'))
+    digest = hashlib.sha1(
+        f"{state['count']}|{state['latest']}|{request.get_full_path()}".encode('utf-8')
+    ).hexdigest()
+    return 'W/' + quote_etag(digest)
+
+
+def etag_matches(request, etag):
+    """If-None-Match check, using the weak comparison RFC 9110 prescribes for it."""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or _opaque(etag) in {_opaque(tag) for tag in etags}
+
+
+def _opaque(etag):
+    return etag[2:] if etag.startswith('W/') else etag
@@ -1,16 +1,47 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import BlogPost, AudioTranscription
 
-class BlogPostSerializer(serializers.ModelSerializer):
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer that accepts fields=[...] to render only a subset of Meta.fields."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class BlogPostSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = BlogPost
         fields = ['id', 'title', 'content', 'author', 'created_at', 'updated_at']
 
 class TitleSuggestionSerializer(serializers.Serializer):
-    content = serializers.CharField(max_length=10000)
+    content = serializers.CharField(max_length=settings.TITLE_MAX_CONTENT_LENGTH)
+    refresh = serializers.BooleanField(required=False, default=False)  # bypass the title cache
+
+class UploadInitSerializer(serializers.Serializer):
+    file_name = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)  # total bytes the client will send
+
+class TitleSuggestionBatchSerializer(serializers.Serializer):
+    contents = serializers.ListField(
+        child=serializers.CharField(max_length=settings.TITLE_MAX_CONTENT_LENGTH),
+        min_length=1,
+        max_length=settings.TITLE_BATCH_MAX_ITEMS
+    )
+    max_concurrency = serializers.IntegerField(required=False, min_value=1, max_value=settings.TITLE_BATCH_MAX_CONCURRENCY)
+    refresh = serializers.BooleanField(required=False, default=False)
+
+class AudioTranscriptionSerializer(DynamicFieldsModelSerializer):
+    transcription = serializers.SerializerMethodField()
 
-class AudioTranscriptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = AudioTranscription
-        fields = ['id', 'audio_file', 'transcription', 'created_at']
-        read_only_fields = ['transcription']
+        fields = ['id', 'job_id', 'audio_file', 'duration', 'sample_rate', 'channels', 'audio_format',
+                  'status', 'progress', 'error', 'transcription', 'created_at', 'updated_at']
+        read_only_fields = ['job_id', 'duration', 'sample_rate', 'channels', 'audio_format', 'status', 'progress', 'error']
+
+    def get_transcription(self, obj):
+        return obj.result_payload()
@@ -0,0 +1,226 @@
+import difflib
+import os
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class AudioChunk:
+    index: int
+    path: str
+    start: float  # seconds, relative to the full recording
+    end: float
+
+
+def split_audio(audio_file_path: str, output_dir: str, chunk_seconds: float,
+                overlap_seconds: float) -> List[AudioChunk]:
+    """
+    Split a recording into overlapping windows written as FLAC files.
+
+    soundfile reads the windows straight from disk (WAV/FLAC/OGG and, with a
+    recent libsndfile, MP3); anything it cannot open is decoded once with
+    librosa and sliced in memory.
+    """
+    import soundfile as sf
+
+    if overlap_seconds >= chunk_seconds:
+        raise ValueError("Chunk overlap must be shorter than the chunk length")
+
+    os.makedirs(output_dir, exist_ok=True)
+    base_name = os.path.splitext(os.path.basename(audio_file_path))[0]
+    chunks = []
+
+    def chunk_path(index):
+        return os.path.join(output_dir, f"{base_name}_chunk{index:03d}.flac")
+
+    try:
+        with sf.SoundFile(audio_file_path) as source:
+            sample_rate = source.samplerate
+            total_frames = source.frames
+            for index, (start_frame, end_frame) in enumerate(
+                    _windows(total_frames, sample_rate, chunk_seconds, overlap_seconds)):
+                source.seek(start_frame)
+                data = source.read(end_frame - start_frame, dtype='int16')
+                path = chunk_path(index)
+                sf.write(path, data, sample_rate, format='FLAC', subtype='PCM_16')
+                chunks.append(AudioChunk(index, path, start_frame / sample_rate, end_frame / sample_rate))
+        return chunks
+    except RuntimeError:
+        # libsndfile can't decode this container (m4a/aac/wma); fall back to librosa
+        pass
+
+    import librosa
+    samples, sample_rate = librosa.load(audio_file_path, sr=None, mono=True)
+    for index, (start_frame, end_frame) in enumerate(
+            _windows(len(samples), sample_rate, chunk_seconds, overlap_seconds)):
+        path = chunk_path(index)
+        sf.write(path, samples[start_frame:end_frame], sample_rate, format='FLAC', subtype='PCM_16')
+        chunks.append(AudioChunk(index, path, start_frame / sample_rate, end_frame / sample_rate))
+    return chunks
+
+
+def _windows(total_frames: int, sample_rate: int, chunk_seconds: float, overlap_seconds: float):
+    chunk_frames = int(chunk_seconds * sample_rate)
+    step_frames = int((chunk_seconds - overlap_seconds) * sample_rate)
+    start = 0
+    while start < total_frames:
+        end = min(start + chunk_frames, total_frames)
+        yield start, end
+        if end >= total_frames:
+            break
+        start += step_frames
+
+
+def merge_chunk_results(chunks: List[AudioChunk], results: List[Dict[str, Any]],
+                        overlap_seconds: float) -> Dict[str, Any]:
+    """
+    Stitch per-chunk transcriptions into one result.
+
+    Segment times are shifted to global time. Segments both neighbouring chunks
+    heard in the overlap are matched by time and text and kept once; the rest
+    of the overlap is split in half by segment midpoint, so nothing is
+    duplicated or dropped. The matched pairs also drive speaker reconciliation:
+    each local label is mapped to the global label it agrees with most.
+    """
+    merged: List[Dict[str, Any]] = []
+    previous: List[Dict[str, Any]] = []  # globally labelled segments of the previous chunk
+    global_labels: List[str] = []
+
+    for position, (chunk, result) in enumerate(zip(chunks, results)):
+        local_segments = []
+        for segment in result.get("segments", []):
+            shifted = dict(segment)
+            shifted["start"] = round(chunk.start + float(segment.get("start", 0)), 3)
+            shifted["end"] = round(chunk.start + float(segment.get("end", 0)), 3)
+            local_segments.append(shifted)
+
+        pairs = _match_overlap(previous, local_segments, chunk.start)
+        mapping = _reconcile_speakers(previous, local_segments, pairs, global_labels)
+        for segment in local_segments:
+            segment["speaker"] = mapping.get(segment.get("speaker"), segment.get("speaker"))
+            if segment["speaker"] not in global_labels:
+                global_labels.append(segment["speaker"])
+
+        owned_from = chunk.start + overlap_seconds / 2 if position > 0 else float('-inf')
+        owned_to = chunk.end - overlap_seconds / 2 if position < len(chunks) - 1 else float('inf')
+        matched = {id(current): earlier for earlier, current in pairs}
+        for segment in local_segments:
+            earlier = matched.get(id(segment))
+            if earlier is not None:
+                # Both chunks heard this segment: keep one copy, preferring the more complete one
+                kept = next((i for i, s in enumerate(merged) if s is earlier), None)
+                if kept is None:
+                    merged.append(segment)
+                elif segment["end"] - segment["start"] > earlier["end"] - earlier["start"]:
+                    merged[kept] = segment
+                continue
+            midpoint = (segment["start"] + segment["end"]) / 2
+            if owned_from <= midpoint < owned_to:
+                merged.append(segment)
+
+        previous = local_segments
+
+    merged.sort(key=lambda s: (s["start"], s["end"]))
+    speakers = sorted({s["speaker"] for s in merged if s.get("speaker") and s["speaker"] != "UNKNOWN"})
+    full_text = "\n".join(
+        f"[{format_timestamp(s['start'])} - {format_timestamp(s['end'])}] {s['speaker']}: {s['text']}"
+        for s in merged
+    )
+    if speakers:
+        full_text += f"\n\nSpeakers: {', '.join(speakers)}"
+
+    return {
+        "success": True,
+        "language": next((r.get("language") for r in results if r.get("language")), "auto-detected"),
+        "full_text": full_text,
+        "segments": merged,
+        "speakers_count": len(speakers),
+        "duration": chunks[-1].end if chunks else 0,
+        "chunks": len(chunks)
+    }
+
+
+def _match_overlap(previous: List[Dict[str, Any]], current: List[Dict[str, Any]],
+                   overlap_start: float) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Pair segments heard by both neighbouring chunks (overlapping in time, similar text)."""
+    pairs = []
+    earlier = [s for s in previous if s["end"] > overlap_start]
+    if not earlier:
+        return pairs
+    overlap_end = max(s["end"] for s in earlier)
+    used = set()
+    for segment in current:
+        if segment["start"] >= overlap_end:
+            break
+        best, best_score = None, 0.5
+        for candidate in earlier:
+            if id(candidate) in used:
+                continue
+            if candidate["end"] <= segment["start"] or candidate["start"] >= segment["end"]:
+                continue
+            score = difflib.SequenceMatcher(
+                None, candidate.get("text", "").lower(), segment.get("text", "").lower()
+            ).ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is not None:
+            used.add(id(best))
+            pairs.append((best, segment))
+    return pairs
+
+
+def _reconcile_speakers(previous: List[Dict[str, Any]], current: List[Dict[str, Any]],
+                        pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                        global_labels: List[str]) -> Dict[str, str]:
+    votes: Dict[str, Counter] = defaultdict(Counter)
+    for earlier, segment in pairs:
+        votes[segment.get("speaker")][earlier["speaker"]] += 1
+
+    # Strongest agreements first, one global label per local label
+    mapping: Dict[str, str] = {}
+    taken = set()
+    ranked = sorted(
+        ((count, local, target) for local, counter in votes.items() for target, count in counter.items()),
+        reverse=True
+    )
+    for count, local, target in ranked:
+        if local in mapping or target in taken:
+            continue
+        mapping[local] = target
+        taken.add(target)
+
+    # Unmatched local speakers take over the previous chunk's unmatched speakers in
+    # order of appearance (e.g. two-party calls where only one side spoke in the overlap)
+    unmatched = [label for label in dict.fromkeys(s.get("speaker") for s in current) if label not in mapping]
+    if mapping:
+        leftovers = [label for label in dict.fromkeys(s["speaker"] for s in previous) if label not in taken]
+        for local, target in zip(list(unmatched), leftovers):
+            mapping[local] = target
+            taken.add(target)
+            unmatched.remove(local)
+
+    # Anything else keeps its name unless another local speaker already claimed it
+    for local in unmatched:
+        if local not in taken:
+            mapping[local] = local
+            taken.add(local)
+        else:
+            new_label = _next_label(global_labels, taken)
+            mapping[local] = new_label
+            taken.add(new_label)
+    return mapping
+
+
+def _next_label(global_labels: List[str], taken) -> str:
+    index = len(global_labels)
+    while f"SPEAKER_{index:02d}" in global_labels or f"SPEAKER_{index:02d}" in taken:
+        index += 1
+    return f"SPEAKER_{index:02d}"
+
+
+def format_timestamp(seconds: Optional[float]) -> str:
+    seconds = float(seconds or 0)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
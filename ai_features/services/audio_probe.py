@@ -0,0 +1,334 @@
+"""
+Audio metadata from container headers.
+
+probe_audio() reads the few header bytes each format needs (plus the last
+Ogg page, or the top-level MP4 atoms) to get duration, sample rate and
+channels, without decoding audio or importing soundfile. Supported: WAV,
+FLAC, Ogg Vorbis/Opus, MP3 (Xing/Info/VBRI or CBR estimate), MP4/M4A
+(mvhd + mp4a), raw AAC (ADTS, estimated) and WMA (ASF). Anything else, and
+headers that leave the length unknown (streamed FLAC, fragmented MP4),
+returns None and callers fall back to a decoder: decoded_duration().
+"""
+import os
+import struct
+from dataclasses import asdict, dataclass
+from typing import Any, BinaryIO, Dict, Optional
+
+HEADER_BYTES = 64 * 1024
+OGG_TAIL_BYTES = 64 * 1024
+# Padding tolerated between the ID3 tag (or file start) and the first MPEG frame
+MAX_SYNC_SEARCH = 4096
+# Frames per read when decoded_duration() counts a file's samples
+DECODE_BLOCK_FRAMES = 64 * 1024
+
+
+@dataclass
+class AudioInfo:
+    format: str
+    duration: float  # seconds
+    sample_rate: int
+    channels: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def probe_audio(path: str) -> Optional[AudioInfo]:
+    """Header-only metadata for the file at `path`, or None if the format isn't recognised."""
+    try:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            head = f.read(HEADER_BYTES)
+            for probe in (_probe_wav, _probe_flac, _probe_ogg, _probe_mp4, _probe_asf, _probe_mpeg):
+                info = probe(f, head, size)
+                if info is not None:
+                    return info
+    except (OSError, struct.error, ValueError, IndexError, ZeroDivisionError):
+        pass
+    return None
+
+
+def decoded_duration(path: str) -> Optional[float]:
+    """
+    Duration from decoding the whole file with libsndfile; None if it can't
+    read it. Slow, so only for files whose headers don't give the length:
+    libsndfile's own frame count is bogus for those too.
+    """
+    try:
+        import soundfile as sf
+        with sf.SoundFile(path) as audio:
+            # SoundFile.read() seeks past each block, which fails when the length
+            # is unknown, so count frames with libsndfile's sequential read
+            buffer = sf._ffi.new('float[]', DECODE_BLOCK_FRAMES * audio.channels)
+            frames = 0
+            while True:
+                read = sf._snd.sf_readf_float(audio._file, buffer, DECODE_BLOCK_FRAMES)
+                if read <= 0:
+                    break
+                frames += read
+            return frames / audio.samplerate
+    except Exception:
+        return None
+
+
+def _probe_wav(f: BinaryIO, head: bytes, size: int) -> Optional[AudioInfo]:
+    if head[:4] != b'RIFF' or head[8:12] != b'WAVE':
+        return None
+    channels = sample_rate = byte_rate = 0
+    offset = 12
+    while offset + 8 <= len(head):
+        chunk_id, chunk_size = struct.unpack_from('<4sI', head, offset)
+        if chunk_id == b'fmt ':
+            _, channels, sample_rate, byte_rate = struct.unpack_from('<HHII', head, offset + 8)
+        elif chunk_id == b'data':
+            # Streamed WAVs leave the size at 0 or 0xFFFFFFFF; use the rest of the file
+            data_size = chunk_size if 0 < chunk_size < 0xFFFFFFFF else size - offset - 8
+            data_size = min(data_size, size - offset - 8)
+            if not byte_rate:
+                return None
+            return AudioInfo('wav', data_size / byte_rate, sample_rate, channels)
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _probe_flac(f: BinaryIO, head: bytes, size: int) -> Optional[AudioInfo]:
+    offset = _skip_id3(head)
+    if head[offset:offset + 4] != b'fLaC':
+        return None
+    # STREAMINFO is always the first metadata block; its fields start 10 bytes in
+    info = head[offset + 8 + 10:offset + 8 + 18]
+    packed = int.from_bytes(info, 'big')
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    # Streaming encoders write 0 total samples: the length is unknown, not zero
+    if not sample_rate or not total_samples:
+        return None
+    return AudioInfo('flac', total_samples / sample_rate, sample_rate, channels)
+
+
+def _probe_ogg(f: BinaryIO, head: bytes, size: int) -> Optional[AudioInfo]:
+    if head[:4] != b'OggS':
+        return None
+    # First page: 27 byte header, segment table, then the codec's identification packet
+    packet = 27 + head[26]
+    if head[packet:packet + 7] == b'\x01vorbis':
+        codec = 'vorbis'
+        channels = head[packet + 11]
+        sample_rate = struct.unpack_from('<I', head, packet + 12)[0]
+        granule_rate, pre_skip = sample_rate, 0
+    elif head[packet:packet + 8] == b'OpusHead':
+        codec = 'opus'
+        channels = head[packet + 9]
+        pre_skip = struct.unpack_from('<H', head, packet + 10)[0]
+        sample_rate = struct.unpack_from('<I', head, packet + 12)[0] or 48000
+        granule_rate = 48000  # Opus granule positions always count 48 kHz samples
+    else:
+        return None
+
+    # The last page's granule position is the stream length in samples
+    f.seek(max(0, size - OGG_TAIL_BYTES))
+    tail = f.read()
+    last = tail.rfind(b'OggS')
+    if last < 0 or last + 14 > len(tail):
+        return None
+    granule = struct.unpack_from('<q', tail, last + 6)[0]
+    return AudioInfo(f'ogg/{codec}', max(0, granule - pre_skip) / granule_rate, sample_rate, channels)
+
+
+def _probe_mp4(f: BinaryIO, head: bytes, size: int) -> Optional[AudioInfo]:
+    if head[4:8] != b'ftyp':
+        return None
+    # moov is often written after mdat, so walk the top-level atoms by seeking
+    offset = 0
+    while offset + 8 <= size:
+        f.seek(offset)
+        atom_size, atom_type = struct.unpack('>I4s', f.read(8))
+        header = 8
+        if atom_size == 1:
+            atom_size = struct.unpack('>Q', f.read(8))[0]
+            header = 16
+        elif atom_size == 0:
+            atom_size = size - offset
+        if atom_size < header:
+            return None
+        if atom_type == b'moov':
+            return _parse_moov(f.read(atom_size - header))
+        offset += atom_size
+    return None
+
+
+def _parse_moov(moov: bytes) -> Optional[AudioInfo]:
+    mvhd = _find_atom(moov, b'mvhd')
+    if mvhd is None:
+        return None
+    if moov[mvhd] == 1:  # version 1: 64-bit times
+        timescale, duration = struct.unpack_from('>IQ', moov, mvhd + 20)
+    else:
+        timescale, duration = struct.unpack_from('>II', moov, mvhd + 12)
+    # Fragmented MP4 leaves the mvhd duration at 0; the length is in the fragments
+    if not timescale or not duration:
+        return None
+
+    sample_rate = channels = 0
+    entry = moov.find(b'mp4a')
+    if entry >= 4:
+        # AudioSampleEntry: 6 reserved + 2 index + 8 reserved, then channels,
+        # sample size, 4 reserved and a 16.16 sample rate
+        channels = struct.unpack_from('>H', moov, entry + 4 + 16)[0]
+        sample_rate = struct.unpack_from('>I', moov, entry + 4 + 24)[0] >> 16
+    return AudioInfo('mp4', duration / timescale, sample_rate, channels)
+
+
+def _find_atom(data: bytes, name: bytes, offset: int = 0, end: Optional[int] = None) -> Optional[int]:
+    """Offset of the payload of the first `name` atom, descending into the audio-relevant containers."""
+    end = len(data) if end is None else end
+    while offset + 8 <= end:
+        atom_size, atom_type = struct.unpack_from('>I4s', data, offset)
+        if atom_size < 8:
+            return None
+        if atom_type == name:
+            return offset + 8
+        if atom_type in (b'trak', b'mdia', b'minf', b'stbl'):
+            found = _find_atom(data, name, offset + 8, offset + atom_size)
+            if found is not None:
+                return found
+        offset += atom_size
+    return None
+
+
+_ASF_HEADER = bytes.fromhex('3026b2758e66cf11a6d900aa0062ce6c')
+_ASF_FILE_PROPERTIES = bytes.fromhex('a1dcab8c47a9cf118ee400c00c205365')
+_ASF_STREAM_PROPERTIES = bytes.fromhex('9107dcb7b7a9cf118ee600c00c205365')
+_ASF_AUDIO_MEDIA = bytes.fromhex('409e69f84d5bcf11a8fd00805f5c442b')
+
+
+def _probe_asf(f: BinaryIO, head: bytes, size: int) -> Optional[AudioInfo]:
+    if head[:16] != _ASF_HEADER:
+        return None
+    duration = None
+    sample_rate = channels = 0
+    offset = 30  # header object: GUID, size, object count, 2 reserved bytes
+    while offset + 24 <= len(head):
+        guid = head[offset:offset + 16]
+        object_size = struct.unpack_from('<Q', head, offset + 16)[0]
+        if object_size < 24:
+            break
+        body = offset + 24
+        if guid == _ASF_FILE_PROPERTIES:
+            # play duration in 100 ns units, preroll in ms
+            play_duration, _, preroll = struct.unpack_from('<QQQ', head, body + 40)
+            duration = max(0.0, play_duration / 1e7 - preroll / 1000)
+        elif guid == _ASF_STREAM_PROPERTIES and head[body:body + 16] == _ASF_AUDIO_MEDIA:
+            # WAVEFORMATEX follows the fixed 54 byte stream properties header
+            channels, sample_rate = struct.unpack_from('<HI', head, body + 54 + 2)
+        offset += object_size
+    if duration is None:
+        return None
+    return AudioInfo('asf', duration, sample_rate, channels)
+
+
+# MPEG audio frame header tables, indexed by the header's version bits
+_MPEG_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_MPEG1_L3_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MPEG2_L3_BITRATES = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_ADTS_SAMPLE_RATES = (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350)
+
+
+def _probe_mpeg(f: BinaryIO, head: bytes, size: int) -> Optional[AudioInfo]:
+    """MP3 (layer III) or raw AAC in ADTS frames, after any ID3v2 tag."""
+    start = _skip_id3(head)
+    if start >= len(head):
+        # A tag bigger than the read-ahead (embedded cover art): read past it
+        f.seek(start)
+        head = head[:start] + f.read(HEADER_BYTES)
+    sync = _find_sync(head, start, start + MAX_SYNC_SEARCH)
+    if sync is None:
+        return None
+    header = struct.unpack_from('>I', head, sync)[0]
+    layer = (header >> 17) & 0x3
+    if layer == 0:
+        return _parse_adts(head, sync, size)
+    if layer != 1:  # only layer III
+        return None
+
+    version = (header >> 19) & 0x3
+    bitrate_index = (header >> 12) & 0xF
+    rate_index = (header >> 10) & 0x3
+    if version == 1 or rate_index == 3 or bitrate_index in (0, 15):
+        return None
+    sample_rate = _MPEG_SAMPLE_RATES[version][rate_index]
+    channels = 1 if ((header >> 6) & 0x3) == 3 else 2
+    samples_per_frame = 1152 if version == 3 else 576
+    bitrate = (_MPEG1_L3_BITRATES if version == 3 else _MPEG2_L3_BITRATES)[bitrate_index] * 1000
+
+    # A lone 0xFFE pattern can occur in any binary; require the next frame to follow
+    frame_length = (144 if version == 3 else 72) * bitrate // sample_rate + ((header >> 9) & 0x1)
+    following = sync + frame_length
+    if following + 2 <= len(head) and not (head[following] == 0xFF and head[following + 1] & 0xE0 == 0xE0):
+        return None
+
+    # VBR files carry the frame count in a Xing/Info or VBRI header in the first frame
+    side_info = (32 if channels == 2 else 17) if version == 3 else (17 if channels == 2 else 9)
+    xing = sync + 4 + side_info
+    frames = None
+    if head[xing:xing + 4] in (b'Xing', b'Info'):
+        flags = struct.unpack_from('>I', head, xing + 4)[0]
+        if flags & 0x1:
+            frames = struct.unpack_from('>I', head, xing + 8)[0]
+    elif head[sync + 36:sync + 40] == b'VBRI':
+        frames = struct.unpack_from('>I', head, sync + 36 + 14)[0]
+
+    if frames:
+        duration = frames * samples_per_frame / sample_rate
+    else:
+        # CBR: audio bytes over the bitrate (ID3v1 tag excluded)
+        audio_bytes = size - sync - (128 if size >= 128 and _has_id3v1(f, size) else 0)
+        duration = audio_bytes * 8 / bitrate
+    return AudioInfo('mp3', duration, sample_rate, channels)
+
+
+def _parse_adts(head: bytes, sync: int, size: int) -> Optional[AudioInfo]:
+    rate_index = (head[sync + 2] >> 2) & 0xF
+    if rate_index >= len(_ADTS_SAMPLE_RATES):
+        return None
+    sample_rate = _ADTS_SAMPLE_RATES[rate_index]
+    channels = ((head[sync + 2] & 0x1) << 2) | (head[sync + 3] >> 6)
+
+    # No frame count in ADTS; estimate from the average frame length in the read-ahead
+    frames = total = 0
+    offset = sync
+    while offset + 7 <= len(head) and head[offset] == 0xFF and (head[offset + 1] & 0xF6) == 0xF0:
+        length = ((head[offset + 3] & 0x3) << 11) | (head[offset + 4] << 3) | (head[offset + 5] >> 5)
+        if length < 7:
+            break
+        frames += 1
+        total += length
+        offset += length
+    if not frames:
+        return None
+    estimated_frames = (size - sync) / (total / frames)
+    return AudioInfo('aac', estimated_frames * 1024 / sample_rate, sample_rate, channels)
+
+
+def _find_sync(head: bytes, start: int, end: int) -> Optional[int]:
+    """First MPEG frame sync (11 set bits) between `start` and `end`."""
+    offset = head.find(b'\xff', start)
+    while 0 <= offset < min(end, len(head) - 4):
+        if (head[offset + 1] & 0xE0) == 0xE0:
+            return offset
+        offset = head.find(b'\xff', offset + 1)
+    return None
+
+
+def _skip_id3(head: bytes) -> int:
+    if head[:3] != b'ID3' or len(head) < 10:
+        return 0
+    # Syncsafe size: 7 bits per byte, plus the 10 byte header and an optional footer
+    tag_size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+    return 10 + tag_size + (10 if head[5] & 0x10 else 0)
+
+
+def _has_id3v1(f: BinaryIO, size: int) -> bool:
+    f.seek(size - 128)
+    return f.read(3) == b'TAG'
@@ -0,0 +1,172 @@
+"""
+Local extractive summarization for long title-generation inputs.
+
+Long posts are condensed before they are sent to Groq: the text is split
+into chunks of whole sentences, each chunk keeps its highest-ranked
+sentences (TextRank over TF-IDF sentence vectors, IDF taken over the whole
+post), and the kept sentences are joined in their original order. If that
+is still over budget, the same ranking runs once more over the kept
+sentences. Everything is plain Python; there is no network call.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+(?=\S)')
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9'’]*")
+
+# Words that say nothing about what a post is about
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most
+my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+so some such than that the their theirs them themselves then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your
+yours yourself yourselves also may might must shall us it's i'm don't can't won't isn't
+""".split())
+
+DAMPING = 0.85
+ITERATIONS = 30
+TOLERANCE = 1e-4
+
+
+@dataclass
+class Summary:
+    text: str
+    source_chars: int
+    sentences_total: int
+    sentences_kept: int
+    chunks: int
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_END_RE.split(text) if sentence.strip()]
+
+
+def _terms(sentence: str) -> List[str]:
+    return [word for word in _WORD_RE.findall(sentence.lower()) if word not in STOPWORDS and len(word) > 2]
+
+
+def _chunks(sentences: Sequence[str], chunk_chars: int) -> List[List[int]]:
+    """Group sentence indexes into runs of about chunk_chars characters."""
+    chunks, current, size = [], [], 0
+    for index, sentence in enumerate(sentences):
+        if current and size + len(sentence) > chunk_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += len(sentence) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _vectors(term_lists: Sequence[List[str]]) -> List[Dict[str, float]]:
+    """Unit-length TF-IDF vector per sentence; IDF over all the sentences given."""
+    document_frequency = Counter(term for terms in term_lists for term in set(terms))
+    count = len(term_lists)
+    vectors = []
+    for terms in term_lists:
+        weights = {
+            term: (1 + math.log(frequency)) * math.log((1 + count) / (1 + document_frequency[term]))
+            for term, frequency in Counter(terms).items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in weights.items()})
+    return vectors
+
+
+def textrank(indexes: Sequence[int], vectors: Sequence[Dict[str, float]]) -> Dict[int, float]:
+    """TextRank score for each of `indexes`, using cosine similarity as edge weight."""
+    size = len(indexes)
+    if size <= 2:
+        return {index: 1.0 for index in indexes}
+    # Dot products via an inverted index, so only sentence pairs sharing a term are visited
+    postings: Dict[str, List[tuple]] = defaultdict(list)
+    for position, index in enumerate(indexes):
+        for term, weight in vectors[index].items():
+            postings[term].append((position, weight))
+    similarities: Dict[tuple, float] = defaultdict(float)
+    for posting in postings.values():
+        for offset, (a, weight_a) in enumerate(posting):
+            for b, weight_b in posting[offset + 1:]:
+                similarities[a, b] += weight_a * weight_b
+
+    edges: List[List[tuple]] = [[] for _ in range(size)]
+    totals = [0.0] * size
+    for (a, b), similarity in similarities.items():
+        if similarity > 0:
+            edges[a].append((b, similarity))
+            edges[b].append((a, similarity))
+            totals[a] += similarity
+            totals[b] += similarity
+
+    # Each neighbour passes on its score in proportion to the edge's share of its total weight
+    incoming = [[(b, weight / totals[b]) for b, weight in edges[a]] for a in range(size)]
+    scores = [1.0] * size
+    for _ in range(ITERATIONS):
+        updated = [
+            (1 - DAMPING) + DAMPING * sum(scores[b] * share for b, share in incoming[a])
+            for a in range(size)
+        ]
+        converged = max(abs(new - old) for new, old in zip(updated, scores)) < TOLERANCE
+        scores = updated
+        if converged:
+            break
+    return {indexes[position]: score for position, score in enumerate(scores)}
+
+
+def _select(indexes: Sequence[int], scores: Dict[int, float], sentences: Sequence[str], budget: int) -> List[int]:
+    """Best-scoring sentences that fit in `budget` characters, in document order."""
+    kept, used = [], 0
+    for index in sorted(indexes, key=lambda i: scores[i], reverse=True):
+        length = len(sentences[index]) + 1
+        if used + length > budget:
+            continue
+        kept.append(index)
+        used += length
+    return sorted(kept)
+
+
+def summarize(text: str, budget_chars: int, chunk_chars: int = 4000) -> Summary:
+    """
+    Condense `text` to at most about `budget_chars` characters of its most
+    central sentences. Text already within budget is returned unchanged.
+    """
+    sentences = split_sentences(text)
+    if len(text) <= budget_chars or len(sentences) <= 1:
+        return Summary(text[:budget_chars], len(text), len(sentences), len(sentences), 1)
+
+    vectors = _vectors([_terms(sentence) for sentence in sentences])
+    chunks = _chunks(sentences, chunk_chars)
+
+    # Map: each chunk keeps its best sentences within its share of the budget,
+    # with some headroom for the reduce pass to choose from
+    kept: List[int] = []
+    for chunk in chunks:
+        chunk_chars_total = sum(len(sentences[i]) + 1 for i in chunk)
+        share = max(1, int(2 * budget_chars * chunk_chars_total / len(text)))
+        kept.extend(_select(chunk, textrank(chunk, vectors), sentences, share))
+
+    # The opening sentence usually states the topic; always consider it
+    if 0 not in kept and len(sentences[0]) < budget_chars // 4:
+        kept.insert(0, 0)
+
+    # Reduce: rank the survivors against each other and fit the budget
+    if sum(len(sentences[i]) + 1 for i in kept) > budget_chars:
+        scores = textrank(kept, vectors)
+        if 0 in scores:
+            scores[0] = max(scores.values()) + 1
+        kept = _select(kept, scores, sentences, budget_chars)
+
+    return Summary(
+        # Only sentences longer than the whole budget: fall back to the opening
+        text=' '.join(sentences[i] for i in kept) or text[:budget_chars],
+        source_chars=len(text),
+        sentences_total=len(sentences),
+        sentences_kept=len(kept),
+        chunks=len(chunks)
+    )
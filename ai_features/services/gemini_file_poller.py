@@ -0,0 +1,144 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from django.conf import settings
+
+
+class _PendingFile:
+    def __init__(self, name: str, interval: float):
+        self.name = name
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self.waiters: List[threading.Event] = []
+        self.file = None
+        self.error: Optional[Exception] = None
+        self.consecutive_errors = 0
+
+
+class GeminiFilePoller:
+    """
+    Single background thread that tracks every in-flight Gemini file upload.
+
+    Instead of each request sleeping in its own loop, callers register the
+    file handle and block on an Event. The poller checks each file on its own
+    schedule, starting at POLL_INITIAL and backing off exponentially up to
+    POLL_MAX, and wakes the waiters as soon as the file leaves PROCESSING.
+    """
+
+    MAX_CONSECUTIVE_ERRORS = 3
+
+    def __init__(self, get_file: Optional[Callable[[str], Any]] = None,
+                 initial_interval: Optional[float] = None, max_interval: Optional[float] = None,
+                 backoff: float = 2.0):
+        self._get_file = get_file
+        self.initial_interval = initial_interval or settings.GEMINI_POLL_INITIAL
+        self.max_interval = max_interval or settings.GEMINI_POLL_MAX
+        self.backoff = backoff
+        self._pending: Dict[str, _PendingFile] = {}
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def wait_until_processed(self, file, timeout: Optional[float] = None):
+        """
+        Block until the file is no longer PROCESSING and return the refreshed
+        handle. Raises TimeoutError once the deadline passes.
+        """
+        if file.state.name != 'PROCESSING':
+            return file
+
+        timeout = settings.GEMINI_PROCESSING_TIMEOUT if timeout is None else timeout
+        event = threading.Event()
+        with self._condition:
+            pending = self._pending.get(file.name)
+            if pending is None:
+                pending = _PendingFile(file.name, self.initial_interval)
+                self._pending[file.name] = pending
+            pending.waiters.append(event)
+            self._ensure_thread()
+            self._condition.notify()
+
+        if not event.wait(timeout):
+            with self._condition:
+                if event in pending.waiters:
+                    pending.waiters.remove(event)
+                if not pending.waiters and self._pending.get(file.name) is pending:
+                    del self._pending[file.name]
+            raise TimeoutError(f"Gemini file {file.name} still processing after {timeout:.0f}s")
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.file
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'in_flight': len(self._pending),
+                'waiters': sum(len(p.waiters) for p in self._pending.values()),
+                'running': bool(self._thread and self._thread.is_alive()),
+            }
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='gemini-file-poller', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        get_file = self._get_file
+        if get_file is None:
+            import google.generativeai as genai
+            get_file = genai.get_file
+
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                now = time.monotonic()
+                due = [p for p in self._pending.values() if p.next_poll <= now]
+                if not due:
+                    self._condition.wait(min(p.next_poll for p in self._pending.values()) - now)
+                    continue
+
+            # Network calls happen outside the lock so new waiters can register meanwhile
+            for pending in due:
+                try:
+                    refreshed = get_file(pending.name)
+                    pending.consecutive_errors = 0
+                except Exception as e:
+                    pending.consecutive_errors += 1
+                    if pending.consecutive_errors >= self.MAX_CONSECUTIVE_ERRORS:
+                        pending.error = e
+                        self._finish(pending)
+                    else:
+                        self._reschedule(pending)
+                    continue
+
+                if refreshed.state.name == 'PROCESSING':
+                    self._reschedule(pending)
+                else:
+                    pending.file = refreshed
+                    self._finish(pending)
+
+    def _reschedule(self, pending: _PendingFile) -> None:
+        pending.interval = min(pending.interval * self.backoff, self.max_interval)
+        pending.next_poll = time.monotonic() + pending.interval
+
+    def _finish(self, pending: _PendingFile) -> None:
+        with self._condition:
+            if self._pending.get(pending.name) is pending:
+                del self._pending[pending.name]
+            waiters, pending.waiters = pending.waiters, []
+        for event in waiters:
+            event.set()
+
+
+_poller: Optional[GeminiFilePoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_file_poller() -> GeminiFilePoller:
+    """Process-wide poller shared by every AudioTranscriptionService."""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = GeminiFilePoller()
+        return _poller
@@ -0,0 +1,216 @@
+"""
+Background health probes for the readiness endpoint.
+
+A single daemon thread runs every probe (database, storage, Groq,
+transcription backend) each HEALTH_PROBE_INTERVAL seconds and keeps the
+latest result. The health endpoints only read that snapshot, so a load
+balancer polling them every second costs a dict copy and never makes an
+upstream call or touches the database inline.
+
+A probe is a callable that returns a short detail string when healthy,
+raises ProbeSkipped when it doesn't apply (e.g. Groq isn't configured), and
+raises anything else when unhealthy.
+"""
+import importlib.util
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+OK, FAILING, SKIPPED, PENDING = 'ok', 'failing', 'skipped', 'pending'
+
+
+class ProbeSkipped(Exception):
+    pass
+
+
+def probe_database() -> str:
+    close_old_connections()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        return connection.vendor
+    finally:
+        close_old_connections()
+
+
+def probe_storage() -> str:
+    audio_dir = os.path.join(settings.MEDIA_ROOT, 'audio')
+    os.makedirs(audio_dir, exist_ok=True)
+    if not os.access(audio_dir, os.W_OK):
+        raise PermissionError(f"{audio_dir} is not writable")
+    free_mb = shutil.disk_usage(audio_dir).free / (1024 * 1024)
+    if free_mb < settings.HEALTH_MIN_FREE_MB:
+        raise OSError(f"Only {free_mb:.0f}MB free in {audio_dir}")
+    return f"{free_mb:.0f}MB free"
+
+
+def probe_groq() -> str:
+    if not settings.GROQ_API_KEY or settings.GROQ_API_KEY == 'your-groq-api-key-here':
+        raise ProbeSkipped("GROQ_API_KEY not set")
+    # Listing models is free and goes over the same pooled client as the title calls
+    from .registry import service_registry
+    base_url = (settings.GROQ_BASE_URL or 'https://api.groq.com').rstrip('/')
+    response = service_registry.get('groq_http').get(
+        f"{base_url}/openai/v1/models",
+        headers={'Authorization': f"Bearer {settings.GROQ_API_KEY}"},
+        timeout=settings.HEALTH_PROBE_TIMEOUT
+    )
+    response.raise_for_status()
+    return f"HTTP {response.status_code}"
+
+
+def probe_transcription() -> str:
+    backend = settings.TRANSCRIPTION_BACKEND
+    if backend == 'gemini':
+        if not settings.GOOGLE_API_KEY:
+            raise ProbeSkipped("GOOGLE_API_KEY not set")
+        import google.generativeai as genai
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        model = genai.get_model('models/gemini-1.5-pro', request_options={'timeout': settings.HEALTH_PROBE_TIMEOUT})
+        return f"gemini: {model.name}"
+    if backend == 'local':
+        # Checked without importing, which would load torch into the probe thread
+        missing = [name for name in ('whisper', 'torch') if importlib.util.find_spec(name) is None]
+        if missing:
+            raise ImportError(f"local backend needs {', '.join(missing)}")
+        return "local: whisper installed"
+    return backend
+
+
+# First run one interval after startup, so their SDK imports stay off the startup path
+UPSTREAM_PROBES = ('groq', 'transcription')
+
+DEFAULT_PROBES: Dict[str, Callable[[], str]] = {
+    'database': probe_database,
+    'storage': probe_storage,
+    'groq': probe_groq,
+    'transcription': probe_transcription,
+}
+
+
+class HealthProber:
+    def __init__(self, probes: Optional[Dict[str, Callable[[], str]]] = None,
+                 interval: Optional[float] = None, timeout: Optional[float] = None,
+                 deferred: Iterable[str] = UPSTREAM_PROBES):
+        self.probes = dict(probes or DEFAULT_PROBES)
+        self.deferred = set(deferred)
+        self.interval = interval or settings.HEALTH_PROBE_INTERVAL
+        self.timeout = timeout or settings.HEALTH_PROBE_TIMEOUT
+        self._results: Dict[str, Dict[str, Any]] = {
+            name: {'status': PENDING, 'detail': None, 'latency_ms': None, 'checked_at': None}
+            for name in self.probes
+        }
+        self._running: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # One worker per probe, so a hung probe doesn't delay the others
+        self._executor = ThreadPoolExecutor(max_workers=len(self.probes), thread_name_prefix='health-probe')
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='health-prober', daemon=True)
+                self._thread.start()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Latest result per probe, with its age in seconds."""
+        now = time.time()
+        with self._lock:
+            results = {name: dict(result) for name, result in self._results.items()}
+        for result in results.values():
+            checked_at = result.pop('checked_at')
+            result['age'] = round(now - checked_at, 1) if checked_at is not None else None
+            if result['age'] is not None and result['age'] > self.max_age and result['status'] != SKIPPED:
+                # The prober has stopped refreshing this one; don't trust the old answer
+                result['status'] = FAILING
+                result['detail'] = f"stale: last checked {result['age']:.0f}s ago"
+        return results
+
+    @property
+    def max_age(self) -> float:
+        return 3 * self.interval + self.timeout
+
+    def readiness(self, required: Iterable[str]) -> Tuple[bool, List[str]]:
+        """(ready, probes that are pending or failing) for the given probe names."""
+        snapshot = self.snapshot()
+        not_ready = [name for name in required
+                     if name in snapshot and snapshot[name]['status'] not in (OK, SKIPPED)]
+        return not not_ready, not_ready
+
+    def run_once(self, names: Optional[Iterable[str]] = None) -> None:
+        pending = {}
+        for name in (self.probes if names is None else names):
+            running = self._running.get(name)
+            if running is not None and not running.done():
+                # Still stuck from an earlier round; already reported as timed out
+                continue
+            pending[name] = self._running[name] = self._executor.submit(self._call, self.probes[name])
+
+        deadline = time.monotonic() + self.timeout
+        for name, future in pending.items():
+            try:
+                status, detail, seconds = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                status, detail, seconds = FAILING, f"timed out after {self.timeout:.0f}s", self.timeout
+            self._store(name, status, detail, seconds)
+
+    @staticmethod
+    def _call(probe: Callable[[], str]) -> Tuple[str, Optional[str], float]:
+        started = time.perf_counter()
+        try:
+            status, detail = OK, probe()
+        except ProbeSkipped as e:
+            status, detail = SKIPPED, str(e)
+        except Exception as e:
+            status, detail = FAILING, f"{type(e).__name__}: {e}"
+        return status, detail, time.perf_counter() - started
+
+    def _store(self, name: str, status: str, detail: Optional[str], seconds: float) -> None:
+        with self._lock:
+            previous = self._results[name]['status']
+            self._results[name] = {
+                'status': status,
+                'detail': detail,
+                'latency_ms': round(seconds * 1000, 1),
+                'checked_at': time.time(),
+            }
+        # Log changes only; a probe stays failing for many rounds
+        if status == FAILING and previous != FAILING:
+            logger.warning("Health probe %s failing: %s", name, detail)
+        elif previous == FAILING and status == OK:
+            logger.info("Health probe %s recovered", name)
+
+    def _run(self) -> None:
+        names = [name for name in self.probes if name not in self.deferred]
+        while True:
+            started = time.monotonic()
+            try:
+                self.run_once(names)
+            except Exception as e:
+                logger.exception("Health probe round failed: %s", e)
+            names = None
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+_prober: Optional[HealthProber] = None
+_prober_lock = threading.Lock()
+
+
+def get_health_prober() -> HealthProber:
+    """Process-wide prober; its thread starts the first time it is needed."""
+    global _prober
+    with _prober_lock:
+        if _prober is None:
+            _prober = HealthProber()
+            _prober.start()
+        return _prober
@@ -0,0 +1,255 @@
+"""
+Live transcription: audio frames in, voice-segmented windows out.
+
+A stream of 16-bit PCM (or Opus packets, with the optional opuslib package)
+is cut into 20ms frames and each frame is classified as speech or silence
+by its energy. Speech is collected into a window that closes after
+STREAM_SILENCE_MS of silence, or at STREAM_MAX_WINDOW_SECONDS in long
+stretches of speech, so a result never waits on more than one window.
+Windows with too little speech in them are dropped without a backend call.
+
+Each closed window is written out as a short WAV file and transcribed by
+the configured AudioTranscriptionService backend, like any upload. Segment
+times are moved onto the stream's timeline. Speaker labels come from the
+backend and are per window: backends diarize each file on its own.
+"""
+import array
+import logging
+import math
+import os
+import sys
+import tempfile
+import wave
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from django.conf import settings
+
+from ..metrics import span
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 20
+# Audio kept before the first speech frame and after the last, so word edges aren't clipped
+PAD_MS = 200
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+# Largest Opus packet is 120ms
+OPUS_MAX_FRAME_MS = 120
+
+
+class StreamFormatError(ValueError):
+    pass
+
+
+class PcmDecoder:
+    """Interleaved little-endian 16-bit PCM in, mono 16-bit PCM out."""
+
+    def __init__(self, channels: int = 1):
+        if channels not in (1, 2):
+            raise StreamFormatError("channels must be 1 or 2")
+        self.channels = channels
+        self._pending = b''
+
+    def decode(self, data: bytes) -> bytes:
+        # Messages needn't end on a sample boundary; keep the remainder for the next one
+        data = self._pending + data
+        usable = len(data) - len(data) % (2 * self.channels)
+        data, self._pending = data[:usable], data[usable:]
+        return _to_mono(data, self.channels)
+
+
+class OpusDecoder:
+    """One Opus packet per message in, mono 16-bit PCM out. Needs the opuslib package."""
+
+    def __init__(self, sample_rate: int, channels: int = 1):
+        if sample_rate not in OPUS_SAMPLE_RATES:
+            raise StreamFormatError(f"Opus sample_rate must be one of {', '.join(map(str, OPUS_SAMPLE_RATES))}")
+        try:
+            import opuslib
+        except ImportError:
+            raise StreamFormatError("Opus streams need the opuslib package; send pcm_s16le instead")
+        self.channels = channels
+        self.max_frame_size = sample_rate * OPUS_MAX_FRAME_MS // 1000
+        self._decoder = opuslib.Decoder(sample_rate, channels)
+        self._error = opuslib.OpusError
+
+    def decode(self, data: bytes) -> bytes:
+        try:
+            pcm = self._decoder.decode(data, self.max_frame_size)
+        except self._error as e:
+            raise StreamFormatError(f"Invalid Opus packet: {e}")
+        return _to_mono(pcm, self.channels)
+
+
+def _to_mono(data: bytes, channels: int) -> bytes:
+    if channels == 1:
+        return data
+    samples = _samples(data)
+    return _pcm(array.array('h', ((left + right) // 2 for left, right in zip(samples[0::2], samples[1::2]))))
+
+
+def _samples(data: bytes) -> array.array:
+    samples = array.array('h', data)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples
+
+
+def _pcm(samples: array.array) -> bytes:
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def frame_level_db(frame: bytes) -> float:
+    """RMS level of a 16-bit PCM frame in dBFS (-inf for digital silence)."""
+    samples = _samples(frame)
+    if not samples:
+        return -math.inf
+    energy = sum(map(int.__mul__, samples, samples)) / len(samples)
+    return 10 * math.log10(energy / 32768 ** 2) if energy else -math.inf
+
+
+@dataclass
+class SpeechWindow:
+    index: int
+    start: float  # seconds from the start of the stream
+    pcm: bytes
+    sample_rate: int
+    speech_seconds: float
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / 2 / self.sample_rate
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class VadSegmenter:
+    """
+    Cuts mono 16-bit PCM into speech windows by frame energy.
+
+    feed() returns the windows that closed during that audio; flush() closes
+    the open one at the end of the stream.
+    """
+
+    def __init__(self, sample_rate: int, threshold_db: Optional[float] = None,
+                 silence_ms: Optional[int] = None, max_window_seconds: Optional[float] = None,
+                 min_speech_ms: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.threshold_db = settings.STREAM_VAD_THRESHOLD_DB if threshold_db is None else threshold_db
+        silence_ms = settings.STREAM_SILENCE_MS if silence_ms is None else silence_ms
+        max_window_seconds = settings.STREAM_MAX_WINDOW_SECONDS if max_window_seconds is None else max_window_seconds
+        min_speech_ms = settings.STREAM_MIN_SPEECH_MS if min_speech_ms is None else min_speech_ms
+
+        self.frame_bytes = sample_rate * FRAME_MS // 1000 * 2
+        self.silence_frames = max(1, silence_ms // FRAME_MS)
+        self.max_frames = max(1, int(max_window_seconds * 1000) // FRAME_MS)
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.pad_frames = PAD_MS // FRAME_MS
+
+        self.frames_seen = 0
+        self.windows_emitted = 0
+        self._buffer = bytearray()
+        self._padding: Deque[bytes] = deque(maxlen=self.pad_frames)
+        self._frames: List[bytes] = []
+        self._start_frame = 0
+        self._speech_frames = 0
+        self._silent_run = 0
+
+    @property
+    def seconds_seen(self) -> float:
+        return self.frames_seen * FRAME_MS / 1000
+
+    def feed(self, pcm: bytes) -> List[SpeechWindow]:
+        self._buffer.extend(pcm)
+        closed = []
+        offset = 0
+        while len(self._buffer) - offset >= self.frame_bytes:
+            frame = bytes(self._buffer[offset:offset + self.frame_bytes])
+            offset += self.frame_bytes
+            window = self._add_frame(frame, frame_level_db(frame) >= self.threshold_db)
+            if window is not None:
+                closed.append(window)
+        del self._buffer[:offset]
+        return closed
+
+    def flush(self) -> Optional[SpeechWindow]:
+        return self._close() if self._frames else None
+
+    def _add_frame(self, frame: bytes, speech: bool) -> Optional[SpeechWindow]:
+        self.frames_seen += 1
+        if not self._frames:
+            if not speech:
+                self._padding.append(frame)
+                return None
+            # Speech starts: open a window, including the padding before it
+            self._frames = list(self._padding) + [frame]
+            self._start_frame = self.frames_seen - len(self._frames)
+            self._padding.clear()
+            self._speech_frames, self._silent_run = 1, 0
+            return None
+
+        self._frames.append(frame)
+        if speech:
+            self._speech_frames += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+        if self._silent_run >= self.silence_frames or len(self._frames) >= self.max_frames:
+            return self._close()
+        return None
+
+    def _close(self) -> Optional[SpeechWindow]:
+        frames, self._frames = self._frames, []
+        # Keep only PAD_MS of the trailing silence
+        trailing = max(0, self._silent_run - self.pad_frames)
+        if trailing:
+            for frame in frames[len(frames) - trailing:]:
+                self._padding.append(frame)
+            frames = frames[:len(frames) - trailing]
+        speech_frames, self._speech_frames, self._silent_run = self._speech_frames, 0, 0
+        if speech_frames < self.min_speech_frames:
+            return None  # a click or a cough
+        window = SpeechWindow(
+            index=self.windows_emitted,
+            start=self._start_frame * FRAME_MS / 1000,
+            pcm=b''.join(frames),
+            sample_rate=self.sample_rate,
+            speech_seconds=speech_frames * FRAME_MS / 1000
+        )
+        self.windows_emitted += 1
+        return window
+
+
+def transcribe_window(service, window: SpeechWindow) -> Dict[str, Any]:
+    """
+    Transcribe one window with an AudioTranscriptionService (blocking) and
+    return its segments on the stream's timeline.
+    """
+    fd, path = tempfile.mkstemp(prefix='live_', suffix='.wav')
+    try:
+        with os.fdopen(fd, 'wb') as handle, wave.open(handle, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(window.sample_rate)
+            wav.writeframes(window.pcm)
+        with span('stream_window_transcribe'):
+            result = service.transcribe_with_diarization(path, chunked=False, duration=window.duration)
+    finally:
+        os.unlink(path)
+
+    if not result.get('success'):
+        return {'success': False, 'error': result.get('error', 'Transcription failed'),
+                'retry_after': result.get('retry_after')}
+    segments = []
+    for segment in result.get('segments', []):
+        segments.append({
+            **segment,
+            'start': round(window.start + min(segment.get('start', 0), window.duration), 2),
+            'end': round(window.start + min(segment.get('end', 0), window.duration), 2),
+        })
+    return {'success': True, 'segments': segments}
@@ -0,0 +1,233 @@
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+
+from ..metrics import span
+from .audio_chunking import format_timestamp
+from .transcription_backends import ProgressCallback, TranscriptionBackend, report_progress
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 30  # Whisper's fixed input window
+
+# Models are loaded once per process and shared by every backend instance
+_models: Dict[Tuple[str, str], Any] = {}
+_models_lock = threading.Lock()
+
+
+def _load_whisper(model_name: str):
+    key = ('whisper', model_name)
+    with _models_lock:
+        if key not in _models:
+            import whisper
+            logger.info("Loading Whisper '%s' on CPU...", model_name)
+            _models[key] = whisper.load_model(model_name, device='cpu')
+        return _models[key]
+
+
+def _load_diarization(pipeline_name: str, token: Optional[str]):
+    key = ('diarization', pipeline_name)
+    with _models_lock:
+        if key not in _models:
+            import torch
+            from pyannote.audio import Pipeline
+            logger.info("Loading diarization pipeline '%s'...", pipeline_name)
+            pipeline = Pipeline.from_pretrained(pipeline_name, use_auth_token=token)
+            if pipeline is not None:
+                pipeline.to(torch.device('cpu'))
+            _models[key] = pipeline
+        return _models[key]
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    CPU-only offline engine: Whisper for speech recognition plus pyannote for
+    speaker diarization, no network round trips once the models are cached.
+
+    The recording is cut into Whisper's 30s windows and the windows are decoded
+    WHISPER_BATCH_SIZE at a time in a single batched forward pass. Speakers are
+    assigned to each Whisper segment by maximum overlap with the pyannote turns.
+    Audio is decoded with librosa, so FFmpeg is not required for WAV/FLAC/OGG.
+    """
+
+    name = 'local'
+
+    def __init__(self, model_name: Optional[str] = None, batch_size: Optional[int] = None):
+        self.model_name = model_name or settings.WHISPER_MODEL
+        self.batch_size = batch_size or settings.WHISPER_BATCH_SIZE
+        self.whisper_model = None
+        self.diarization_pipeline = None
+        self.load_error = None
+
+        try:
+            import torch
+            if settings.LOCAL_TRANSCRIPTION_THREADS:
+                torch.set_num_threads(settings.LOCAL_TRANSCRIPTION_THREADS)
+            self.whisper_model = _load_whisper(self.model_name)
+            logger.info("Whisper '%s' ready.", self.model_name)
+        except Exception as e:
+            self.load_error = str(e)
+            logger.error("Failed to load Whisper model: %s", e)
+
+        if settings.HUGGINGFACE_TOKEN:
+            try:
+                self.diarization_pipeline = _load_diarization(settings.DIARIZATION_PIPELINE, settings.HUGGINGFACE_TOKEN)
+                logger.info("Diarization pipeline ready.")
+            except Exception as e:
+                logger.warning("Failed to load diarization pipeline, continuing without speakers: %s", e)
+        else:
+            logger.warning("HUGGINGFACE_TOKEN not set. Local transcription will run without diarization.")
+
+    @property
+    def available(self) -> bool:
+        return self.whisper_model is not None
+
+    @property
+    def unavailable_reason(self) -> str:
+        return f"Local Whisper model not available: {self.load_error or 'not loaded'}"
+
+    @property
+    def supports_diarization(self) -> bool:
+        return self.diarization_pipeline is not None
+
+    def transcribe(self, audio_file_path: str, progress_callback: ProgressCallback = None) -> Dict[str, Any]:
+        try:
+            import librosa
+
+            timings: Dict[str, float] = {}
+            report_progress(progress_callback, 'uploading', 10)
+            with span('local_decode') as timer:
+                audio, _ = librosa.load(audio_file_path, sr=SAMPLE_RATE, mono=True)
+            timings["decode"] = timer.seconds
+
+            # Same phase order as Gemini (uploading, processing, generating, parsing):
+            # diarization is the processing step, Whisper generates the text
+            report_progress(progress_callback, 'processing', 30)
+            with span('local_diarize') as timer:
+                turns = self._diarize(audio)
+            timings["diarize"] = timer.seconds
+
+            report_progress(progress_callback, 'generating', 60)
+            with span('local_generate') as timer:
+                language, segments = self._transcribe_windows(audio)
+            timings["generate"] = timer.seconds
+
+            report_progress(progress_callback, 'parsing', 90)
+            for segment in segments:
+                segment["speaker"] = self._speaker_for(segment, turns)
+
+            speakers = sorted({s["speaker"] for s in segments})
+            full_text = "\n".join(
+                f"[{format_timestamp(s['start'])} - {format_timestamp(s['end'])}] {s['speaker']}: {s['text']}" for s in segments
+            )
+            if speakers:
+                full_text += f"\n\nSpeakers: {', '.join(speakers)}"
+
+            return {
+                "success": True,
+                "language": language,
+                "full_text": full_text,
+                "segments": segments,
+                "speakers_count": len(speakers),
+                "duration": len(audio) / SAMPLE_RATE,
+                "timings": {phase: round(seconds, 3) for phase, seconds in timings.items()}
+            }
+        except Exception as e:
+            logger.exception("Local transcription failed: %s", e)
+            return {
+                "success": False,
+                "error": str(e),
+                "full_text": "",
+                "segments": [],
+                "speakers_count": 0,
+                "duration": 0
+            }
+
+    def _transcribe_windows(self, audio) -> Tuple[str, List[Dict[str, Any]]]:
+        import torch
+        import whisper
+        from whisper.tokenizer import get_tokenizer
+
+        model = self.whisper_model
+        window = WINDOW_SECONDS * SAMPLE_RATE
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(audio[start:start + window]).float()),
+                n_mels=model.dims.n_mels
+            )
+            for start in range(0, max(len(audio), 1), window)
+        ])
+
+        # Detect the language once on the first window and decode everything with it
+        _, probabilities = model.detect_language(mels[:1])
+        language = max(probabilities[0], key=probabilities[0].get)
+        tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                  language=language, task='transcribe')
+        options = whisper.DecodingOptions(task='transcribe', language=language,
+                                          without_timestamps=False, fp16=False)
+
+        segments = []
+        with torch.inference_mode():
+            for batch_start in range(0, len(mels), self.batch_size):
+                results = whisper.decode(model, mels[batch_start:batch_start + self.batch_size], options)
+                for offset_index, result in enumerate(results):
+                    index = batch_start + offset_index
+                    window_start = index * WINDOW_SECONDS
+                    window_end = min(len(audio) / SAMPLE_RATE, window_start + WINDOW_SECONDS)
+                    segments.extend(self._timestamped_segments(result, tokenizer, window_start, window_end))
+        return language, segments
+
+    @staticmethod
+    def _timestamped_segments(result, tokenizer, window_start: float, window_end: float) -> List[Dict[str, Any]]:
+        """Split one window's tokens on <|t|> timestamp pairs into segments."""
+        import math
+
+        segments = []
+        confidence = round(math.exp(result.avg_logprob), 3) if result.avg_logprob is not None else 1.0
+        start, text_tokens = None, []
+
+        def emit(seg_start, seg_end):
+            text = tokenizer.decode(text_tokens).strip()
+            if text:
+                segments.append({
+                    "start": round(window_start + (seg_start or 0.0), 3),
+                    "end": round(min(window_start + seg_end, window_end), 3),
+                    "text": text,
+                    "speaker": "SPEAKER_00",
+                    "confidence": confidence
+                })
+
+        for token in result.tokens:
+            if token >= tokenizer.timestamp_begin:
+                seconds = (token - tokenizer.timestamp_begin) * 0.02
+                if start is not None and text_tokens:
+                    emit(start, seconds)
+                    start, text_tokens = None, []
+                else:
+                    start = seconds
+            elif token < tokenizer.eot:
+                text_tokens.append(token)
+
+        if text_tokens:
+            emit(start, window_end - window_start)
+        return segments
+
+    def _diarize(self, audio) -> List[Tuple[float, float, str]]:
+        if self.diarization_pipeline is None:
+            return []
+        import torch
+        waveform = torch.from_numpy(audio).float().unsqueeze(0)
+        annotation = self.diarization_pipeline({"waveform": waveform, "sample_rate": SAMPLE_RATE})
+        return [(turn.start, turn.end, speaker) for turn, _, speaker in annotation.itertracks(yield_label=True)]
+
+    @staticmethod
+    def _speaker_for(segment: Dict[str, Any], turns: List[Tuple[float, float, str]]) -> str:
+        best, best_overlap = "SPEAKER_00", 0.0
+        for start, end, speaker in turns:
+            overlap = min(end, segment["end"]) - max(start, segment["start"])
+            if overlap > best_overlap:
+                best, best_overlap = speaker, overlap
+        return best
+
@@ -0,0 +1,161 @@
+"""
+Process-wide service registry.
+
+Services (transcription, title generation, the job queue, ...) are built once
+per process, the first time they are needed or by warmup() from
+AppConfig.ready, and then shared by every thread. Each name has its own lock,
+so concurrent first requests can't build duplicates and a slow service (the
+local Whisper backend) doesn't hold up the others.
+
+The pooled HTTP clients for Groq are built here too, so the sync and async
+clients share one set of pool and timeout settings.
+"""
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        with self._lock:
+            self._factories[name] = factory
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"No service registered as '{name}'")
+            lock = self._locks[name]
+        with lock:
+            # Another thread may have built it while this one waited
+            if name not in self._instances:
+                started = time.perf_counter()
+                self._instances[name] = self._factories[name]()
+                logger.info("Service '%s' ready in %.2fs", name, time.perf_counter() - started)
+            return self._instances[name]
+
+    def set(self, name: str, instance: Any) -> None:
+        """Use `instance` for `name` (benchmarks and fakes)."""
+        with self._lock:
+            self._instances[name] = instance
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Forget built instances so the next get() builds them again."""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._instances
+
+    def peek(self, name: str) -> Any:
+        """The built instance, or None; never builds it."""
+        return self._instances.get(name)
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+        """Build the named services (default: all). Returns name -> error message or None."""
+        errors = {}
+        for name in list(names if names is not None else self._factories):
+            try:
+                self.get(name)
+                errors[name] = None
+            except Exception as e:
+                logger.exception("Warmup of service '%s' failed: %s", name, e)
+                errors[name] = str(e)
+        return errors
+
+
+service_registry = ServiceRegistry()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def http_client_options() -> Dict[str, Any]:
+    """Pool, keep-alive and timeout options for the Groq HTTP clients (sync and async)."""
+    import httpx
+
+    http2 = settings.GROQ_HTTP2 and _http2_available()
+    if settings.GROQ_HTTP2 and not http2:
+        logger.debug("GROQ_HTTP2 is on but the h2 package isn't installed; using HTTP/1.1")
+    return {
+        'timeout': httpx.Timeout(settings.GROQ_TIMEOUT, connect=settings.GROQ_CONNECT_TIMEOUT),
+        'limits': httpx.Limits(
+            max_connections=settings.GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE,
+            keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY
+        ),
+        'http2': http2,
+    }
+
+
+def _groq_http_client() -> "httpx.Client":
+    import httpx
+    return httpx.Client(**http_client_options())
+
+
+def _transcription_service():
+    from .transcription_service import AudioTranscriptionService
+    return AudioTranscriptionService()
+
+
+def _title_service():
+    from .title_suggestion_service import TitleSuggestionService
+    return TitleSuggestionService(http_client=service_registry.get('groq_http'))
+
+
+def _transcription_cache():
+    from .transcription_cache import TranscriptionResultCache
+    return TranscriptionResultCache()
+
+
+def _upload_store():
+    from .resumable_uploads import ResumableUploadStore
+    return ResumableUploadStore()
+
+
+def _storage_manager():
+    from .storage_manager import AudioStorageManager
+    return AudioStorageManager()
+
+
+def _job_queue():
+    from .transcription_jobs import TranscriptionJobQueue
+    return TranscriptionJobQueue(
+        lambda: service_registry.get('transcription'),
+        result_cache=service_registry.get('transcription_cache') if settings.TRANSCRIPTION_CACHE_ENABLED else None
+    )
+
+
+service_registry.register('groq_http', _groq_http_client)
+service_registry.register('transcription', _transcription_service)
+service_registry.register('title', _title_service)
+service_registry.register('transcription_cache', _transcription_cache)
+service_registry.register('job_queue', _job_queue)
+service_registry.register('upload_store', _upload_store)
+service_registry.register('storage', _storage_manager)
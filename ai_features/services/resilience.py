@@ -0,0 +1,357 @@
+"""
+Protection around the upstream AI providers (Groq, Gemini).
+
+Every upstream call goes through the provider's UpstreamGuard:
+- a token bucket caps the request rate (<PROVIDER>_QPS, <PROVIDER>_BURST),
+- a semaphore caps calls in flight (<PROVIDER>_CONCURRENCY),
+- a circuit breaker fails fast once CIRCUIT_FAILURE_THRESHOLD calls in a row
+  have failed, and lets a single trial call through after
+  CIRCUIT_RESET_TIMEOUT seconds.
+Callers that can't get a token or slot within <PROVIDER>_QUEUE_TIMEOUT get
+UpstreamBusy instead of piling up behind a slow upstream.
+
+SingleFlight coalesces identical in-flight work: the first caller for a key
+runs it, everyone else arriving meanwhile waits for and shares that result.
+"""
+import asyncio
+import copy
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling the provider; retry_after is a hint in seconds."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class UpstreamBusy(UpstreamUnavailable):
+    pass
+
+
+class TokenBucket:
+    """`rate` tokens per second, up to `burst` saved up. rate <= 0 means unlimited."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Take a token, returning how long to wait before using it, or None
+        (and take nothing) if that would be longer than max_wait.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            # Going negative queues this caller behind the ones already waiting
+            self._tokens -= 1
+            return wait
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> Tuple[bool, float]:
+        """(call allowed, seconds until the next trial if not)."""
+        if self.failure_threshold <= 0:
+            return True, 0.0
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True, 0.0
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True, 0.0
+            return False, max(remaining, 0.0)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self._trial_running = False
+            if self.state != self.CLOSED:
+                logger.info("Circuit closed again after a successful trial call")
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or (
+                    self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold > 0):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self.times_opened += 1
+
+    def release_trial(self) -> None:
+        """The trial call ended without a verdict (e.g. a client error); allow another."""
+        with self._lock:
+            self._trial_running = False
+
+
+class UpstreamGuard:
+    def __init__(self, name: str, qps: float = 0, burst: float = 1, concurrency: int = 0,
+                 queue_timeout: float = 10.0, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.queue_timeout = queue_timeout
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(qps, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._slots = threading.BoundedSemaphore(concurrency) if concurrency > 0 else None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.counts = {'calls': 0, 'failures': 0, 'rejected_open': 0, 'rejected_busy': 0, 'throttled': 0}
+
+    def _count(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += delta
+
+    def _admit(self) -> Tuple[float, float]:
+        """Breaker and rate checks shared by the sync and async paths. Returns (token wait, deadline)."""
+        deadline = time.monotonic() + self.queue_timeout
+        allowed, retry_after = self.breaker.allow()
+        if not allowed:
+            self._count('rejected_open')
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), retry in {retry_after:.0f}s",
+                                   retry_after=retry_after)
+        wait = self.bucket.reserve(self.queue_timeout)
+        if wait is None:
+            self.breaker.release_trial()
+            self._count('rejected_busy')
+            raise UpstreamBusy(f"{self.name} rate limit reached", retry_after=1 / self.bucket.rate)
+        if wait > 0:
+            self._count('throttled')
+        return wait, deadline
+
+    def _busy(self) -> UpstreamBusy:
+        self.breaker.release_trial()
+        self._count('rejected_busy')
+        return UpstreamBusy(f"Too many concurrent {self.name} calls", retry_after=1.0)
+
+    def _finish(self, error: Optional[BaseException], ignore: Tuple[Type[BaseException], ...]) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.counts['calls'] += 1
+            if error is not None and not isinstance(error, ignore):
+                self.counts['failures'] += 1
+        if error is None:
+            self.breaker.record_success()
+        elif isinstance(error, ignore):
+            self.breaker.release_trial()
+        else:
+            self.breaker.record_failure()
+
+    @contextmanager
+    def slot(self, ignore: Tuple[Type[BaseException], ...] = ()):
+        """
+        Wrap one upstream call. Exceptions count against the circuit breaker,
+        except those in `ignore` (e.g. 400s caused by the request itself).
+        """
+        wait, deadline = self._admit()
+        if wait:
+            time.sleep(wait)
+        if self._slots is not None and not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise self._busy()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        except BaseException as e:
+            self._finish(e, ignore)
+            raise
+        else:
+            self._finish(None, ignore)
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    @asynccontextmanager
+    async def aslot(self, ignore: Tuple[Type[BaseException], ...] = ()):
+        """slot() for coroutines; waits with asyncio.sleep so the event loop stays free."""
+        wait, deadline = self._admit()
+        if wait:
+            await asyncio.sleep(wait)
+        if self._slots is not None:
+            while not self._slots.acquire(blocking=False):
+                if time.monotonic() >= deadline:
+                    raise self._busy()
+                await asyncio.sleep(0.01)
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        except BaseException as e:
+            self._finish(e, ignore)
+            raise
+        else:
+            self._finish(None, ignore)
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self.counts)
+            in_flight = self.in_flight
+        return {
+            'circuit': self.breaker.state,
+            'consecutive_failures': self.breaker.consecutive_failures,
+            'times_opened': self.breaker.times_opened,
+            'in_flight': in_flight,
+            'qps_limit': self.bucket.rate or None,
+            'concurrency_limit': self.concurrency or None,
+            **counts,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight calls. The leader keeps the object its call
+    returned; followers each get a deep copy of a snapshot taken before they
+    are released, so every caller can annotate what it gets back.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Dict[str, Any]] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = {'done': threading.Event(), 'result': None, 'error': None}
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return copy.deepcopy(call['result'])
+
+        try:
+            result = func()
+        except BaseException as e:
+            call['error'] = e
+            raise
+        else:
+            # Snapshot before the followers wake up; the leader may mutate its own copy right away
+            call['result'] = copy.deepcopy(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call['done'].set()
+
+    async def ado(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """do() for coroutine functions; coalesces callers on the same event loop."""
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            future = self._async_calls.get(loop_key)
+            leader = future is None
+            if leader:
+                future = self._async_calls[loop_key] = asyncio.get_running_loop().create_future()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return copy.deepcopy(await asyncio.shield(future))
+
+        try:
+            result = await func()
+            future.set_result(copy.deepcopy(result))
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure isn't logged by asyncio
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                self._async_calls.pop(loop_key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'leaders': self.leaders, 'coalesced': self.coalesced, 'in_flight': len(self._calls) + len(self._async_calls)}
+
+
+_guards: Dict[str, UpstreamGuard] = {}
+_flights: Dict[str, SingleFlight] = {}
+_registry_lock = threading.Lock()
+
+
+def get_guard(provider: str) -> UpstreamGuard:
+    """Process-wide guard for 'groq' or 'gemini', configured from <PROVIDER>_* settings."""
+    with _registry_lock:
+        guard = _guards.get(provider)
+        if guard is None:
+            prefix = provider.upper()
+            guard = _guards[provider] = UpstreamGuard(
+                provider,
+                qps=getattr(settings, f'{prefix}_QPS'),
+                burst=getattr(settings, f'{prefix}_BURST'),
+                concurrency=getattr(settings, f'{prefix}_CONCURRENCY'),
+                queue_timeout=getattr(settings, f'{prefix}_QUEUE_TIMEOUT'),
+                failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.CIRCUIT_RESET_TIMEOUT
+            )
+        return guard
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    with _registry_lock:
+        flight = _flights.get(name)
+        if flight is None:
+            flight = _flights[name] = SingleFlight()
+        return flight
+
+
+def resilience_stats() -> Dict[str, Any]:
+    """Guard and coalescing stats for the health check."""
+    with _registry_lock:
+        guards, flights = dict(_guards), dict(_flights)
+    return {
+        'upstreams': {name: guard.stats() for name, guard in sorted(guards.items())},
+        'coalescing': {name: flight.stats() for name, flight in sorted(flights.items())},
+    }
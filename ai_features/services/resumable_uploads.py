@@ -0,0 +1,240 @@
+"""
+Resumable uploads: init, PUT chunks at explicit offsets, finalize.
+
+Each chunk is streamed from the request straight onto the end of a partial
+file in storage, so neither the request nor the file is ever held in
+memory, and an interrupted chunk keeps the bytes that did arrive. The
+sha256 of the upload is computed while the chunks are written; a process
+that didn't see every chunk (another worker, a restart) hashes the file
+once at finalize instead. Server processes can share an upload: writes and
+finalize hold an OS lock on the partial file, and the offset is checked
+under it.
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from ..metrics import record
+from ..models import UploadSession
+from ..upload_handlers import StoredUploadedFile, build_storage_name, hash_file
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 2 ** 10
+
+
+class UploadError(Exception):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    """The chunk doesn't start where the upload currently ends."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+class UploadIncomplete(UploadError):
+    pass
+
+
+class UploadAlreadyFinalized(UploadError):
+    pass
+
+
+class ResumableUploadStore:
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.RESUMABLE_UPLOAD_TTL if ttl is None else ttl
+        # upload_id -> (offset hashed so far, running sha256)
+        self._digests: Dict[str, Tuple[int, "hashlib._Hash"]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def create(self, file_name: str, total_size: int) -> UploadSession:
+        self.expire_stale()
+        session = UploadSession(file_name=os.path.basename(file_name)[:255], total_size=total_size)
+        session.partial_name = f"uploads/{session.upload_id.hex}.part"
+        path = default_storage.path(session.partial_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'wb').close()
+        session.save()
+        with self._lock:
+            self._digests[str(session.upload_id)] = (0, hashlib.sha256())
+        return session
+
+    def append(self, session: UploadSession, offset: int, stream: BinaryIO, length: int) -> int:
+        """
+        Write up to `length` bytes from `stream` at `offset` and return the new
+        offset. Raises OffsetMismatch if the upload isn't at `offset`. If the
+        stream ends early or fails, the bytes already written are kept and the
+        caller can resume from the returned (or HEAD-reported) offset.
+        """
+        key = str(session.upload_id)
+        partial_path = default_storage.path(session.partial_name)
+        with self._upload_lock(key), _locked_partial(partial_path) as destination:
+            # Under the file lock, so no other process is writing while the offset is checked
+            self._check_active(session, destination)
+            if offset != session.received:
+                raise OffsetMismatch(session.received)
+
+            with self._lock:
+                hashed_to, digest = self._digests.pop(key, (None, None))
+            if hashed_to != offset:
+                digest = None  # missed earlier chunks; finalize rehashes the file
+
+            written = 0
+            write_seconds = 0.0
+            error = None
+            destination.seek(offset)
+            try:
+                while written < length:
+                    data = stream.read(min(READ_SIZE, length - written))
+                    if not data:
+                        break
+                    started = time.perf_counter()
+                    if digest is not None:
+                        digest.update(data)
+                    destination.write(data)
+                    write_seconds += time.perf_counter() - started
+                    written += len(data)
+            except Exception as e:
+                # Client went away mid-chunk: keep what arrived
+                error = e
+            # Drop leftovers from an earlier attempt that wrote past this point
+            destination.truncate()
+            destination.flush()
+            record('upload_write', write_seconds)
+
+            new_offset = offset + written
+            updated = UploadSession.objects.filter(pk=session.pk, received=offset).update(
+                received=new_offset, updated_at=timezone.now()
+            )
+            if not updated:
+                # Moved on without the file lock (a partial file the other process doesn't share)
+                session.refresh_from_db(fields=['received'])
+                raise OffsetMismatch(session.received)
+            session.received = new_offset
+            if digest is not None:
+                with self._lock:
+                    self._digests[key] = (new_offset, digest)
+            if error is not None:
+                logger.info("Upload %s interrupted at offset %d: %s", key, new_offset, error)
+            return new_offset
+
+    def finalize(self, session: UploadSession) -> StoredUploadedFile:
+        """Move the complete upload into audio/ and return it as a StoredUploadedFile."""
+        key = str(session.upload_id)
+        partial_path = default_storage.path(session.partial_name)
+        with self._upload_lock(key):
+            # Waits for an append in another process; once claimed, appends that
+            # get the lock next see the upload as finalized
+            with _locked_partial(partial_path) as partial:
+                self._check_active(session, partial)
+                if session.received < session.total_size:
+                    raise UploadIncomplete(f"Received {session.received} of {session.total_size} bytes")
+                claimed = UploadSession.objects.filter(pk=session.pk, status=UploadSession.STATUS_ACTIVE).update(
+                    status=UploadSession.STATUS_COMPLETED, updated_at=timezone.now()
+                )
+                if not claimed:
+                    raise UploadAlreadyFinalized(f"Upload {key} was already finalized")
+                session.status = UploadSession.STATUS_COMPLETED
+
+            with self._lock:
+                hashed_to, digest = self._digests.pop(key, (None, None))
+                self._locks.pop(key, None)
+            os.truncate(partial_path, session.total_size)
+            if hashed_to == session.total_size:
+                content_hash = digest.hexdigest()
+            else:
+                content_hash = hash_file(partial_path)
+
+            storage_name = build_storage_name(session.file_name)
+            path = default_storage.path(storage_name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(partial_path, path)
+            return StoredUploadedFile(
+                path=path,
+                storage_name=storage_name,
+                name=session.file_name,
+                content_type=mimetypes.guess_type(session.file_name)[0] or 'application/octet-stream',
+                size=session.total_size,
+                charset=None,
+                content_hash=content_hash
+            )
+
+    def expire_stale(self, limit: int = 100) -> int:
+        """Delete active uploads untouched for longer than the TTL, with their partial files."""
+        if not self.ttl:
+            return 0
+        cutoff = timezone.now() - timedelta(seconds=self.ttl)
+        stale = list(UploadSession.objects.filter(
+            status=UploadSession.STATUS_ACTIVE, updated_at__lt=cutoff
+        )[:limit])
+        for session in stale:
+            try:
+                default_storage.delete(session.partial_name)
+            except OSError as e:
+                logger.warning("Could not remove partial upload %s: %s", session.partial_name, e)
+            with self._lock:
+                self._digests.pop(str(session.upload_id), None)
+                self._locks.pop(str(session.upload_id), None)
+        if stale:
+            UploadSession.objects.filter(pk__in=[session.pk for session in stale]).delete()
+            logger.info("Expired %d stale uploads", len(stale))
+        return len(stale)
+
+    def _upload_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def _check_active(session: UploadSession, partial: Optional[BinaryIO]) -> None:
+        """Reload the session's offset and status; raise unless it still takes chunks."""
+        session.refresh_from_db(fields=['received', 'status'])
+        if session.status != UploadSession.STATUS_ACTIVE:
+            raise UploadAlreadyFinalized(f"Upload {session.upload_id} was already finalized")
+        if partial is None:
+            raise UploadError(f"Partial file of upload {session.upload_id} is missing")
+
+
+@contextmanager
+def _locked_partial(path: str) -> Iterator[Optional[BinaryIO]]:
+    """
+    The partial file opened for writing under an exclusive lock, which other
+    processes wait for and the OS releases if the holder dies. Yields None
+    if the file is gone (finalized or expired meanwhile).
+    """
+    try:
+        partial = open(path, 'r+b')
+    except FileNotFoundError:
+        yield None
+        return
+    with partial:
+        if fcntl is not None:
+            fcntl.flock(partial.fileno(), fcntl.LOCK_EX)  # released on close
+            yield partial
+            return
+        # Windows: lock the first byte; LK_LOCK retries for up to 10 seconds
+        msvcrt.locking(partial.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield partial
+        finally:
+            partial.seek(0)
+            msvcrt.locking(partial.fileno(), msvcrt.LK_UNLCK, 1)
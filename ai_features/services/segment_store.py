@@ -0,0 +1,161 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+from ..models import TranscriptSegment
+from .audio_chunking import format_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+# External-content FTS5 table over TranscriptSegment.text, kept in sync by triggers
+FTS_TABLE = 'ai_features_segment_fts'
+SNIPPET_TOKENS = 12
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def compact_result(result: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Split a transcription result into the JSON stored on AudioTranscription
+    (segments replaced by segments_count) and the segment list for store_segments().
+    """
+    payload = dict(result)
+    segments = payload.pop('segments', None) or []
+    payload['segments_count'] = len(segments)
+    return payload, segments
+
+
+def store_segments(transcription_id: int, segments: List[Dict[str, Any]], batch_size: int = 500) -> None:
+    """Replace the segment rows of a transcription. Call inside the transaction that saves the result."""
+    TranscriptSegment.objects.filter(transcription_id=transcription_id).delete()
+    TranscriptSegment.objects.bulk_create(
+        [
+            TranscriptSegment(
+                transcription_id=transcription_id,
+                position=position,
+                start=float(segment.get('start') or 0),
+                end=float(segment.get('end') or 0),
+                speaker=str(segment.get('speaker') or '')[:100],
+                text=segment.get('text') or '',
+                confidence=float(segment.get('confidence', 1.0)),
+            )
+            for position, segment in enumerate(segments)
+        ],
+        batch_size=batch_size
+    )
+
+
+def ensure_search_index(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Create the FTS5 index and its sync triggers if they don't exist yet, and
+    fill it from the existing rows when it is new. Migration 0002 normally
+    does this; this repairs databases where it was skipped. SQLite only;
+    returns False where FTS5 or the segment table isn't available (search
+    then falls back to LIKE queries).
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+
+    table = TranscriptSegment._meta.db_table
+    if table not in connection.introspection.table_names():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+        exists = cursor.fetchone() is not None
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5(text, content='{table}', content_rowid='id')"
+            )
+        except OperationalError as e:
+            logger.warning("SQLite FTS5 not available, segment search will use LIKE: %s", e)
+            return False
+
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); "
+            f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END"
+        )
+        if not exists:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def search_segments(query: str, limit: int = 50, transcription_id: Optional[int] = None,
+                    speaker: Optional[str] = None, using: str = DEFAULT_DB_ALIAS) -> List[Dict[str, Any]]:
+    """
+    Find segments containing every word of the query, best matches first.
+    Uses the FTS5 index where present, otherwise a LIKE scan over the segment table.
+    """
+    terms = _TERM_RE.findall(query)
+    if not terms:
+        return []
+
+    if connections[using].vendor == 'sqlite':
+        try:
+            return _search_fts(terms, limit, transcription_id, speaker, using)
+        except OperationalError:
+            pass  # index not created (e.g. FTS5 missing); fall through
+
+    segments = TranscriptSegment.objects.using(using)
+    for term in terms:
+        segments = segments.filter(text__icontains=term)
+    if transcription_id is not None:
+        segments = segments.filter(transcription_id=transcription_id)
+    if speaker:
+        segments = segments.filter(speaker=speaker)
+    segments = segments.order_by('-transcription_id', 'position')[:limit]
+    return [
+        _search_hit(s.id, s.transcription_id, s.position, s.start, s.end, s.speaker, s.text, s.text)
+        for s in segments
+    ]
+
+
+def _search_fts(terms, limit, transcription_id, speaker, using):
+    table = TranscriptSegment._meta.db_table
+    # Quote every term so user input can't inject FTS5 query syntax
+    match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+    sql = [
+        f"SELECT s.id, s.transcription_id, s.position, s.start, s.\"end\", s.speaker, s.text, "
+        f"snippet({FTS_TABLE}, 0, '[', ']', '...', {SNIPPET_TOKENS}) "
+        f"FROM {FTS_TABLE} JOIN {table} AS s ON s.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s"
+    ]
+    params: List[Any] = [match]
+    if transcription_id is not None:
+        sql.append("AND s.transcription_id = %s")
+        params.append(transcription_id)
+    if speaker:
+        sql.append("AND s.speaker = %s")
+        params.append(speaker)
+    sql.append(f"ORDER BY bm25({FTS_TABLE}) LIMIT %s")
+    params.append(limit)
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(' '.join(sql), params)
+        return [_search_hit(*row) for row in cursor.fetchall()]
+
+
+def _search_hit(segment_id, transcription_id, position, start, end, speaker, text, snippet):
+    return {
+        'transcription_id': transcription_id,
+        'segment_id': segment_id,
+        'position': position,
+        'start': start,
+        'end': end,
+        'timestamp': format_timestamp(start),
+        'speaker': speaker,
+        'text': text,
+        'snippet': snippet,
+    }
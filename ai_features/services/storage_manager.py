@@ -0,0 +1,383 @@
+"""
+Lifecycle of the audio kept in MEDIA_ROOT.
+
+Audio a transcription keeps is stored content-addressed, as
+audio/<first two hex digits>/<sha256><ext>: the same recording uploaded
+twice is one file, and no directory grows past a few thousand entries.
+Uploads are streamed to a unique name first (upload_handlers.py) and only
+adopted into their content address once a transcription keeps them.
+
+A sweep removes what crashed or abandoned requests leave behind: audio files no transcription
+refers to, chunk directories from interrupted chunked transcriptions,
+partial resumable uploads and the temp_uploads/ directory older releases
+wrote to. Files younger than STORAGE_ORPHAN_GRACE are always left alone,
+since an in-flight request may still be about to reference them; hold()
+keeps an upload young while it is being transcribed. With
+AUDIO_RETENTION_DAYS set, the audio of older transcriptions is deleted as
+well; the transcripts themselves are kept.
+
+`manage.py storage_gc` reports usage and runs the same steps on demand.
+Servers can also sweep in the background, every STORAGE_SWEEP_INTERVAL
+seconds (off by default).
+"""
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import AudioTranscription, UploadSession
+from ..upload_handlers import StoredUploadedFile, hash_file
+
+logger = logging.getLogger(__name__)
+
+AUDIO_DIR = 'audio'
+UPLOADS_DIR = 'uploads'
+# Per-request temp directory of older releases, relative to the working directory
+LEGACY_TEMP_DIR = 'temp_uploads'
+CHUNK_DIR_PREFIX = 'chunks_'
+
+_CONTENT_NAME_RE = re.compile(r'^audio/[0-9a-f]{2}/[0-9a-f]{64}(\.[\w]+)?$')
+
+# Names looked up per query when checking which files are referenced
+LOOKUP_BATCH = 500
+
+
+def _empty() -> Dict[str, int]:
+    return {'files': 0, 'bytes': 0}
+
+
+def _add(totals: Dict[str, int], size: int) -> None:
+    totals['files'] += 1
+    totals['bytes'] += size
+
+
+class AudioStorageManager:
+    def __init__(self, orphan_grace: Optional[float] = None, retention_days: Optional[int] = None):
+        self.orphan_grace = settings.STORAGE_ORPHAN_GRACE if orphan_grace is None else orphan_grace
+        self.retention_days = settings.AUDIO_RETENTION_DAYS if retention_days is None else retention_days
+
+    @staticmethod
+    def content_name(content_hash: str, file_name: str) -> str:
+        extension = os.path.splitext(file_name)[1].lower()[:10]
+        if not re.fullmatch(r'\.\w+', extension):
+            extension = ''
+        return f"{AUDIO_DIR}/{content_hash[:2]}/{content_hash}{extension}"
+
+    def adopt(self, upload: StoredUploadedFile) -> str:
+        """
+        Move a stored upload to its content address and return the new storage
+        name; `upload.path` and `upload.storage_name` are updated to match. An
+        existing copy of the same content is replaced by this one (same bytes,
+        fresh mtime), so there is only ever one file per hash.
+        """
+        if not upload.content_hash or _CONTENT_NAME_RE.match(upload.storage_name):
+            return upload.storage_name
+        storage_name = self.content_name(upload.content_hash, upload.name)
+        path = default_storage.path(storage_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(upload.path, path)
+        upload.path, upload.storage_name = path, storage_name
+        return storage_name
+
+    @contextmanager
+    def hold(self, path: str) -> Iterator[None]:
+        """
+        Keep an unreferenced file from being swept while the block runs, e.g.
+        an upload being transcribed before any record points at it. Its mtime
+        is refreshed well within the orphan grace, so sweeps in other
+        processes leave it alone too.
+        """
+        stop = threading.Event()
+
+        def touch() -> None:
+            while True:
+                try:
+                    os.utime(path)
+                except OSError:
+                    return  # moved or removed
+                if stop.wait(max(1.0, self.orphan_grace / 4)):
+                    return
+
+        threading.Thread(target=touch, name='storage-hold', daemon=True).start()
+        try:
+            yield
+        finally:
+            stop.set()
+
+    # Reporting
+
+    def usage(self) -> Dict[str, Dict[str, int]]:
+        """Files and bytes per area of storage."""
+        report = defaultdict(_empty)
+        for entry in self._scan(default_storage.path(AUDIO_DIR)):
+            if entry.is_dir():
+                _add(report['chunk_dirs'], self._tree_size(entry.path))
+            else:
+                key = 'audio' if _CONTENT_NAME_RE.match(self._name(entry.path)) else 'audio_legacy_names'
+                _add(report[key], entry.stat().st_size)
+        for entry in self._scan(default_storage.path(UPLOADS_DIR)):
+            if entry.is_file():
+                _add(report['partial_uploads'], entry.stat().st_size)
+        for entry in self._scan(os.path.join(os.getcwd(), LEGACY_TEMP_DIR)):
+            if entry.is_file():
+                _add(report['legacy_temp'], entry.stat().st_size)
+        return dict(report)
+
+    # Cleanup; every step takes dry_run and returns what it removed (or would remove)
+
+    def sweep(self, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+        """Remove orphaned audio, leftover chunk directories, stale partial uploads and legacy temp files."""
+        cutoff = time.time() - self.orphan_grace
+        report = {name: _empty() for name in ('orphaned_audio', 'chunk_dirs', 'partial_uploads', 'legacy_temp')}
+
+        candidates: List[Tuple[str, int]] = []
+        for entry in self._scan(default_storage.path(AUDIO_DIR)):
+            if entry.stat().st_mtime >= cutoff:
+                continue
+            if entry.is_dir():
+                # Chunked transcriptions touch their directory as chunks finish
+                size = self._tree_size(entry.path)
+                if not dry_run:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                _add(report['chunk_dirs'], size)
+            else:
+                candidates.append((entry.path, entry.stat().st_size))
+        referenced = self._referenced_audio(self._name(path) for path, _ in candidates)
+        for path, size in candidates:
+            if self._name(path) not in referenced and self._remove(path, cutoff, dry_run):
+                _add(report['orphaned_audio'], size)
+
+        if not dry_run and settings.RESUMABLE_UPLOAD_TTL:
+            from .registry import service_registry
+            service_registry.get('upload_store').expire_stale()
+        active = set(UploadSession.objects.filter(status=UploadSession.STATUS_ACTIVE)
+                     .values_list('partial_name', flat=True))
+        for entry in self._scan(default_storage.path(UPLOADS_DIR)):
+            if entry.is_file() and self._name(entry.path) not in active:
+                size = entry.stat().st_size
+                if self._remove(entry.path, cutoff, dry_run):
+                    _add(report['partial_uploads'], size)
+
+        legacy_dir = os.path.join(os.getcwd(), LEGACY_TEMP_DIR)
+        for entry in self._scan(legacy_dir):
+            if entry.is_file():
+                size = entry.stat().st_size
+                if self._remove(entry.path, cutoff, dry_run):
+                    _add(report['legacy_temp'], size)
+        if not dry_run and os.path.isdir(legacy_dir) and not os.listdir(legacy_dir):
+            os.rmdir(legacy_dir)
+        return report
+
+    def apply_retention(self, dry_run: bool = False, days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Delete the audio of finished transcriptions older than the retention
+        period and clear their audio_file. Audio that a newer or unfinished
+        transcription still uses (same content) is kept.
+        """
+        days = self.retention_days if days is None else days
+        report = {**_empty(), 'transcriptions': 0}
+        if not days:
+            return report
+        cutoff = timezone.now() - timedelta(days=days)
+        # A file replaced by a duplicate upload just now is about to be referenced again
+        fresh_cutoff = time.time() - self.orphan_grace
+        finished = (AudioTranscription.STATUS_COMPLETED, AudioTranscription.STATUS_FAILED)
+        expired = (AudioTranscription.objects
+                   .filter(created_at__lt=cutoff, status__in=finished)
+                   .exclude(audio_file=''))
+
+        by_name: Dict[str, List[int]] = defaultdict(list)
+        for pk, name in expired.values_list('pk', 'audio_file').iterator():
+            by_name[name].append(pk)
+        names = list(by_name)
+        for offset in range(0, len(names), LOOKUP_BATCH):
+            batch = names[offset:offset + LOOKUP_BATCH]
+            in_use = set(AudioTranscription.objects
+                         .filter(audio_file__in=batch)
+                         .filter(Q(created_at__gte=cutoff) | ~Q(status__in=finished))
+                         .values_list('audio_file', flat=True))
+            for name in batch:
+                if name in in_use:
+                    continue
+                path = default_storage.path(name)
+                size = os.path.getsize(path) if os.path.isfile(path) else 0
+                if not dry_run:
+                    AudioTranscription.objects.filter(pk__in=by_name[name]).update(audio_file='')
+                if size and self._remove(path, fresh_cutoff, dry_run):
+                    _add(report, size)
+                report['transcriptions'] += len(by_name[name])
+        return report
+
+    def dedupe_existing(self, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Move audio stored before content addressing to its content address.
+        Copies of the same content are deleted and their transcriptions
+        pointed at the one remaining file.
+        """
+        report = {'moved': 0, 'duplicates': 0, 'missing': 0, 'bytes': 0}
+        finished = (AudioTranscription.STATUS_COMPLETED, AudioTranscription.STATUS_FAILED)
+        # Jobs still running read from the path they were given
+        records = (AudioTranscription.objects
+                   .filter(status__in=finished)
+                   .exclude(audio_file='')
+                   .values_list('audio_file', 'content_hash')
+                   .distinct())
+        claimed: Set[str] = set()
+        for name, content_hash in list(records.iterator()):
+            if _CONTENT_NAME_RE.match(name):
+                continue
+            path = default_storage.path(name)
+            if not os.path.isfile(path):
+                report['missing'] += 1
+                continue
+            content_hash = content_hash or hash_file(path)
+            target = self.content_name(content_hash, name)
+            target_path = default_storage.path(target)
+            duplicate = target in claimed or os.path.exists(target_path)
+            if duplicate:
+                report['duplicates'] += 1
+                report['bytes'] += os.path.getsize(path)
+            else:
+                report['moved'] += 1
+            claimed.add(target)
+            if dry_run:
+                continue
+            if duplicate:
+                os.unlink(path)
+            else:
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                os.replace(path, target_path)
+            AudioTranscription.objects.filter(audio_file=name).update(audio_file=target)
+            AudioTranscription.objects.filter(audio_file=target, content_hash='').update(content_hash=content_hash)
+        return report
+
+    # Helpers
+
+    @staticmethod
+    def _name(path: str) -> str:
+        """Storage name (as FileField stores it) for a path under MEDIA_ROOT."""
+        return os.path.relpath(path, default_storage.path('')).replace(os.sep, '/')
+
+    def _scan(self, directory: str) -> Iterator[os.DirEntry]:
+        """Files under `directory`, recursively, plus chunk directories (not descended into)."""
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name.startswith(CHUNK_DIR_PREFIX):
+                    yield entry
+                else:
+                    yield from self._scan(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+    @staticmethod
+    def _referenced_audio(names: Iterable[str]) -> Set[str]:
+        names = list(names)
+        referenced: Set[str] = set()
+        for offset in range(0, len(names), LOOKUP_BATCH):
+            referenced.update(AudioTranscription.objects
+                              .filter(audio_file__in=names[offset:offset + LOOKUP_BATCH])
+                              .values_list('audio_file', flat=True))
+        return referenced
+
+    @staticmethod
+    def _remove(path: str, cutoff: Optional[float], dry_run: bool) -> bool:
+        try:
+            # Checked again right before deleting: a duplicate upload may just have replaced it
+            if cutoff is not None and os.stat(path).st_mtime >= cutoff:
+                return False
+            if not dry_run:
+                os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning("Could not remove %s: %s", path, e)
+            return False
+
+    @staticmethod
+    def _tree_size(directory: str) -> int:
+        total = 0
+        for root, _, files in os.walk(directory):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+
+class StorageSweeper:
+    """Daemon thread running sweep() and apply_retention() every `interval` seconds."""
+
+    # Delay before the first sweep, so it stays off the startup path
+    FIRST_RUN_DELAY = 60.0
+
+    def __init__(self, manager: AudioStorageManager, interval: float):
+        self.manager = manager
+        self.interval = interval
+        self.last_run: Optional[Dict[str, Dict[str, int]]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='storage-sweeper', daemon=True)
+                self._thread.start()
+
+    def run_once(self) -> Dict[str, Dict[str, int]]:
+        close_old_connections()
+        try:
+            report = self.manager.sweep()
+            report['retention'] = self.manager.apply_retention()
+        finally:
+            close_old_connections()
+        self.last_run = report
+        files = sum(totals['files'] for totals in report.values())
+        if files:
+            logger.info("Storage sweep removed %d files (%.1f MB)", files,
+                        sum(totals['bytes'] for totals in report.values()) / (1024 * 1024))
+        return report
+
+    def _run(self) -> None:
+        time.sleep(min(self.FIRST_RUN_DELAY, self.interval))
+        while True:
+            started = time.monotonic()
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.exception("Storage sweep failed: %s", e)
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+_sweeper: Optional[StorageSweeper] = None
+_sweeper_lock = threading.Lock()
+
+
+def start_storage_sweeper() -> Optional[StorageSweeper]:
+    """Start the process-wide sweeper, unless STORAGE_SWEEP_INTERVAL is 0."""
+    global _sweeper
+    if not settings.STORAGE_SWEEP_INTERVAL:
+        return None
+    with _sweeper_lock:
+        if _sweeper is None:
+            from .registry import service_registry
+            _sweeper = StorageSweeper(service_registry.get('storage'), settings.STORAGE_SWEEP_INTERVAL)
+            _sweeper.start()
+        return _sweeper
@@ -0,0 +1,57 @@
+"""
+Content cleaning for title generation.
+
+Cleaning drops everything except word characters, whitespace and basic
+punctuation, collapses whitespace runs to single spaces and caps the result
+at a character limit: one precompiled substitution, then a split/join.
+Inputs over the limit are cleaned a window at a time and cleaning stops
+once the limit is reached, so a 1MB paste costs about as much as a post at
+the limit. The cut lands on a word boundary.
+"""
+import re
+from typing import Optional
+
+_DISALLOWED_RE = re.compile(r'[^\w\s.,!?’\'":-]+')
+
+# Smallest slice cleaned per step once the output is near the limit
+MIN_WINDOW = 16 * 1024
+
+# How far back from the limit a word boundary is looked for before cutting mid-word
+BOUNDARY_SLACK = 0.1
+
+
+def _clean(text: str) -> str:
+    """Cleaned text, keeping a single leading/trailing space if there was whitespace there."""
+    text = _DISALLOWED_RE.sub('', text)
+    # str.split() collapses every Unicode whitespace run in C, faster than a second substitution
+    words = ' '.join(text.split())
+    if not words:
+        return ' ' if text else ''
+    return (' ' if text[0].isspace() else '') + words + (' ' if text[-1].isspace() else '')
+
+
+def clean_content(text: str, max_chars: Optional[int] = None) -> str:
+    if max_chars is None or len(text) <= max_chars:
+        return ' '.join(_DISALLOWED_RE.sub('', text).split())
+
+    # Removed characters only make the output shorter than the input, so
+    # each window is sized to what's still missing; one is usually enough
+    cleaned = ''
+    position = 0
+    while position < len(text) and len(cleaned) <= max_chars:
+        end = position + max(max_chars + 1 - len(cleaned), MIN_WINDOW)
+        piece = _clean(text[position:end])
+        if not cleaned:
+            piece = piece.lstrip()
+        elif cleaned.endswith(' ') and piece.startswith(' '):
+            # A whitespace run split between two windows
+            piece = piece[1:]
+        cleaned += piece
+        position = end
+
+    if len(cleaned) <= max_chars:
+        return cleaned.rstrip()
+    cut = cleaned.rfind(' ', 0, max_chars + 1)
+    if cut < max_chars * (1 - BOUNDARY_SLACK):
+        cut = max_chars  # one very long token; cut it
+    return cleaned[:cut].rstrip()
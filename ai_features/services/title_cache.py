@@ -0,0 +1,126 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Small thread-safe in-process LRU with an optional per-entry TTL."""
+
+    def __init__(self, max_entries: int = 512, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TitleSuggestionCache:
+    """
+    Two-tier cache for title suggestions.
+
+    Tier 1 is a bounded in-process LRU, tier 2 is the Django cache alias named
+    by TITLE_CACHE_ALIAS (shared between workers when backed by Redis or
+    Memcached). Keys hash the cleaned content together with the model/prompt
+    parameters, so changing the prompt or model never serves stale titles.
+    """
+
+    KEY_PREFIX = 'title-suggestions'
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[int] = None,
+                 alias: Optional[str] = None):
+        self.ttl = settings.TITLE_CACHE_TTL if ttl is None else ttl
+        self.alias = alias or settings.TITLE_CACHE_ALIAS
+        self.local = LRUCache(
+            max_entries=settings.TITLE_CACHE_MAX_ENTRIES if max_entries is None else max_entries,
+            ttl=self.ttl or None
+        )
+        self._lock = threading.Lock()
+        self.hits = {'memory': 0, 'shared': 0}
+        self.misses = 0
+
+    def make_key(self, cleaned_content: str, params: Dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        digest.update(json.dumps(params, sort_keys=True).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(cleaned_content.encode('utf-8'))
+        return f"{self.KEY_PREFIX}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Return (value, tier) where tier is 'memory', 'shared' or None on a miss."""
+        value = self.local.get(key)
+        if value is not None:
+            self._count_hit('memory')
+            return value, 'memory'
+
+        try:
+            value = caches[self.alias].get(key)
+        except Exception as e:
+            logger.warning("Shared title cache unavailable: %s", e)
+            value = None
+
+        if value is not None:
+            # Promote so the next lookup in this process stays in memory
+            self.local.set(key, value)
+            self._count_hit('shared')
+            return value, 'shared'
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        try:
+            caches[self.alias].set(key, value, timeout=self.ttl or None)
+        except Exception as e:
+            logger.warning("Could not write to shared title cache: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.hits['memory'] + self.hits['shared']
+            lookups = hits + self.misses
+            return {
+                'memory_hits': self.hits['memory'],
+                'shared_hits': self.hits['shared'],
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'memory_entries': len(self.local),
+            }
+
+    def _count_hit(self, tier: str) -> None:
+        with self._lock:
+            self.hits[tier] += 1
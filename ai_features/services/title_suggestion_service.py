@@ -1,106 +1,571 @@
-import groq
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import weakref
+from asgiref.sync import sync_to_async
+from typing import TYPE_CHECKING, Iterator, List, Dict, Any, Optional, Tuple
 from django.conf import settings # Assuming you're using Django settings
-import re
 import os # While settings is used, os.environ.get is good for robust env var checks
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+
+from ..metrics import span
+from .extractive_summary import summarize
+from .registry import http_client_options
+from .resilience import UpstreamUnavailable, get_guard, get_single_flight
+from .text_cleaning import clean_content
+from .title_cache import TitleSuggestionCache
+
+if TYPE_CHECKING:
+    import groq
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class _GuardedStream:
+    """
+    A streamed Groq completion that holds its guard slot until it is
+    exhausted or closed, so the concurrency limit and the breaker see the
+    whole stream rather than just the request that opened it.
+    """
+
+    def __init__(self, stream, slot: ExitStack):
+        self._stream = stream
+        self._chunks = iter(stream)
+        self._slot: Optional[ExitStack] = slot
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            self.close()
+            raise
+        except BaseException:
+            # Failed mid-stream: counts against the breaker like a failed call
+            self._release(*sys.exc_info())
+            raise
+
+    def close(self) -> None:
+        """Stop the upstream generation and free the slot; safe to call more than once."""
+        self._release(None, None, None)
+
+    def _release(self, *exc_info) -> None:
+        slot, self._slot = self._slot, None
+        if slot is None:
+            return
+        try:
+            close = getattr(self._stream, 'close', None) or getattr(getattr(self._stream, 'response', None), 'close', None)
+            if close is not None:
+                close()
+        finally:
+            slot.__exit__(*exc_info)
+
 
 class TitleSuggestionService:
-    def __init__(self):
+    # Anything that changes the model output belongs here so it is part of the cache key.
+    # Bump PROMPT_VERSION whenever the prompt text in _build_messages changes.
+    MODEL_NAME = "meta-llama/llama-4-scout-17b-16e-instruct"
+    MAX_TOKENS = 150 # Enough tokens for 3 titles
+    TEMPERATURE = 0.7
+    PROMPT_VERSION = 2
+
+    def __init__(self, cache: Optional[TitleSuggestionCache] = None, http_client: Optional["httpx.Client"] = None):
+        self.cache = cache
+        if self.cache is None and settings.TITLE_CACHE_ENABLED:
+            self.cache = TitleSuggestionCache()
+
         # Initialize Groq if API key is available from Django settings
         self.groq_client = None
+        # Errors worth retrying; filled in once the groq SDK is imported below
+        self.retryable_errors: tuple = ()
+        # Errors caused by the request itself; they don't count against the circuit breaker
+        self.client_errors: tuple = ()
         # It's good practice to ensure the attribute exists and is not a placeholder/empty
-        if hasattr(settings, 'GROQ_API_KEY') and settings.GROQ_API_KEY and settings.GROQ_API_KEY != 'your-groq-api-key-here':
+        self.groq_configured = bool(
+            getattr(settings, 'GROQ_API_KEY', None) and settings.GROQ_API_KEY != 'your-groq-api-key-here'
+        )
+        # AsyncGroq clients hold an httpx.AsyncClient, which is tied to the event loop it runs on
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, groq.AsyncGroq]" = weakref.WeakKeyDictionary()
+        self._async_clients_lock = threading.Lock()
+        if self.groq_configured:
             try:
-                self.groq_client = groq.Groq(api_key=settings.GROQ_API_KEY)
-                print(" Groq client initialized successfully using Django settings.")
+                # The SDKs are imported on first use so processes that never call Groq don't load them
+                import groq
+                import httpx
+                self.retryable_errors = (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError)
+                self.client_errors = (groq.BadRequestError, groq.UnprocessableEntityError)
+                # Retries are handled by _create_completion so backoff stays rate-limit aware.
+                # The registry passes its shared pooled client; standalone use gets its own.
+                self.groq_client = groq.Groq(
+                    api_key=settings.GROQ_API_KEY,
+                    base_url=settings.GROQ_BASE_URL,
+                    max_retries=0,
+                    http_client=http_client or httpx.Client(**http_client_options())
+                )
+                logger.info("Groq client initialized successfully using Django settings.")
             except Exception as e:
-                print(f"Warning: Could not initialize Groq client: {e}")
+                logger.warning("Could not initialize Groq client: %s", e)
                 self.groq_client = None
         else:
-            print(" GROQ_API_KEY not found in Django settings or is placeholder.")
-            print(" Title generation will fail as Groq is the only method configured and its client couldn't be initialized.")
+            logger.warning("GROQ_API_KEY not found in Django settings or is placeholder; title generation is unavailable.")
     
-    def generate_title_suggestions(self, content: str) -> Dict[str, Any]:
+    def generate_title_suggestions(self, content: str, use_cache: bool = True,
+                                   cleaned_content: Optional[str] = None) -> Dict[str, Any]:
         try:
-            cleaned_content = self._clean_content(content)
+            cleaned_content, cache_key, early_result = self._prepare_generation(content, use_cache, cleaned_content)
+            if early_result is not None:
+                return early_result
+            
+            if not self.groq_client:
+                return self._client_missing_result()
             
-            if len(cleaned_content.strip()) < 30: # Adjusted minimum length slightly
+            try:
+                # Identical requests already in flight share that Groq call
+                groq_suggestions = get_single_flight('titles').do(
+                    self._flight_key(cleaned_content), lambda: self._generate_with_groq(cleaned_content)
+                )
+                logger.debug("Generated %d titles using Groq API.", len(groq_suggestions))
+            except UpstreamUnavailable as e:
+                logger.warning("Groq call skipped: %s", e)
+                return self._unavailable_result(e)
+            except Exception as e:
+                logger.error("Groq generation failed: %s", e)
                 return {
                     "success": False,
-                    "error": "Content too short for meaningful title generation via Groq API. Minimum 30 characters required.",
+                    "error": f"Groq API call failed: {e}",
                     "suggestions": []
                 }
             
-            suggestions = []
-            method_used = "none" # Default if Groq client isn't available
+            return self._finish_generation(content, cleaned_content, cache_key, groq_suggestions)
+            
+        except Exception as e:
+            logger.exception("Error in generate_title_suggestions: %s", e)
+            return {
+                "success": False,
+                "error": str(e),
+                "suggestions": []
+            }
 
-            if not self.groq_client:
-                return {
-                    "success": False,
-                    "error": "Groq API client not initialized. Please ensure GROQ_API_KEY is set correctly in your Django settings.",
-                    "suggestions": []
-                }
+    async def agenerate_title_suggestions(self, content: str, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Async variant of generate_title_suggestions for the ASGI views. The Groq
+        call is awaited on AsyncGroq, so no thread is held while it is in flight;
+        cache reads/writes (possibly a network cache) run via sync_to_async.
+        """
+        try:
+            cleaned_content, cache_key, early_result = await sync_to_async(
+                self._prepare_generation, thread_sensitive=False
+            )(content, use_cache)
+            if early_result is not None:
+                return early_result
+            
+            if not self.groq_configured:
+                return self._client_missing_result()
             
+            async def generate():
+                return self._parse_titles(await self._acreate_completion(**kwargs))
+
             try:
-                print(" Attempting title generation with Groq API...")
-                groq_suggestions = self._generate_with_groq(cleaned_content)
-                suggestions.extend(groq_suggestions)
-                method_used = "groq_api"
-                print(f" Generated {len(groq_suggestions)} titles using Groq API.")
+                if len(cleaned_content) > settings.TITLE_PROMPT_MAX_CHARS:
+                    # Summarizing a long post is CPU work; keep it off the event loop
+                    kwargs = await sync_to_async(self._completion_kwargs, thread_sensitive=False)(cleaned_content)
+                else:
+                    kwargs = self._completion_kwargs(cleaned_content)
+                groq_suggestions = await get_single_flight('titles').ado(self._flight_key(cleaned_content), generate)
+            except UpstreamUnavailable as e:
+                logger.warning("Groq call skipped: %s", e)
+                return self._unavailable_result(e)
             except Exception as e:
-                print(f" Groq generation failed: {e}")
+                logger.error("Groq generation failed: %s", e)
                 return {
                     "success": False,
                     "error": f"Groq API call failed: {e}",
                     "suggestions": []
                 }
             
-            # Ensure uniqueness and basic validity (not empty, more than one word)
-            unique_suggestions = list(dict.fromkeys(s for s in suggestions if s and len(s.split()) > 1)) 
-
-            final_suggestions = unique_suggestions[:3] # Take up to 3 suggestions from Groq
-            
-            # If Groq didn't return enough titles, we just return what we have,
-            # as fallbacks are explicitly removed.
-            if len(final_suggestions) < 3:
-                print(f"ℹ Groq API returned {len(final_suggestions)} suggestions, less than the desired 3.")
-
-            return {
-                "success": True,
-                "suggestions": final_suggestions,
-                "content_length": len(content),
-                "cleaned_content_length": len(cleaned_content),
-                "method_used": method_used
-            }
+            return await sync_to_async(self._finish_generation, thread_sensitive=False)(
+                content, cleaned_content, cache_key, groq_suggestions
+            )
             
         except Exception as e:
-            print(f"Error in generate_title_suggestions: {e}")
+            logger.exception("Error in agenerate_title_suggestions: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "suggestions": []
             }
 
+    def _prepare_generation(self, content: str, use_cache: bool, cleaned_content: Optional[str] = None):
+        """
+        Clean the content and check the cache. Returns (cleaned_content, cache_key,
+        early_result); early_result is set when no Groq call is needed.
+        """
+        if cleaned_content is None:
+            cleaned_content = self._clean_content(content)
+        
+        if len(cleaned_content.strip()) < 30: # Adjusted minimum length slightly
+            return cleaned_content, None, {
+                "success": False,
+                "error": "Content too short for meaningful title generation via Groq API. Minimum 30 characters required.",
+                "suggestions": []
+            }
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(cleaned_content, self._generation_params())
+            if use_cache:
+                cached, tier = self.cache.get(cache_key)
+                if cached is not None:
+                    return cleaned_content, cache_key, {
+                        "success": True,
+                        "suggestions": list(cached["suggestions"]),
+                        "content_length": len(content),
+                        "cleaned_content_length": len(cleaned_content),
+                        "method_used": cached["method_used"],
+                        "cached": True,
+                        "cache_tier": tier
+                    }
+        return cleaned_content, cache_key, None
+
+    def _finish_generation(self, content: str, cleaned_content: str, cache_key: Optional[str],
+                           suggestions: List[str], method_used: str = "groq_api") -> Dict[str, Any]:
+        # Ensure uniqueness and basic validity (not empty, more than one word)
+        unique_suggestions = list(dict.fromkeys(s for s in suggestions if s and len(s.split()) > 1)) 
+
+        final_suggestions = unique_suggestions[:3] # Take up to 3 suggestions from Groq
+        
+        # If Groq didn't return enough titles, we just return what we have,
+        # as fallbacks are explicitly removed.
+        if len(final_suggestions) < 3:
+            logger.info("Groq API returned %d suggestions, less than the desired 3.", len(final_suggestions))
+
+        # Only cache usable answers; an empty list should be retried next time
+        if cache_key is not None and final_suggestions:
+            self.cache.set(cache_key, {"suggestions": final_suggestions, "method_used": method_used})
+
+        return {
+            "success": True,
+            "suggestions": final_suggestions,
+            "content_length": len(content),
+            "cleaned_content_length": len(cleaned_content),
+            "method_used": method_used,
+            "cached": False,
+            "cache_tier": None
+        }
+
+    @staticmethod
+    def _unavailable_result(error: UpstreamUnavailable) -> Dict[str, Any]:
+        # retry_after tells the views to answer 503 rather than a generic failure
+        return {
+            "success": False,
+            "error": str(error),
+            "suggestions": [],
+            "retry_after": error.retry_after
+        }
+
+    @staticmethod
+    def _client_missing_result() -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": "Groq API client not initialized. Please ensure GROQ_API_KEY is set correctly in your Django settings.",
+            "suggestions": []
+        }
+
+    def generate_title_suggestions_batch(self, contents: List[str], max_concurrency: Optional[int] = None,
+                                         use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Generate titles for many contents at once.
+
+        Contents that are identical after cleaning are sent upstream once, unique
+        contents are fanned out to Groq on a bounded thread pool, and results come
+        back in input order with per-item success/error fields.
+        """
+        max_concurrency = max_concurrency or settings.TITLE_BATCH_CONCURRENCY
+
+        # Group input positions by cleaned content so duplicates share one call
+        positions: Dict[str, List[int]] = {}
+        originals: Dict[str, str] = {}
+        for index, content in enumerate(contents):
+            cleaned = self._clean_content(content)
+            positions.setdefault(cleaned, []).append(index)
+            originals.setdefault(cleaned, content)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(contents)
+        if positions:
+            workers = min(max_concurrency, len(positions))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='title-batch') as executor:
+                futures = {
+                    executor.submit(
+                        self.generate_title_suggestions, originals[cleaned], use_cache, cleaned
+                    ): cleaned
+                    for cleaned in positions
+                }
+                for future in as_completed(futures):
+                    cleaned = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"success": False, "error": str(e), "suggestions": []}
+                    for index in positions[cleaned]:
+                        item = dict(result, index=index)
+                        item["suggestions"] = list(result.get("suggestions", []))
+                        if "content_length" in item:
+                            item["content_length"] = len(contents[index])
+                        results[index] = item
+
+        failed = sum(1 for r in results if not r["success"])
+        return {
+            "success": True, # per-item failures are reported on each result
+            "results": results,
+            "total": len(contents),
+            "unique": len(positions),
+            "failed": failed
+        }
+
+    def stream_title_suggestions(self, content: str, use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of generate_title_suggestions.
+
+        Yields {"event": "title", ...} as soon as each line of the Groq stream is
+        complete and passes the same validity/uniqueness checks, followed by a
+        single {"event": "done", ...} summary (or {"event": "error", ...}).
+        """
+        cleaned_content = self._clean_content(content)
+        if len(cleaned_content.strip()) < 30:
+            yield {"event": "error", "error": "Content too short for meaningful title generation via Groq API. Minimum 30 characters required."}
+            return
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(cleaned_content, self._generation_params())
+            if use_cache:
+                cached, tier = self.cache.get(cache_key)
+                if cached is not None:
+                    for index, title in enumerate(cached["suggestions"]):
+                        yield {"event": "title", "index": index, "title": title}
+                    yield {
+                        "event": "done",
+                        "success": True,
+                        "suggestions": list(cached["suggestions"]),
+                        "content_length": len(content),
+                        "cleaned_content_length": len(cleaned_content),
+                        "method_used": cached["method_used"],
+                        "cached": True,
+                        "cache_tier": tier
+                    }
+                    return
+
+        if not self.groq_client:
+            yield {"event": "error", "error": "Groq API client not initialized. Please ensure GROQ_API_KEY is set correctly in your Django settings."}
+            return
+
+        suggestions: List[str] = []
+        stream = None
+        try:
+            stream = self._create_completion(
+                model=self.MODEL_NAME,
+                messages=self._build_messages(cleaned_content),
+                max_tokens=self.MAX_TOKENS,
+                temperature=self.TEMPERATURE,
+                n=1,
+                stream=True
+            )
+
+            buffer = ""
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                buffer += delta
+                # Emit every completed line right away; keep the partial tail buffered
+                *lines, buffer = buffer.split('\n')
+                for line in lines:
+                    title = self._accept_streamed_title(line, suggestions)
+                    if title:
+                        yield {"event": "title", "index": len(suggestions) - 1, "title": title}
+                if len(suggestions) >= 3:
+                    break
+            else:
+                title = self._accept_streamed_title(buffer, suggestions)
+                if title:
+                    yield {"event": "title", "index": len(suggestions) - 1, "title": title}
+        except Exception as e:
+            logger.error("Groq streaming failed: %s", e)
+            yield {"event": "error", "error": f"Groq API call failed: {e}", "suggestions": suggestions}
+            return
+        finally:
+            # Stop the upstream generation once we have what we need, and free the Groq slot
+            if stream is not None:
+                stream.close()
+
+        if cache_key is not None and suggestions:
+            self.cache.set(cache_key, {"suggestions": suggestions, "method_used": "groq_api_stream"})
+
+        yield {
+            "event": "done",
+            "success": True,
+            "suggestions": suggestions,
+            "content_length": len(content),
+            "cleaned_content_length": len(cleaned_content),
+            "method_used": "groq_api_stream",
+            "cached": False,
+            "cache_tier": None
+        }
+
+    def _accept_streamed_title(self, line: str, suggestions: List[str]) -> Optional[str]:
+        # Same rules as the non-streaming path: sane length, more than one word, unique, max 3
+        title = line.strip()
+        if len(suggestions) >= 3 or not title or not self._is_valid_title(title):
+            return None
+        if len(title.split()) <= 1 or title in suggestions:
+            return None
+        suggestions.append(title)
+        return title
+
+    def _create_completion(self, **kwargs):
+        """
+        Call Groq chat completions, backing off on rate limits and transient
+        server errors. Honours Retry-After when Groq sends it. Each attempt
+        goes through the Groq guard, so an open circuit or a full queue raises
+        UpstreamUnavailable instead of waiting on Groq. With stream=True the
+        slot is held until the returned stream is exhausted or closed.
+        """
+        guard = get_guard('groq')
+        attempt = 0
+        while True:
+            try:
+                if kwargs.get('stream'):
+                    with ExitStack() as stack:
+                        stack.enter_context(guard.slot(ignore=self.client_errors))
+                        with span('groq_call'):
+                            stream = self.groq_client.chat.completions.create(**kwargs)
+                        return _GuardedStream(stream, stack.pop_all())
+                with guard.slot(ignore=self.client_errors), span('groq_call'):
+                    return self.groq_client.chat.completions.create(**kwargs)
+            except self.retryable_errors as e:
+                if attempt >= settings.GROQ_MAX_RETRIES:
+                    raise
+                delay = self._backoff_delay(e, attempt)
+                attempt += 1
+                logger.warning("Groq call throttled/failed (%s), retry %d in %.1fs", type(e).__name__, attempt, delay)
+                time.sleep(delay)
+
+    async def _acreate_completion(self, **kwargs):
+        """_create_completion for AsyncGroq; same retry policy, sleeping without blocking the loop."""
+        client = self._get_async_client()
+        guard = get_guard('groq')
+        attempt = 0
+        while True:
+            try:
+                async with guard.aslot(ignore=self.client_errors):
+                    with span('groq_call'):
+                        return await client.chat.completions.create(**kwargs)
+            except self.retryable_errors as e:
+                if attempt >= settings.GROQ_MAX_RETRIES:
+                    raise
+                delay = self._backoff_delay(e, attempt)
+                attempt += 1
+                logger.warning("Groq call throttled/failed (%s), retry %d in %.1fs", type(e).__name__, attempt, delay)
+                await asyncio.sleep(delay)
+
+    def _get_async_client(self) -> "groq.AsyncGroq":
+        import groq
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                # One pooled connection set per loop; the pool size caps in-flight Groq calls
+                http_client = httpx.AsyncClient(**http_client_options())
+                client = groq.AsyncGroq(
+                    api_key=settings.GROQ_API_KEY,
+                    base_url=settings.GROQ_BASE_URL,
+                    max_retries=0,
+                    http_client=http_client
+                )
+                self._async_clients[loop] = client
+            return client
+
+    def _backoff_delay(self, error: Exception, attempt: int) -> float:
+        delay = self._retry_after(error)
+        if delay is None:
+            delay = min(settings.GROQ_BACKOFF_MAX, settings.GROQ_BACKOFF_BASE * (2 ** attempt))
+            delay *= random.uniform(0.5, 1.0) # jitter so concurrent workers don't retry in lockstep
+        return delay
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+        value = response.headers.get('retry-after')
+        try:
+            return min(float(value), settings.GROQ_BACKOFF_MAX) if value is not None else None
+        except ValueError:
+            return None
+
+    def _flight_key(self, cleaned_content: str) -> str:
+        digest = hashlib.sha256(json.dumps(self._generation_params(), sort_keys=True).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(cleaned_content.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _generation_params(self) -> Dict[str, Any]:
+        return {
+            "model": self.MODEL_NAME,
+            "max_tokens": self.MAX_TOKENS,
+            "temperature": self.TEMPERATURE,
+            "prompt_version": self.PROMPT_VERSION,
+            "prompt_max_chars": settings.TITLE_PROMPT_MAX_CHARS,
+            "long_content_mode": settings.TITLE_LONG_CONTENT_MODE
+        }
+
     def _clean_content(self, content: str) -> str:
         if not isinstance(content, str): return ""
-        content = re.sub(r'\s+', ' ', content)
-        content = re.sub(r'[^\w\s.,!?’\'":-]', '', content) # Added colon, quotes
-        
-        # Truncate for model input. Groq can handle a lot, but still good to prevent excessively huge inputs.
-        max_chars_for_processing = 8000 
-        if len(content) > max_chars_for_processing:
-            content = content[:max_chars_for_processing] + "..."
-        return content.strip()
+        with span('content_cleaning'):
+            # Long posts are condensed for the prompt later (_prompt_content); the
+            # limit only bounds the work for inputs that bypass the serializer limit
+            return clean_content(content, settings.TITLE_MAX_CONTENT_LENGTH)
 
-    def _generate_with_groq(self, content: str) -> List[str]:
-        prompt_content = content
-        # Groq's Mixtral model has a 32k context window, 8000 chars is safe for input.
-        if len(prompt_content) > 8000: 
-            prompt_content = prompt_content[:7997] + "..."
+    def _prompt_content(self, content: str) -> Tuple[str, bool]:
+        """
+        The content to put in the prompt, and whether it was condensed. Posts
+        over TITLE_PROMPT_MAX_CHARS are reduced to their key sentences locally
+        (see extractive_summary) or, with TITLE_LONG_CONTENT_MODE=truncate,
+        cut off at the limit.
+        """
+        max_chars = settings.TITLE_PROMPT_MAX_CHARS
+        if len(content) <= max_chars:
+            return content, False
+        if settings.TITLE_LONG_CONTENT_MODE == 'summarize':
+            with span('content_summary'):
+                summary = summarize(content, max_chars, settings.TITLE_SUMMARY_CHUNK_CHARS)
+            logger.debug("Condensed %d chars to %d (%d of %d sentences, %d chunks)",
+                         summary.source_chars, len(summary.text), summary.sentences_kept,
+                         summary.sentences_total, summary.chunks)
+            return summary.text, True
+        return content[:max_chars - 3] + "...", False
+
+    def _build_messages(self, content: str) -> List[Dict[str, str]]:
+        prompt_content, condensed = self._prompt_content(content)
+        source_note = (
+            "The content is a set of key sentences extracted from a longer post, in their original order.\n"
+            if condensed else ""
+        )
 
         prompt = f"""Generate exactly 3 distinct, engaging, and SEO-friendly blog post titles based on the following content.
 Each title should be between 40-70 characters.
-Return only the titles, one title per line. Do not use numbering, bullet points, or quotation marks around the titles.
+{source_note}Return only the titles, one title per line. Do not use numbering, bullet points, or quotation marks around the titles.
 
 Content:
 \"\"\"
@@ -109,20 +574,32 @@ Content:
 
 Titles:"""
         
-        response = self.groq_client.chat.completions.create(
-            model="meta-llama/llama-4-scout-17b-16e-instruct",
-            messages=[
-                {"role": "system", "content": "You are an expert copywriter specializing in crafting compelling blog post titles."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=150, # Enough tokens for 3 titles
-            temperature=0.7,
-            n=1
-        )
-        
+        return [
+            {"role": "system", "content": "You are an expert copywriter specializing in crafting compelling blog post titles."},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def _is_valid_title(title: str) -> bool:
+        # Basic sanity check for title length
+        return 5 < len(title) < 100
+
+    def _completion_kwargs(self, content: str) -> Dict[str, Any]:
+        return {
+            "model": self.MODEL_NAME,
+            "messages": self._build_messages(content),
+            "max_tokens": self.MAX_TOKENS,
+            "temperature": self.TEMPERATURE,
+            "n": 1
+        }
+
+    def _generate_with_groq(self, content: str) -> List[str]:
+        return self._parse_titles(self._create_completion(**self._completion_kwargs(content)))
+
+    def _parse_titles(self, response) -> List[str]:
         raw_titles = response.choices[0].message.content.strip()
         titles = [
             title.strip() for title in raw_titles.split('\n') 
-            if title.strip() and 5 < len(title.strip()) < 100 # Basic sanity check for title length
+            if title.strip() and self._is_valid_title(title.strip())
         ]
-        return [t for t in titles if t][:3]
\ No newline at end of file
+        return [t for t in titles if t][:3]
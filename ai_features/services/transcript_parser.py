@@ -0,0 +1,198 @@
+"""
+Parser for the diarized transcripts Gemini returns.
+
+The model is asked for "[start - end] SPEAKER: text" lines, but drifts between
+formats: HH:MM:SS or MM:SS, fractional seconds with '.' or ',', en dashes or
+"to" between the times, a single timestamp instead of a range, parentheses
+instead of brackets, **bold** speaker labels, bullets, and wrapped lines. All
+of these are recognised with precompiled regexes in a single pass over the
+lines, which can come from any iterable (no full-text split needed).
+
+With GEMINI_JSON_OUTPUT on, the model returns JSON instead and
+parse_json_transcript() reads it with one json.loads.
+"""
+import io
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .audio_chunking import format_timestamp
+
+# The lookahead stops backtracking into a partial time ("01:0" out of "01:05")
+_TIME = r'\d{1,3}(?::\d{1,2}){1,2}(?:[.,]\d+)?(?![\d:])'
+_DASH = r'(?:-|–|—|to)'
+
+# "[00:01:02.5 - 00:01:05]", "(0:01–0:05)", "00:01 to 00:05" or just "[00:01]"
+_RANGE = (
+    rf'[\[(]?\s*(?P<start>{_TIME})\s*(?:{_DASH}\s*(?P<end>{_TIME}))?\s*[\])]?'
+)
+
+# Timestamp first: "[range] SPEAKER_00: text", "[range] - Speaker 1: text".
+# The lookahead + backreference makes the range atomic (no (?>...) before 3.11)
+# so a line without a speaker can't be re-split inside it.
+_TIME_FIRST_RE = re.compile(
+    rf'^(?=(?P<range>{_RANGE}))(?P=range)\s*[-–—]?\s*(?P<speaker>[^\s\d:\[\]()\-–—][^:\[\]()]{{0,59}}?)\s*:\s*(?P<text>.*)$'
+)
+# Speaker first: "SPEAKER_00 [range]: text", "Speaker 1 (range): text"
+_SPEAKER_FIRST_RE = re.compile(
+    rf'^(?P<speaker>[^:\[\]()]{{1,60}}?)\s*[\[(]\s*(?P<start>{_TIME})\s*(?:{_DASH}\s*(?P<end>{_TIME}))?\s*[\])]\s*:\s*(?P<text>.*)$'
+)
+# The requested format exactly, tried before any clean-up as the fast path
+_CANONICAL_RE = re.compile(
+    r'^\[(?P<start>\d+:\d\d:\d\d(?:\.\d+)?) - (?P<end>\d+:\d\d:\d\d(?:\.\d+)?)\] (?P<speaker>[\w ]{1,60}?): (?P<text>.*)$'
+)
+# Timestamp without a speaker label: "[range] text"
+_TIME_ONLY_RE = re.compile(rf'^{_RANGE}\s*[-–—:]?\s*(?P<text>.+)$')
+_SPEAKER_LABEL = r'(?:speaker|spk)[\s_-]*[\w]{1,10}'
+_SPEAKER_LABEL_RE = re.compile(_SPEAKER_LABEL, re.IGNORECASE)
+# No timestamp at all, only accepted for speaker-looking labels: "SPEAKER_01: text" or a bare "Speaker: text"
+_SPEAKER_ONLY_RE = re.compile(
+    rf'^(?P<speaker>{_SPEAKER_LABEL}|speaker)\s*:\s*(?P<text>.+)$', re.IGNORECASE
+)
+# "Speakers: A, B" or "Speakers identified: ..."; a singular "Speaker:" only when
+# everything after it is a label, otherwise it is an utterance (see _is_summary)
+_SPEAKERS_SUMMARY_RE = re.compile(
+    r'^speaker(?P<plural>s)?\s*(?P<identified>identified)?\s*:\s*(?P<speakers>.+)$', re.IGNORECASE
+)
+_BULLET_RE = re.compile(r'^(?:[-*•+]|\d+[.)])\s+')
+_EMPHASIS_RE = re.compile(r'\*\*|__|(?<!\w)[*_](?=\S)|(?<=\S)[*_](?!\w)')
+_SKIP_RE = re.compile(r'^(?:#+\s|[-=*_]{3,}\s*$|```)')
+
+
+def to_seconds(value: str) -> float:
+    """'1:02:03.5', '02:03,5' or '2:03' to seconds."""
+    parts = value.replace(',', '.').split(':')
+    if len(parts) == 3:
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
+    return int(parts[0]) * 60 + float(parts[1])
+
+
+def _clean_speaker(speaker: str) -> str:
+    return speaker.strip(' *_-–—\t')
+
+
+def _summary_speakers(line: str) -> Optional[List[str]]:
+    """Speaker labels listed by a "Speakers: ..." line, or None if the line isn't one."""
+    summary = _SPEAKERS_SUMMARY_RE.match(line)
+    if summary is None:
+        return None
+    listed = [s for s in (_clean_speaker(p) for p in summary['speakers'].split(',')) if s]
+    if summary['plural'] or summary['identified']:
+        return listed
+    if listed and all(_SPEAKER_LABEL_RE.fullmatch(s) for s in listed):
+        return listed
+    return None
+
+
+def iter_segments(lines: Iterable[str], speakers: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield segments from transcript lines as they are parsed.
+
+    Lines without a timestamp continue the previous segment; a missing end time
+    is filled in from the next segment's start. Speaker labels listed in a
+    trailing "Speakers: ..." line are appended to `speakers` when given.
+    """
+    pending: Optional[Dict[str, Any]] = None
+    for raw in lines:
+        line = raw.strip()
+        if not line or _SKIP_RE.match(line):
+            continue
+        match = _CANONICAL_RE.match(line)
+        if match is not None:
+            speaker = match['speaker']
+        else:
+            line = _EMPHASIS_RE.sub('', _BULLET_RE.sub('', line, count=1)).strip()
+            match = _TIME_FIRST_RE.match(line) or _SPEAKER_FIRST_RE.match(line) or _TIME_ONLY_RE.match(line)
+            if match is not None:
+                speaker = _clean_speaker(match.groupdict().get('speaker') or '')
+        if match is not None:
+            start = to_seconds(match['start'])
+            end = to_seconds(match['end']) if match['end'] else None
+        else:
+            listed = _summary_speakers(line)
+            if listed is not None:
+                if speakers is not None:
+                    speakers.extend(listed)
+                continue
+            match = _SPEAKER_ONLY_RE.match(line)
+            if match is None:
+                if pending is not None:
+                    pending['text'] = f"{pending['text']} {line}".strip()
+                continue
+            speaker = _clean_speaker(match['speaker'])
+            # Carry on from where the previous segment stopped
+            start = 0.0 if pending is None else (pending['end'] if pending['end'] is not None else pending['start'])
+            end = None
+
+        if pending is not None:
+            if pending['end'] is None:
+                pending['end'] = max(pending['start'], start)
+            yield pending
+        pending = {
+            "start": start,
+            "end": end,
+            "text": match['text'].strip(),
+            "speaker": speaker or "UNKNOWN",
+            "confidence": 1.0 # Gemini doesn't expose confidence per segment
+        }
+
+    if pending is not None:
+        if pending['end'] is None:
+            pending['end'] = pending['start']
+        yield pending
+
+
+def _speaker_labels(segments: List[Dict[str, Any]]) -> List[str]:
+    return [speaker for speaker in dict.fromkeys(s['speaker'] for s in segments) if speaker != "UNKNOWN"]
+
+
+def parse_transcript(text: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Parse a whole transcript. Returns (segments, speaker labels in order of appearance)."""
+    listed: List[str] = []
+    segments = list(iter_segments(io.StringIO(text), listed))
+    speakers = _speaker_labels(segments)
+    return segments, speakers or list(dict.fromkeys(listed))
+
+
+# Appended to the prompt in JSON output mode
+JSON_OUTPUT_INSTRUCTIONS = (
+    "Respond with JSON only, in this shape: "
+    '{"segments": [{"start": <seconds as a number>, "end": <seconds as a number>, '
+    '"speaker": "SPEAKER_00", "text": "..."}], "speakers": ["SPEAKER_00", ...]}'
+)
+
+
+def parse_json_transcript(text: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Read a JSON-mode response. Raises ValueError if it isn't the expected JSON,
+    so callers can fall back to parse_transcript().
+    """
+    data = json.loads(text)
+    items = data.get('segments') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise ValueError("JSON transcript has no segment list")
+
+    segments = []
+    for item in items:
+        start, end = item.get('start', 0), item.get('end')
+        start = to_seconds(start) if isinstance(start, str) else float(start or 0)
+        end = start if end is None else (to_seconds(end) if isinstance(end, str) else float(end))
+        segments.append({
+            "start": start,
+            "end": end,
+            "text": str(item.get('text', '')).strip(),
+            "speaker": _clean_speaker(str(item.get('speaker') or '')) or "UNKNOWN",
+            "confidence": 1.0
+        })
+    speakers = _speaker_labels(segments)
+    return segments, speakers
+
+
+def render_transcript(segments: List[Dict[str, Any]], speakers: List[str]) -> str:
+    """Plain-text transcript in the line format, used as full_text for JSON-mode results."""
+    lines = [
+        f"[{format_timestamp(s['start'])} - {format_timestamp(s['end'])}] {s['speaker']}: {s['text']}" for s in segments
+    ]
+    if speakers:
+        lines.append(f"\nSpeakers: {', '.join(speakers)}")
+    return "\n".join(lines)
@@ -0,0 +1,300 @@
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+from django.conf import settings
+
+from ..metrics import span
+from .audio_probe import decoded_duration, probe_audio
+from .gemini_file_poller import get_file_poller
+from .resilience import UpstreamUnavailable, get_guard
+from .transcript_parser import (
+    JSON_OUTPUT_INSTRUCTIONS, parse_json_transcript, parse_transcript, render_transcript
+)
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Optional[Callable[[str, int], None]]
+
+
+def probe_duration(audio_file_path: str) -> Optional[float]:
+    with span('duration_probe'):
+        info = probe_audio(audio_file_path)
+        if info is not None:
+            return info.duration
+        # Container the header probe doesn't know, or no length in its headers; let libsndfile try
+        return decoded_duration(audio_file_path)
+
+
+def report_progress(progress_callback: ProgressCallback, phase: str, percent: int) -> None:
+    # Progress reporting must never break the transcription itself
+    if progress_callback is None:
+        return
+    try:
+        progress_callback(phase, percent)
+    except Exception as e:
+        logger.warning("Progress callback failed: %s", e)
+
+
+class TranscriptionBackend:
+    """
+    Engine that turns one audio file into the transcription result schema:
+    success, language, full_text, segments (start/end/text/speaker/confidence),
+    speakers_count and optional timings. AudioTranscriptionService handles
+    validation, chunking and the duration probe around it.
+    """
+
+    name = 'base'
+
+    @property
+    def available(self) -> bool:
+        return False
+
+    @property
+    def unavailable_reason(self) -> str:
+        return f"Transcription backend '{self.name}' is not available."
+
+    @property
+    def supports_diarization(self) -> bool:
+        return True
+
+    def transcribe(self, audio_file_path: str, progress_callback: ProgressCallback = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class GeminiBackend(TranscriptionBackend):
+    """Gemini 1.5 Pro through the Files API (upload, wait for processing, generate)."""
+
+    name = 'gemini'
+
+    def __init__(self):
+        # Configure the Gemini API client
+        if hasattr(settings, 'GOOGLE_API_KEY') and settings.GOOGLE_API_KEY:
+            try:
+                # Imported here so only processes that use Gemini pay for the SDK
+                import google.generativeai as genai
+                genai.configure(api_key=settings.GOOGLE_API_KEY)
+                self.model = genai.GenerativeModel('gemini-1.5-pro')
+                logger.info("Gemini API configured, model gemini-1.5-pro initialized.")
+            except Exception as e:
+                logger.error("Failed to configure Gemini API or load model: %s", e)
+                self.model = None
+        else:
+            logger.warning("GOOGLE_API_KEY not found in settings. Gemini API disabled.")
+            self.model = None
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None
+
+    @property
+    def unavailable_reason(self) -> str:
+        return "Gemini API model not available. Check GOOGLE_API_KEY."
+
+    def transcribe(self, audio_file_path: str, progress_callback: ProgressCallback = None) -> Dict[str, Any]:
+        import google.generativeai as genai
+        from google.api_core.exceptions import GoogleAPIError, InvalidArgument
+
+        # Bad input (e.g. an unsupported file) says nothing about Gemini's health
+        guard, ignore = get_guard('gemini'), (InvalidArgument,)
+        file_upload_handle = None
+        timings: Dict[str, float] = {}
+        try:
+            logger.debug("Uploading audio file to Gemini Files API: %s", audio_file_path)
+            report_progress(progress_callback, 'uploading', 10)
+            
+            # Step 1: Upload audio file to Gemini Files API
+            # This creates a File object that can be referenced in generateContent requests
+            with guard.slot(ignore=ignore), span('gemini_upload') as timer:
+                file = genai.upload_file(path=audio_file_path)
+            file_upload_handle = file # Keep track for deletion
+            timings["upload"] = timer.seconds
+            logger.debug("File uploaded to Gemini: %s", file.uri)
+
+            # Wait for file to become available for processing. The shared poller
+            # starts checking after a few hundred ms and backs off from there.
+            report_progress(progress_callback, 'processing', 30)
+            with span('gemini_processing_wait') as timer:
+                file = get_file_poller().wait_until_processed(file)
+            timings["processing_wait"] = timer.seconds
+            logger.debug("Gemini file %s state: %s", file.name, file.state.name)
+
+            if file.state.name != 'ACTIVE':
+                return {
+                    "success": False,
+                    "error": f"File failed to process in Gemini Files API. State: {file.state.name}",
+                    "full_text": "",
+                    "segments": [],
+                    "speakers_count": 0,
+                    "duration": 0
+                }
+            
+            # Step 2: Create the prompt for transcription and diarization
+            json_output = settings.GEMINI_JSON_OUTPUT
+            if json_output:
+                prompt_parts = [
+                    "Transcribe the following audio, including speaker diarization. ",
+                    JSON_OUTPUT_INSTRUCTIONS,
+                    file
+                ]
+                generation_config = {"response_mime_type": "application/json"}
+            else:
+                prompt_parts = [
+                    "Transcribe the following audio, including speaker diarization. ",
+                    "Write one line per segment, exactly in the form "
+                    "'[HH:MM:SS.mmm - HH:MM:SS.mmm] SPEAKER_00: text', with no other formatting. ",
+                    "Please list all identified speakers at the end of the transcription, e.g., 'Speakers: SPEAKER_00, SPEAKER_01'.",
+                    file # Pass the File object directly
+                ]
+                generation_config = None
+
+            report_progress(progress_callback, 'generating', 60)
+            with guard.slot(ignore=ignore), span('gemini_generate') as timer:
+                response = self.model.generate_content(prompt_parts, generation_config=generation_config)
+            timings["generate"] = timer.seconds
+
+            # Step 3: Parse the response
+            report_progress(progress_callback, 'parsing', 90)
+            full_text = response.text or ""
+            with span('gemini_parse'):
+                segments, speakers = self._parse_response(full_text, json_output)
+            if json_output:
+                full_text = render_transcript(segments, speakers)
+            speakers_count = len(speakers)
+            
+            # The duration is not returned by the transcription; the service fills it
+            # in from the input file
+            return {
+                "success": True,
+                "language": "auto-detected", # Gemini handles this automatically
+                "full_text": full_text,
+                "segments": segments,
+                "speakers_count": speakers_count,
+                "timings": {phase: round(seconds, 3) for phase, seconds in timings.items()}
+            }
+
+        except UpstreamUnavailable as e:
+            logger.warning("Gemini call skipped: %s", e)
+            return {
+                "success": False,
+                "error": str(e),
+                "retry_after": e.retry_after,
+                "full_text": "",
+                "segments": [],
+                "speakers_count": 0,
+                "duration": 0
+            }
+        except GoogleAPIError as e:
+            logger.error("Gemini API error: %s", e)
+            return {
+                "success": False,
+                "error": f"Gemini API error: {e}",
+                "full_text": "",
+                "segments": [],
+                "speakers_count": 0,
+                "duration": 0
+            }
+        except Exception as e:
+            logger.exception("Transcription failed: %s", e)
+            return {
+                "success": False,
+                "error": str(e),
+                "full_text": "",
+                "segments": [],
+                "speakers_count": 0,
+                "duration": 0
+            }
+        finally:
+            # Clean up the uploaded file from Gemini's Files API
+            if file_upload_handle:
+                try:
+                    genai.delete_file(file_upload_handle.name)
+                    logger.debug("Deleted uploaded file from Gemini: %s", file_upload_handle.name)
+                except Exception as e:
+                    logger.warning("Failed to delete file from Gemini: %s", e)
+
+    @staticmethod
+    def _parse_response(full_text: str, json_output: bool):
+        """Segments and speaker labels from the model output. JSON-mode output that doesn't parse is read as lines."""
+        if json_output:
+            try:
+                return parse_json_transcript(full_text)
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.warning("Gemini JSON output could not be parsed, falling back to line parsing: %s", e)
+        return parse_transcript(full_text)
+
+
+class FakeBackend(TranscriptionBackend):
+    """
+    Offline stand-in that never touches the network, so the upload/job
+    pipeline can be exercised locally. Output is deterministic per file size.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency: Optional[float] = None):
+        self.latency = settings.FAKE_TRANSCRIPTION_LATENCY if latency is None else latency
+        logger.info("Fake transcription backend enabled (%.2fs simulated latency).", self.latency)
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def transcribe(self, audio_file_path: str, progress_callback: ProgressCallback = None) -> Dict[str, Any]:
+        # Walk through the same phases as the real backend
+        timings = {}
+        for phase, timing_key, percent in (('uploading', 'upload', 10), ('processing', 'processing_wait', 30),
+                                           ('generating', 'generate', 60), ('parsing', 'parse', 90)):
+            report_progress(progress_callback, phase, percent)
+            with span(f'fake_{timing_key}') as timer:
+                time.sleep(self.latency / 4)
+            if timing_key != 'parse':
+                timings[timing_key] = round(timer.seconds, 3)
+
+        duration = probe_duration(audio_file_path) or 0.0
+        file_size = os.path.getsize(audio_file_path)
+
+        # Deterministic output: segment count depends only on the file size
+        segments = []
+        segment_count = max(1, min(20, file_size // 4096 or 1))
+        segment_length = (duration / segment_count) if duration else 5.0
+        for i in range(segment_count):
+            speaker = f"SPEAKER_{i % 2:02d}"
+            segments.append({
+                "start": round(i * segment_length, 2),
+                "end": round((i + 1) * segment_length, 2),
+                "text": f"Fake transcript line {i + 1} for {os.path.basename(audio_file_path)}.",
+                "speaker": speaker,
+                "confidence": 1.0
+            })
+
+        full_text = "\n".join(
+            f"[{s['start']:.2f} - {s['end']:.2f}] {s['speaker']}: {s['text']}" for s in segments
+        )
+
+        return {
+            "success": True,
+            "language": "auto-detected",
+            "full_text": full_text,
+            "segments": segments,
+            "speakers_count": len({s['speaker'] for s in segments}),
+            "timings": timings
+        }
+
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'fake': FakeBackend,
+}
+
+
+def create_backend(name: Optional[str] = None) -> TranscriptionBackend:
+    name = name or settings.TRANSCRIPTION_BACKEND
+    if name == 'local':
+        # Imported lazily so torch/whisper only load when this backend is selected
+        from .local_whisper_backend import LocalWhisperBackend
+        return LocalWhisperBackend()
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown TRANSCRIPTION_BACKEND '{name}'. Choose from: gemini, local, fake")
@@ -0,0 +1,122 @@
+import threading
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Case, F, Sum, When
+from django.utils import timezone
+
+from ..models import AudioTranscription, TranscriptionCacheEntry
+
+
+class TranscriptionResultCache:
+    """
+    Content-addressed cache of transcription results.
+
+    Entries are keyed on the sha256 digest of the uploaded bytes and point at
+    the AudioTranscription row holding the result, so a hit costs one indexed
+    lookup instead of a Gemini upload/process/generate cycle. Entries expire
+    after a TTL and the table is trimmed (least recently used first) to the
+    configured entry count and total audio size.
+    """
+
+    def __init__(self, ttl: Optional[int] = None, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        self.ttl = settings.TRANSCRIPTION_CACHE_TTL if ttl is None else ttl
+        self.max_entries = settings.TRANSCRIPTION_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = settings.TRANSCRIPTION_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, digest: str) -> Optional[AudioTranscription]:
+        entry = (
+            TranscriptionCacheEntry.objects
+            .select_related('transcription')
+            .filter(digest=digest, transcription__status=AudioTranscription.STATUS_COMPLETED)
+            .first()
+        )
+
+        if entry is not None and self._is_expired(entry):
+            entry.delete()
+            self._count_eviction()
+            entry = None
+
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        TranscriptionCacheEntry.objects.filter(pk=entry.pk).update(
+            hit_count=F('hit_count') + 1,
+            last_hit_at=timezone.now()
+        )
+        with self._lock:
+            self.hits += 1
+        return entry.transcription
+
+    def store(self, digest: str, record: AudioTranscription, file_size: int = 0) -> None:
+        if not digest:
+            return
+        # Plain UPDATE, then INSERT: update_or_create reads before writing inside one
+        # transaction, which SQLite rejects outright ("database is locked") when
+        # another writer is active, instead of waiting for the lock
+        updated = TranscriptionCacheEntry.objects.filter(digest=digest).update(transcription=record, file_size=file_size)
+        if not updated:
+            try:
+                TranscriptionCacheEntry.objects.create(digest=digest, transcription=record, file_size=file_size)
+            except IntegrityError:
+                # Stored concurrently by another request for the same upload
+                TranscriptionCacheEntry.objects.filter(digest=digest).update(transcription=record, file_size=file_size)
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then trim to the entry/size limits. Returns rows removed."""
+        removed = 0
+        if self.ttl:
+            cutoff = timezone.now() - timedelta(seconds=self.ttl)
+            removed += TranscriptionCacheEntry.objects.filter(created_at__lt=cutoff).delete()[0]
+
+        # Least recently used first: last hit, or creation time if never hit
+        lru_order = Case(When(last_hit_at__isnull=True, then=F('created_at')), default=F('last_hit_at'))
+
+        if self.max_entries:
+            overflow = TranscriptionCacheEntry.objects.count() - self.max_entries
+            if overflow > 0:
+                stale_ids = list(
+                    TranscriptionCacheEntry.objects.order_by(lru_order).values_list('pk', flat=True)[:overflow]
+                )
+                removed += TranscriptionCacheEntry.objects.filter(pk__in=stale_ids).delete()[0]
+
+        if self.max_bytes:
+            total = TranscriptionCacheEntry.objects.aggregate(total=Sum('file_size'))['total'] or 0
+            if total > self.max_bytes:
+                stale_ids = []
+                for pk, size in TranscriptionCacheEntry.objects.order_by(lru_order).values_list('pk', 'file_size'):
+                    if total <= self.max_bytes:
+                        break
+                    stale_ids.append(pk)
+                    total -= size
+                removed += TranscriptionCacheEntry.objects.filter(pk__in=stale_ids).delete()[0]
+
+        if removed:
+            self._count_eviction(removed)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _is_expired(self, entry: TranscriptionCacheEntry) -> bool:
+        return bool(self.ttl) and entry.created_at < timezone.now() - timedelta(seconds=self.ttl)
+
+    def _count_eviction(self, count: int = 1) -> None:
+        with self._lock:
+            self.evictions += count
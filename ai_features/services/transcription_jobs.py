@@ -0,0 +1,200 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Callable, List, Optional, Set, Tuple
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..metrics import span
+from ..models import AudioTranscription
+from .segment_store import compact_result, store_segments
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionJobQueue:
+    """
+    Runs transcriptions on a local worker pool so upload requests can return
+    immediately. Job state and the final result live on AudioTranscription.
+
+    Jobs only live in the process that queued them. A monitor thread bumps
+    updated_at on this process's unfinished jobs; pending or processing rows
+    nobody has touched for TRANSCRIPTION_JOB_STALE_AFTER seconds belong to a
+    process that died, and are queued again here; they are failed instead if
+    their audio is gone or they have already been started
+    TRANSCRIPTION_JOB_MAX_ATTEMPTS times.
+    """
+
+    UNFINISHED = (AudioTranscription.STATUS_PENDING, AudioTranscription.STATUS_PROCESSING)
+
+    def __init__(self, service_factory: Callable[[], Any], max_workers: Optional[int] = None,
+                 result_cache=None):
+        self.service_factory = service_factory
+        self.result_cache = result_cache
+        self.max_workers = max_workers or settings.TRANSCRIPTION_JOB_WORKERS
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='transcription-job'
+        )
+        self.stale_after = settings.TRANSCRIPTION_JOB_STALE_AFTER
+        self.max_attempts = settings.TRANSCRIPTION_JOB_MAX_ATTEMPTS
+        # Jobs queued or running in this process
+        self._active: Set[int] = set()
+        self._lock = threading.Lock()
+        self._monitor: Optional[threading.Thread] = None
+        logger.info("Transcription job queue started with %d workers.", self.max_workers)
+
+    def submit(self, transcription_id: int, audio_file_path: str, duration: Optional[float] = None,
+               content_hash: Optional[str] = None) -> Future:
+        with self._lock:
+            self._active.add(transcription_id)
+        self.start_monitor()
+        return self._executor.submit(self._run, transcription_id, audio_file_path, duration, content_hash)
+
+    def start_monitor(self) -> None:
+        """Start the heartbeat/recovery thread (once); a no-op with TRANSCRIPTION_JOB_STALE_AFTER=0."""
+        if not self.stale_after:
+            return
+        with self._lock:
+            if self._monitor is None:
+                self._monitor = threading.Thread(target=self._monitor_loop, name='transcription-job-monitor', daemon=True)
+                self._monitor.start()
+
+    def _monitor_loop(self) -> None:
+        while True:
+            close_old_connections()
+            try:
+                self.heartbeat()
+                self.recover_orphaned()
+            except Exception as e:
+                logger.exception("Transcription job monitor failed: %s", e)
+            finally:
+                close_old_connections()
+            time.sleep(self.stale_after / 3)
+
+    def heartbeat(self) -> None:
+        """Mark this process's unfinished jobs as alive."""
+        with self._lock:
+            active = list(self._active)
+        if active:
+            (AudioTranscription.objects
+             .filter(pk__in=active, status__in=self.UNFINISHED)
+             .update(updated_at=timezone.now()))
+
+    def recover_orphaned(self) -> int:
+        """
+        Re-queue jobs whose process died (no heartbeat for stale_after seconds).
+        Each row is claimed with a conditional update, so with several
+        processes only one of them takes it. Returns the number re-queued.
+        """
+        requeued = 0
+        for pk, updated_at, name, duration, content_hash, attempts in self._stale_jobs():
+            claimed = (AudioTranscription.objects
+                       .filter(pk=pk, updated_at=updated_at, status__in=self.UNFINISHED)
+                       .update(status=AudioTranscription.STATUS_PENDING, progress=0, updated_at=timezone.now()))
+            if not claimed:
+                continue  # another process got there first
+            if self.max_attempts and attempts >= self.max_attempts:
+                logger.warning("Transcription job %s was interrupted %d times; giving up", pk, attempts)
+                self._update(
+                    pk,
+                    status=AudioTranscription.STATUS_FAILED,
+                    progress=100,
+                    error=f'Transcription was interrupted {attempts} times and will not be retried'
+                )
+                continue
+            path = default_storage.path(name) if name else None
+            if path is None or not os.path.isfile(path):
+                logger.warning("Transcription job %s was interrupted and its audio is gone", pk)
+                self._update(
+                    pk,
+                    status=AudioTranscription.STATUS_FAILED,
+                    progress=100,
+                    error='Transcription was interrupted and the audio file is no longer available'
+                )
+                continue
+            logger.info("Re-queueing interrupted transcription job %s", pk)
+            self.submit(pk, path, duration=duration, content_hash=content_hash or None)
+            requeued += 1
+        return requeued
+
+    def _stale_jobs(self) -> List[Tuple]:
+        """Unfinished jobs of other processes with no heartbeat for stale_after seconds."""
+        cutoff = timezone.now() - timedelta(seconds=self.stale_after)
+        with self._lock:
+            active = list(self._active)
+        return list(AudioTranscription.objects
+                    .filter(status__in=self.UNFINISHED, updated_at__lt=cutoff)
+                    .exclude(pk__in=active)
+                    .values_list('pk', 'updated_at', 'audio_file', 'duration', 'content_hash', 'attempts'))
+
+    def _run(self, transcription_id: int, audio_file_path: str, duration: Optional[float] = None,
+             content_hash: Optional[str] = None) -> None:
+        # Worker threads get their own DB connection; drop stale ones up front
+        close_old_connections()
+        try:
+            self._update(transcription_id, status=AudioTranscription.STATUS_PROCESSING, progress=5,
+                         attempts=F('attempts') + 1)
+
+            def report(phase, percent):
+                self._update(transcription_id, progress=percent)
+
+            service = self.service_factory()
+            result = service.transcribe_with_diarization(
+                audio_file_path, progress_callback=report, duration=duration, coalesce_key=content_hash
+            )
+
+            if result.get('success'):
+                result['transcription_id'] = transcription_id
+                stored, segments = compact_result(result)
+                with span('db_save'), transaction.atomic():
+                    self._update(
+                        transcription_id,
+                        status=AudioTranscription.STATUS_COMPLETED,
+                        progress=100,
+                        transcription=stored
+                    )
+                    store_segments(transcription_id, segments)
+                self._store_in_cache(transcription_id, audio_file_path)
+            else:
+                self._update(
+                    transcription_id,
+                    status=AudioTranscription.STATUS_FAILED,
+                    progress=100,
+                    error=result.get('error', 'Transcription failed'),
+                    transcription=result
+                )
+        except Exception as e:
+            logger.exception("Transcription job %s failed: %s", transcription_id, e)
+            self._update(
+                transcription_id,
+                status=AudioTranscription.STATUS_FAILED,
+                progress=100,
+                error=str(e)
+            )
+        finally:
+            with self._lock:
+                self._active.discard(transcription_id)
+            close_old_connections()
+
+    def _store_in_cache(self, transcription_id: int, audio_file_path: str) -> None:
+        if self.result_cache is None:
+            return
+        try:
+            record = AudioTranscription.objects.get(pk=transcription_id)
+            if record.content_hash:
+                self.result_cache.store(record.content_hash, record, os.path.getsize(audio_file_path))
+        except Exception as e:
+            logger.warning("Could not cache transcription %s: %s", transcription_id, e)
+
+    @staticmethod
+    def _update(transcription_id: int, **fields) -> None:
+        # queryset.update() skips auto_now, so bump updated_at explicitly
+        fields['updated_at'] = timezone.now()
+        AudioTranscription.objects.filter(pk=transcription_id).update(**fields)
@@ -1,35 +1,55 @@
-import google.generativeai as genai
+import logging
 import os
-import time
-from typing import Dict, List, Any
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
 from django.conf import settings # Assuming Django settings for API key
 
+from ..metrics import span
+from .audio_chunking import merge_chunk_results, split_audio
+from .resilience import get_single_flight
+from .transcription_backends import TranscriptionBackend, create_backend, report_progress, probe_duration
+
+logger = logging.getLogger(__name__)
+
 class AudioTranscriptionService:
-    def __init__(self):
-        # Configure the Gemini API client
-        if hasattr(settings, 'GOOGLE_API_KEY') and settings.GOOGLE_API_KEY:
-            try:
-                genai.configure(api_key=settings.GOOGLE_API_KEY)
-                print(" Gemini API configured successfully.")
-                self.model = genai.GenerativeModel('gemini-1.5-pro')
-                print(" Gemini 2.5 Pro model initialized.")
-            except Exception as e:
-                print(f" Failed to configure Gemini API or load model: {e}")
-                self.model = None
-        else:
-            print(" GOOGLE_API_KEY not found in settings. Gemini API disabled.")
-            self.model = None
-        
-
-    def transcribe_with_diarization(self, audio_file_path: str) -> Dict[str, Any]:
+    def __init__(self, backend: Optional[TranscriptionBackend] = None):
+        # The engine is pluggable: TRANSCRIPTION_BACKEND selects gemini, local or fake
+        self.backend = backend or create_backend()
+        logger.info("Transcription backend: %s", self.backend.name)
+
+    def transcribe_with_diarization(self, audio_file_path: str,
+                                    progress_callback: Optional[Callable[[str, int], None]] = None,
+                                    chunked: Optional[bool] = None,
+                                    duration: Optional[float] = None,
+                                    coalesce_key: Optional[str] = None) -> Dict[str, Any]:
         """
-        Transcribe audio file with speaker diarization using the Gemini API.
-        This version uses the Files API for better handling of larger audio.
+        Transcribe audio file with speaker diarization using the configured backend.
+
+        progress_callback, if given, is called as progress_callback(phase, percent)
+        as the request moves through upload, processing and generation.
+
+        Recordings longer than TRANSCRIPTION_CHUNK_THRESHOLD seconds (or any
+        recording when chunked=True) are split and transcribed in parallel,
+        see transcribe_chunked. Pass duration when the upload was already
+        probed to skip probing it again.
+
+        Calls with the same coalesce_key (the audio's content hash) while one
+        is already running wait for and share that result instead of
+        transcribing the same audio again; only the first caller gets
+        progress callbacks.
         """
-        if not self.model:
+        if coalesce_key is not None:
+            return get_single_flight('transcriptions').do(
+                (coalesce_key, chunked),
+                lambda: self.transcribe_with_diarization(audio_file_path, progress_callback, chunked, duration)
+            )
+
+        if not self.backend.available:
             return {
                 "success": False,
-                "error": "Gemini API model not available. Check GOOGLE_API_KEY.",
+                "error": self.backend.unavailable_reason,
                 "full_text": "",
                 "segments": [],
                 "speakers_count": 0,
@@ -47,143 +67,91 @@ class AudioTranscriptionService:
                 "duration": 0
             }
 
-        file_upload_handle = None
+        if chunked is None:
+            threshold = settings.TRANSCRIPTION_CHUNK_THRESHOLD
+            if threshold and duration is None:
+                duration = self._probe_duration(audio_file_path)
+            chunked = bool(threshold and duration and duration > threshold)
+        if chunked:
+            return self.transcribe_chunked(audio_file_path, progress_callback=progress_callback)
+
+        result = self.backend.transcribe(audio_file_path, progress_callback)
+        if result.get("success") and "duration" not in result:
+            # The duration is not returned by the engines, but is known from the input file
+            result["duration"] = duration if duration is not None else (self._probe_duration(audio_file_path) or 0)
+        return result
+
+    def transcribe_chunked(self, audio_file_path: str,
+                           progress_callback: Optional[Callable[[str, int], None]] = None,
+                           chunk_seconds: Optional[float] = None,
+                           overlap_seconds: Optional[float] = None,
+                           max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Split the recording into overlapping windows, transcribe them in parallel
+        and stitch the segments back together on the global timeline, so wall
+        clock time is roughly that of a single chunk.
+        """
+        chunk_seconds = chunk_seconds or settings.TRANSCRIPTION_CHUNK_SECONDS
+        overlap_seconds = settings.TRANSCRIPTION_CHUNK_OVERLAP if overlap_seconds is None else overlap_seconds
+        max_workers = max_workers or settings.TRANSCRIPTION_CHUNK_WORKERS
+
+        chunk_dir = tempfile.mkdtemp(prefix='chunks_', dir=os.path.dirname(os.path.abspath(audio_file_path)))
         try:
-            print(f" Uploading audio file to Gemini Files API: {audio_file_path}")
-            
-            # Step 1: Upload audio file to Gemini Files API
-            # This creates a File object that can be referenced in generateContent requests
-            file = genai.upload_file(path=audio_file_path)
-            file_upload_handle = file # Keep track for deletion
-            print(f" File uploaded to Gemini: {file.uri}")
-
-            # Wait for file to become available for processing
-            print(" Waiting for file processing...")
-            while file.state.name == 'PROCESSING':
-                print('.', end='', flush=True)
-                time.sleep(10)
-                file = genai.get_file(file.name)
-            print(f"\n File state: {file.state.name}")
-
-            if file.state.name != 'ACTIVE':
+            try:
+                with span('audio_split'):
+                    chunks = split_audio(audio_file_path, chunk_dir, chunk_seconds, overlap_seconds)
+            except Exception as e:
+                logger.warning("Could not split audio (%s), transcribing in one request", e)
+                return self.transcribe_with_diarization(audio_file_path, progress_callback, chunked=False)
+
+            if len(chunks) <= 1:
+                return self.transcribe_with_diarization(audio_file_path, progress_callback, chunked=False)
+
+            logger.info("Transcribing %d chunks of %.0fs with %d workers", len(chunks), chunk_seconds, max_workers)
+            report_progress(progress_callback, 'uploading', 10)
+
+            results: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+            completed = 0
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)),
+                                    thread_name_prefix='transcription-chunk') as executor:
+                futures = {
+                    executor.submit(self.transcribe_with_diarization, chunk.path, None, False): chunk
+                    for chunk in chunks
+                }
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        results[chunk.index] = future.result()
+                    except Exception as e:
+                        results[chunk.index] = {"success": False, "error": str(e)}
+                    completed += 1
+                    # Fresh mtime tells the storage sweeper this directory is still in use
+                    os.utime(chunk_dir)
+                    report_progress(progress_callback, 'generating', 10 + int(80 * completed / len(chunks)))
+
+            failed = [chunk.index for chunk in chunks if not results[chunk.index].get("success")]
+            if failed:
+                errors = "; ".join(f"chunk {i}: {results[i].get('error', 'unknown error')}" for i in failed)
                 return {
                     "success": False,
-                    "error": f"File failed to process in Gemini Files API. State: {file.state.name}",
+                    "error": f"{len(failed)} of {len(chunks)} chunks failed to transcribe ({errors})",
                     "full_text": "",
                     "segments": [],
                     "speakers_count": 0,
-                    "duration": 0
+                    "duration": chunks[-1].end
                 }
-            
-            # Step 2: Create the prompt for transcription and diarization
-            prompt_parts = [
-                "Transcribe the following audio, including speaker diarization. ",
-                "Output should be structured with timestamps and speaker labels for each segment. ",
-                "Please list all identified speakers at the end of the transcription, e.g., 'Speakers: SPEAKER_00, SPEAKER_01'.",
-                file # Pass the File object directly
-            ]
-
-            print(" Sending transcription request to Gemini...")
-            response = self.model.generate_content(prompt_parts)
-            print(" Transcription response received.")
-
-            # Step 3: Parse the response
-            full_text = ""
-            segments = []
-            speakers_count = 0
-            
-            # Access the text from the response
-            if response.text:
-                full_text = response.text
-            
-
-                speaker_labels = set()
-                
-                # Split by lines and process segments
-                for line in full_text.split('\n'):
-                    line = line.strip()
-                    if line.startswith('[') and ']' in line and ':' in line:
-                        try:
-                            # Extract time and speaker
-                            time_speaker_part, text_part = line.split(':', 1)
-                            
-                            # Extract times
-                            time_range_str = time_speaker_part[1:time_speaker_part.find(']')]
-                            start_str, end_str = time_range_str.split(' - ')
-                            
-                            # Convert MM:SS to seconds (or HH:MM:SS)
-                            start_time = sum(float(x) * 60 ** i for i, x in enumerate(reversed(start_str.split(':'))))
-                            end_time = sum(float(x) * 60 ** i for i, x in enumerate(reversed(end_str.split(':'))))
-                            
-                            # Extract speaker
-                            speaker = time_speaker_part[time_speaker_part.find(']') + 2:].strip()
-                            
-                            segments.append({
-                                "start": start_time,
-                                "end": end_time,
-                                "text": text_part.strip(),
-                                "speaker": speaker,
-                                "confidence": 1.0 # Gemini doesn't expose confidence per segment directly like Whisper
-                            })
-                            speaker_labels.add(speaker)
-                        except Exception as e:
-                            print(f"Warning: Could not parse line '{line}'. Error: {e}")
-                            # If parsing fails, just add as a simple text segment
-                            segments.append({
-                                "start": 0, # Placeholder
-                                "end": 0,   # Placeholder
-                                "text": line,
-                                "speaker": "UNKNOWN",
-                                "confidence": 0.0
-                            })
-            
-                speakers_count = len(speaker_labels)
-            
-            # The duration is not directly returned by the transcription, but is from the input file
-            # You might need to retrieve this if not already known, e.g., using a library like soundfile or librosa
-            # For now, we'll assume the input audio's duration can be calculated.
-            import soundfile as sf
-            audio_info = sf.info(audio_file_path)
-            duration = audio_info.duration
-
-
-            return {
-                "success": True,
-                "language": "auto-detected", # Gemini handles this automatically
-                "full_text": full_text,
-                "segments": segments,
-                "speakers_count": speakers_count,
-                "duration": duration
-            }
 
-        except genai.APIError as e:
-            print(f"Gemini API error: {e.args[0]}")
-            return {
-                "success": False,
-                "error": f"Gemini API error: {e.args[0]}",
-                "full_text": "",
-                "segments": [],
-                "speakers_count": 0,
-                "duration": 0
-            }
-        except Exception as e:
-            print(f"Transcription failed: {e}")
-            import traceback
-            traceback.print_exc()
-            return {
-                "success": False,
-                "error": str(e),
-                "full_text": "",
-                "segments": [],
-                "speakers_count": 0,
-                "duration": 0
-            }
+            report_progress(progress_callback, 'parsing', 90)
+            merged = merge_chunk_results(chunks, results, overlap_seconds)
+            # Chunks run in parallel, so the slowest chunk bounds each phase
+            merged["timings"] = {}
+            for result in results:
+                for phase, seconds in result.get("timings", {}).items():
+                    merged["timings"][phase] = max(merged["timings"].get(phase, 0), seconds)
+            return merged
         finally:
-            # Clean up the uploaded file from Gemini's Files API
-            if file_upload_handle:
-                try:
-                    print(f" Deleting uploaded file from Gemini: {file_upload_handle.name}")
-                    genai.delete_file(file_upload_handle.name)
-                    print("File deleted.")
-                except Exception as e:
-                    print(f"Warning: Failed to delete file from Gemini: {e}")
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+
+    @staticmethod
+    def _probe_duration(audio_file_path: str) -> Optional[float]:
+        return probe_duration(audio_file_path)
@@ -0,0 +1,193 @@
+"""
+WebSocket endpoint for live transcription (ASGI only, routed in darwix_ai/asgi.py).
+
+    ws://host/ws/transcribe/?encoding=pcm_s16le&sample_rate=16000&channels=1
+
+The client sends audio as binary messages: raw little-endian 16-bit PCM in
+any message size, or one Opus packet per message with encoding=opus. A
+text message {"type": "stop"} ends the stream; the server then transcribes
+what is left, sends "done" and closes. Server messages are JSON:
+
+    {"type": "ready", "sample_rate": 16000, ...}
+    {"type": "segments", "window": 0, "start": 0.0, "end": 2.4, "segments": [...], "latency_ms": 310}
+    {"type": "error", "window": 3, "error": "...", "retry_after": 12}
+    {"type": "done", "windows": 5, "duration": 31.2}
+
+Segments carry start/end on the stream's timeline, text and speaker. A
+window's results arrive latency_ms after its last audio frame came in;
+windows are transcribed concurrently, so they can arrive out of order.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+from urllib.parse import parse_qs
+
+from django.conf import settings
+
+from .async_views import run_blocking
+from .metrics import record
+from .services.live_transcription import (
+    FRAME_MS, OpusDecoder, PcmDecoder, SpeechWindow, StreamFormatError, VadSegmenter, transcribe_window
+)
+from .views import get_transcription_service
+
+logger = logging.getLogger(__name__)
+
+ENCODINGS = ('pcm_s16le', 'opus')
+# Close codes: 1003 unsupported data, 1008 policy violation (limits), 4404 no such endpoint
+CLOSE_UNSUPPORTED = 1003
+CLOSE_LIMIT = 1008
+CLOSE_NOT_FOUND = 4404
+
+
+def _stream_decoder(params: Dict[str, list]):
+    """(decoder, sample_rate) for the connection's query parameters."""
+    def param(name, default):
+        return params.get(name, [default])[0]
+
+    encoding = param('encoding', 'pcm_s16le')
+    if encoding not in ENCODINGS:
+        raise StreamFormatError(f"encoding must be one of {', '.join(ENCODINGS)}")
+    try:
+        sample_rate = int(param('sample_rate', settings.STREAM_DEFAULT_SAMPLE_RATE))
+        channels = int(param('channels', 1))
+    except ValueError:
+        raise StreamFormatError("sample_rate and channels must be integers")
+    if not 8000 <= sample_rate <= 48000:
+        raise StreamFormatError("sample_rate must be between 8000 and 48000")
+    if encoding == 'opus':
+        return OpusDecoder(sample_rate, channels), sample_rate
+    return PcmDecoder(channels), sample_rate
+
+
+async def _send_json(send, payload: Dict[str, Any]) -> bool:
+    try:
+        await send({'type': 'websocket.send', 'text': json.dumps(payload)})
+        return True
+    except Exception as e:
+        # The client went away while a window was being transcribed
+        logger.debug("Could not send to live transcription client: %s", e)
+        return False
+
+
+async def _reject(send, error: str, code: int) -> None:
+    # Accept first, so the client can read why it is being closed
+    await send({'type': 'websocket.accept'})
+    await _send_json(send, {'type': 'error', 'error': error})
+    await send({'type': 'websocket.close', 'code': code})
+
+
+async def transcribe_stream(scope, receive, send) -> None:
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    try:
+        decoder, sample_rate = _stream_decoder(parse_qs(scope.get('query_string', b'').decode('latin-1')))
+    except StreamFormatError as e:
+        await _reject(send, str(e), CLOSE_UNSUPPORTED)
+        return
+
+    # Building the service may import the backend's SDK; keep that off the event loop
+    service = await run_blocking(get_transcription_service)
+    segmenter = VadSegmenter(sample_rate)
+    # Reading pauses while this many windows wait for the backend, which pushes back on the client
+    pending = asyncio.Semaphore(settings.STREAM_MAX_PENDING_WINDOWS)
+    tasks: Set[asyncio.Future] = set()
+
+    async def transcribe(window: SpeechWindow, closed_at: float) -> None:
+        try:
+            result = await run_blocking(transcribe_window, service, window)
+        except Exception as e:
+            logger.exception("Live transcription of window %d failed: %s", window.index, e)
+            result = {'success': False, 'error': str(e)}
+        finally:
+            pending.release()
+        latency = time.perf_counter() - closed_at
+        record('stream_window_latency', latency)
+        if result['success']:
+            payload = {'type': 'segments', 'window': window.index, 'start': round(window.start, 2),
+                       'end': round(window.end, 2), 'segments': result['segments']}
+        else:
+            payload = {'type': 'error', 'window': window.index, 'error': result['error']}
+            if result.get('retry_after') is not None:
+                payload['retry_after'] = result['retry_after']
+        payload['latency_ms'] = round(latency * 1000)
+        await _send_json(send, payload)
+
+    async def submit(window: Optional[SpeechWindow]) -> None:
+        if window is None:
+            return
+        closed_at = time.perf_counter()
+        await pending.acquire()
+        task = asyncio.ensure_future(transcribe(window, closed_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await send({'type': 'websocket.accept'})
+    await _send_json(send, {
+        'type': 'ready',
+        'sample_rate': sample_rate,
+        'frame_ms': FRAME_MS,
+        'silence_ms': settings.STREAM_SILENCE_MS,
+        'max_window_seconds': settings.STREAM_MAX_WINDOW_SECONDS,
+        'backend': service.backend.name,
+    })
+
+    max_duration = settings.TRANSCRIPTION_MAX_DURATION
+    close_code = 1000
+    try:
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                return
+            if message.get('bytes') is not None:
+                try:
+                    pcm = decoder.decode(message['bytes'])
+                except StreamFormatError as e:
+                    await _send_json(send, {'type': 'error', 'error': str(e)})
+                    close_code = CLOSE_UNSUPPORTED
+                    break
+                for window in segmenter.feed(pcm):
+                    await submit(window)
+                if max_duration and segmenter.seconds_seen > max_duration:
+                    await _send_json(send, {'type': 'error',
+                                            'error': f'Stream too long. Maximum is {max_duration:.0f} seconds'})
+                    close_code = CLOSE_LIMIT
+                    break
+            elif message.get('text') is not None:
+                try:
+                    control = json.loads(message['text'])
+                except ValueError:
+                    control = None
+                if isinstance(control, dict) and control.get('type') == 'stop':
+                    break
+                await _send_json(send, {'type': 'error', 'error': 'Expected audio or {"type": "stop"}'})
+
+        # End of stream: transcribe the open window and wait for every result
+        await submit(segmenter.flush())
+        if tasks:
+            await asyncio.wait(set(tasks))
+        await _send_json(send, {'type': 'done', 'windows': segmenter.windows_emitted,
+                                'duration': round(segmenter.seconds_seen, 2)})
+        await send({'type': 'websocket.close', 'code': close_code})
+    finally:
+        # Client disconnected mid-stream: nobody is waiting for the remaining windows
+        for task in list(tasks):
+            task.cancel()
+
+
+WEBSOCKET_ROUTES = {
+    '/ws/transcribe/': transcribe_stream,
+}
+
+
+async def websocket_application(scope, receive, send) -> None:
+    """ASGI application for `websocket` connections."""
+    handler = WEBSOCKET_ROUTES.get(scope['path'])
+    if handler is None:
+        await receive()  # websocket.connect
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+    await handler(scope, receive, send)
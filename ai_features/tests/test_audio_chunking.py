@@ -0,0 +1,115 @@
+from django.test import SimpleTestCase
+
+from ai_features.services.audio_chunking import AudioChunk, format_timestamp, merge_chunk_results
+
+OVERLAP = 5.0
+# 0-30, 25-55 and 50-70 seconds: two 5 second overlaps
+CHUNKS = [AudioChunk(0, 'c0.flac', 0.0, 30.0), AudioChunk(1, 'c1.flac', 25.0, 55.0), AudioChunk(2, 'c2.flac', 50.0, 70.0)]
+
+
+def segment(start, end, speaker, text):
+    return {'start': start, 'end': end, 'speaker': speaker, 'text': text}
+
+
+def result(*segments, language=None):
+    return {'success': True, 'segments': list(segments), 'language': language}
+
+
+def summary(merged):
+    return [(s['start'], s['end'], s['speaker'], s['text']) for s in merged['segments']]
+
+
+class MergeChunkResultsTests(SimpleTestCase):
+    def test_times_are_shifted_by_the_chunk_offset(self):
+        merged = merge_chunk_results(CHUNKS, [
+            result(segment(1.0, 4.5, 'SPEAKER_00', 'good morning')),
+            result(segment(10.25, 12.0, 'SPEAKER_00', 'how can I help')),
+            result(segment(8.1234, 9.0, 'SPEAKER_00', 'goodbye')),
+        ], OVERLAP)
+
+        self.assertEqual([(s['start'], s['end']) for s in merged['segments']],
+                         [(1.0, 4.5), (35.25, 37.0), (58.123, 59.0)])
+        self.assertEqual(merged['duration'], 70.0)
+        self.assertEqual(merged['chunks'], 3)
+
+    def test_overlap_duplicates_are_kept_once(self):
+        merged = merge_chunk_results(CHUNKS[:2], [
+            result(segment(0.0, 10.0, 'SPEAKER_00', 'thanks for calling'),
+                   segment(26.0, 30.0, 'SPEAKER_00', 'your refund was issued')),
+            # The second chunk hears the whole sentence, which the first cut off
+            result(segment(1.0, 7.0, 'SPEAKER_00', 'your refund was issued on Monday'),
+                   segment(10.0, 15.0, 'SPEAKER_00', 'anything else')),
+        ], OVERLAP)
+
+        self.assertEqual(summary(merged), [
+            (0.0, 10.0, 'SPEAKER_00', 'thanks for calling'),
+            (26.0, 32.0, 'SPEAKER_00', 'your refund was issued on Monday'),
+            (35.0, 40.0, 'SPEAKER_00', 'anything else'),
+        ])
+
+    def test_unmatched_overlap_segments_are_split_at_the_midpoint(self):
+        merged = merge_chunk_results(CHUNKS[:2], [
+            # Only the first chunk has these; the second ends in the second chunk's half
+            result(segment(25.5, 26.5, 'SPEAKER_00', 'right'), segment(28.0, 29.0, 'SPEAKER_00', 'tail noise')),
+            # Only the second chunk has these; the first starts in the first chunk's half
+            result(segment(0.2, 1.0, 'SPEAKER_00', 'head noise'), segment(4.0, 6.0, 'SPEAKER_00', 'okay')),
+        ], OVERLAP)
+
+        self.assertEqual([s['text'] for s in merged['segments']], ['right', 'okay'])
+
+    def test_speaker_labels_stay_consistent_across_chunks(self):
+        merged = merge_chunk_results(CHUNKS, [
+            result(segment(0.0, 10.0, 'SPEAKER_00', 'thanks for calling, how can I help'),
+                   segment(11.0, 20.0, 'SPEAKER_01', 'my refund never arrived'),
+                   segment(26.0, 29.0, 'SPEAKER_00', 'let me check your account')),
+            # Diarization numbers speakers per chunk: here the agent came out as SPEAKER_01
+            result(segment(1.0, 4.0, 'SPEAKER_01', 'let me check your account'),
+                   segment(6.0, 15.0, 'SPEAKER_00', 'it was a hundred dollars'),
+                   segment(26.0, 29.0, 'SPEAKER_01', 'I see the payment here'),
+                   segment(29.2, 30.0, 'SPEAKER_00', 'okay thanks')),
+            # A third voice joins under a label the first two already have globally
+            result(segment(1.0, 4.0, 'SPEAKER_00', 'I see the payment here'),
+                   segment(4.2, 5.0, 'SPEAKER_02', 'okay thanks'),
+                   segment(6.0, 10.0, 'SPEAKER_01', 'supervisor speaking')),
+        ], OVERLAP)
+
+        self.assertEqual([(s['speaker'], s['text']) for s in merged['segments']], [
+            ('SPEAKER_00', 'thanks for calling, how can I help'),
+            ('SPEAKER_01', 'my refund never arrived'),
+            ('SPEAKER_00', 'let me check your account'),
+            ('SPEAKER_01', 'it was a hundred dollars'),
+            ('SPEAKER_00', 'I see the payment here'),
+            ('SPEAKER_01', 'okay thanks'),
+            ('SPEAKER_02', 'supervisor speaking'),
+        ])
+        self.assertEqual(merged['speakers_count'], 3)
+
+    def test_speaker_silent_in_the_overlap_keeps_their_label(self):
+        merged = merge_chunk_results(CHUNKS[:2], [
+            result(segment(0.0, 10.0, 'SPEAKER_00', 'thanks for calling'),
+                   segment(11.0, 20.0, 'SPEAKER_01', 'my refund never arrived'),
+                   segment(26.0, 29.0, 'SPEAKER_00', 'let me check your account')),
+            # Only the agent spoke in the overlap; the caller still maps back to SPEAKER_01
+            result(segment(1.0, 4.0, 'SPEAKER_01', 'let me check your account'),
+                   segment(6.0, 15.0, 'SPEAKER_00', 'it was a hundred dollars')),
+        ], OVERLAP)
+
+        self.assertEqual([s['speaker'] for s in merged['segments']],
+                         ['SPEAKER_00', 'SPEAKER_01', 'SPEAKER_00', 'SPEAKER_01'])
+
+    def test_full_text_and_language(self):
+        merged = merge_chunk_results(CHUNKS[:2], [
+            result(segment(1.0, 2.0, 'SPEAKER_00', 'hello')),
+            result(segment(10.0, 11.5, 'SPEAKER_01', 'hi'), language='en'),
+        ], OVERLAP)
+
+        self.assertEqual(merged['language'], 'en')
+        self.assertEqual(merged['full_text'], (
+            '[00:00:01.000 - 00:00:02.000] SPEAKER_00: hello\n'
+            '[00:00:35.000 - 00:00:36.500] SPEAKER_01: hi\n'
+            '\nSpeakers: SPEAKER_00, SPEAKER_01'
+        ))
+
+    def test_format_timestamp(self):
+        self.assertEqual(format_timestamp(3723.5), '01:02:03.500')
+        self.assertEqual(format_timestamp(None), '00:00:00.000')
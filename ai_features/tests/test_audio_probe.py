@@ -0,0 +1,168 @@
+import io
+import os
+import shutil
+import struct
+import tempfile
+import wave
+
+from django.test import SimpleTestCase
+
+from ai_features.services.audio_probe import decoded_duration, probe_audio
+
+# MPEG-1 layer III, 128 kbps, 44.1 kHz, mono: 417 byte frames of 1152 samples
+MP3_HEADER = b'\xff\xfb\x90\xc0'
+MP3_FRAME_BYTES = 417
+
+
+def wav_bytes(frames, sample_rate=8000, channels=1):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(b'\x00\x01' * frames * channels)
+    return buffer.getvalue()
+
+
+def mp3_bytes(frames, xing_frames=None):
+    first = bytearray(MP3_HEADER + bytes(MP3_FRAME_BYTES - 4))
+    if xing_frames is not None:
+        # Mono MPEG-1 side info is 17 bytes; the Xing tag follows it
+        first[21:33] = b'Xing' + struct.pack('>II', 0x1, xing_frames)
+    frame = MP3_HEADER + bytes(MP3_FRAME_BYTES - 4)
+    return bytes(first) + frame * (frames - 1)
+
+
+def adts_bytes(frames, frame_bytes=100):
+    # AAC LC, 16 kHz (rate index 8), 1 channel, no CRC
+    header = bytes([
+        0xFF, 0xF1, 0x60, 0x40 | (frame_bytes >> 11),
+        (frame_bytes >> 3) & 0xFF, ((frame_bytes & 0x7) << 5) | 0x1F, 0xFC,
+    ])
+    return (header + bytes(frame_bytes - 7)) * frames
+
+
+def flac_bytes(total_samples, sample_rate=16000, channels=2):
+    packed = (sample_rate << 44) | ((channels - 1) << 41) | (15 << 36) | total_samples
+    streaminfo = struct.pack('>HH', 4096, 4096) + bytes(6) + packed.to_bytes(8, 'big') + bytes(16)
+    return b'fLaC' + bytes([0x80, 0, 0, len(streaminfo)]) + streaminfo + bytes(64)
+
+
+def atom(name, payload):
+    return struct.pack('>I4s', 8 + len(payload), name) + payload
+
+
+def mp4_bytes(timescale, duration, sample_rate=44100, channels=2):
+    mvhd = atom(b'mvhd', bytes(4) + struct.pack('>IIII', 0, 0, timescale, duration) + bytes(80))
+    mp4a = atom(b'mp4a', bytes(16) + struct.pack('>HHI', channels, 16, 0) + struct.pack('>I', sample_rate << 16))
+    stsd = atom(b'stsd', bytes(4) + struct.pack('>I', 1) + mp4a)
+    trak = atom(b'trak', atom(b'mdia', atom(b'minf', atom(b'stbl', stsd))))
+    # moov after mdat, as most encoders write it
+    return atom(b'ftyp', b'M4A ' + bytes(4)) + atom(b'mdat', bytes(1000)) + atom(b'moov', mvhd + trak)
+
+
+class AudioProbeTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def write(self, data, name='audio'):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def probe(self, data):
+        return probe_audio(self.write(data))
+
+    def test_wav(self):
+        info = self.probe(wav_bytes(16000, sample_rate=8000, channels=2))
+
+        self.assertEqual((info.format, info.sample_rate, info.channels), ('wav', 8000, 2))
+        self.assertAlmostEqual(info.duration, 2.0)
+
+    def test_mp3_xing_frame_count(self):
+        info = self.probe(mp3_bytes(10, xing_frames=100))
+
+        self.assertEqual((info.format, info.sample_rate, info.channels), ('mp3', 44100, 1))
+        self.assertAlmostEqual(info.duration, 100 * 1152 / 44100)
+
+    def test_mp3_cbr_estimate(self):
+        info = self.probe(mp3_bytes(100))
+
+        self.assertEqual(info.format, 'mp3')
+        # Bytes over the bitrate; within a frame of the true 100 * 1152 / 44100
+        self.assertAlmostEqual(info.duration, 100 * MP3_FRAME_BYTES * 8 / 128000)
+
+    def test_adts_estimate(self):
+        info = self.probe(adts_bytes(50))
+
+        self.assertEqual((info.format, info.sample_rate, info.channels), ('aac', 16000, 1))
+        self.assertAlmostEqual(info.duration, 50 * 1024 / 16000)
+
+    def test_flac(self):
+        info = self.probe(flac_bytes(32000))
+
+        self.assertEqual((info.format, info.sample_rate, info.channels), ('flac', 16000, 2))
+        self.assertAlmostEqual(info.duration, 2.0)
+
+    def test_mp4_with_moov_after_mdat(self):
+        info = self.probe(mp4_bytes(timescale=1000, duration=2500))
+
+        self.assertEqual((info.format, info.sample_rate, info.channels), ('mp4', 44100, 2))
+        self.assertAlmostEqual(info.duration, 2.5)
+
+    def test_empty_wav_probes_as_zero_length(self):
+        info = self.probe(wav_bytes(0))
+
+        self.assertEqual(info.duration, 0)
+
+    def test_unknown_length_is_not_zero_length(self):
+        self.assertIsNone(self.probe(flac_bytes(0)))
+        self.assertIsNone(self.probe(mp4_bytes(timescale=1000, duration=0)))
+        self.assertIsNone(self.probe(mp4_bytes(timescale=0, duration=2500)))
+
+    def test_truncated_headers(self):
+        for data in (wav_bytes(100)[:20], mp3_bytes(3)[:3], adts_bytes(3)[:5], flac_bytes(100)[:12],
+                     mp4_bytes(1000, 2500)[:1040]):
+            with self.subTest(data=data[:4]):
+                self.assertIsNone(self.probe(data))
+
+    def test_garbage_and_empty_files(self):
+        for data in (b'', b'not audio at all\n' * 100, bytes(range(256)) * 16, b'RIFF' + bytes(100)):
+            with self.subTest(data=data[:8]):
+                self.assertIsNone(self.probe(data))
+        self.assertIsNone(probe_audio(os.path.join(self.directory, 'missing.wav')))
+
+
+class DecodedDurationTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_counts_samples_when_the_header_has_no_length(self):
+        import numpy as np
+        import soundfile as sf
+
+        path = os.path.join(self.directory, 'streamed.flac')
+        sf.write(path, np.full(16000, 0.1), 16000)
+        with open(path, 'r+b') as f:
+            # Clear STREAMINFO's 36-bit total samples, as streaming encoders leave it
+            f.seek(8 + 13)
+            low_nibble_byte = f.read(1)[0] & 0xF0
+            f.seek(8 + 13)
+            f.write(bytes([low_nibble_byte, 0, 0, 0, 0]))
+
+        self.assertIsNone(probe_audio(path))
+        self.assertAlmostEqual(decoded_duration(path), 1.0)
+
+    def test_empty_and_unreadable_files(self):
+        empty = os.path.join(self.directory, 'empty.wav')
+        with open(empty, 'wb') as f:
+            f.write(wav_bytes(0))
+        garbage = os.path.join(self.directory, 'garbage.wav')
+        with open(garbage, 'wb') as f:
+            f.write(b'not audio')
+
+        self.assertEqual(decoded_duration(empty), 0)
+        self.assertIsNone(decoded_duration(garbage))
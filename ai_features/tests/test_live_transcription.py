@@ -0,0 +1,120 @@
+import array
+
+from django.test import SimpleTestCase
+
+from ai_features.services.live_transcription import FRAME_MS, PAD_MS, VadSegmenter, frame_level_db
+
+RATE = 8000
+SAMPLES_PER_FRAME = RATE * FRAME_MS // 1000
+PAD_FRAMES = PAD_MS // FRAME_MS
+
+
+def frames(count, amplitude=0):
+    return array.array('h', [amplitude] * SAMPLES_PER_FRAME * count).tobytes()
+
+
+def speech(count):
+    return frames(count, amplitude=1000)  # about -30 dBFS
+
+
+def silence(count):
+    return frames(count)
+
+
+def segmenter(**options):
+    # 5 frames of silence close a window, 50 frames cap it, 3 speech frames keep it
+    defaults = dict(threshold_db=-45, silence_ms=5 * FRAME_MS, max_window_seconds=50 * FRAME_MS / 1000,
+                    min_speech_ms=3 * FRAME_MS)
+    defaults.update(options)
+    return VadSegmenter(RATE, **defaults)
+
+
+def seconds(frame_count):
+    return frame_count * FRAME_MS / 1000
+
+
+class VadSegmenterTests(SimpleTestCase):
+    def test_silence_opens_no_window(self):
+        vad = segmenter()
+
+        self.assertEqual(vad.feed(silence(100)), [])
+        self.assertIsNone(vad.flush())
+        self.assertEqual(vad.frames_seen, 100)
+        self.assertAlmostEqual(vad.seconds_seen, 2.0)
+
+    def test_window_closes_on_exactly_silence_ms(self):
+        vad = segmenter()
+
+        self.assertEqual(vad.feed(silence(20) + speech(10) + silence(4)), [])
+        [window] = vad.feed(silence(1))
+
+        # PAD_MS of the leading silence is kept, and the whole (short) pause
+        self.assertAlmostEqual(window.start, seconds(20 - PAD_FRAMES))
+        self.assertAlmostEqual(window.duration, seconds(PAD_FRAMES + 10 + 5))
+        self.assertAlmostEqual(window.speech_seconds, seconds(10))
+        self.assertEqual(window.index, 0)
+
+    def test_trailing_silence_is_trimmed_to_pad_ms(self):
+        vad = segmenter(silence_ms=15 * FRAME_MS)
+
+        [first] = vad.feed(speech(10) + silence(15))
+        [second] = vad.feed(speech(10) + silence(15))
+
+        self.assertAlmostEqual(first.start, 0)
+        self.assertAlmostEqual(first.duration, seconds(10 + PAD_FRAMES))
+        # The trimmed silence becomes the next window's leading padding, so no audio is sent twice
+        self.assertAlmostEqual(second.start, first.end)
+        self.assertAlmostEqual(second.duration, seconds(15 - PAD_FRAMES + 10 + PAD_FRAMES))
+        self.assertEqual(second.index, 1)
+
+    def test_long_speech_is_cut_at_the_max_window(self):
+        vad = segmenter()
+
+        windows = vad.feed(speech(120))
+        windows.append(vad.flush())
+
+        self.assertEqual([(w.start, w.duration) for w in windows],
+                         [(0.0, seconds(50)), (seconds(50), seconds(50)), (seconds(100), seconds(20))])
+        self.assertEqual(b''.join(w.pcm for w in windows), speech(120))
+
+    def test_windows_below_min_speech_are_dropped(self):
+        vad = segmenter()
+
+        self.assertEqual(vad.feed(silence(20) + speech(2) + silence(5)), [])
+        [window] = vad.feed(speech(3) + silence(5))
+
+        self.assertAlmostEqual(window.speech_seconds, seconds(3))
+        # Dropped windows don't use up an index
+        self.assertEqual(window.index, 0)
+
+    def test_threshold_is_inclusive(self):
+        level = frame_level_db(speech(1))
+
+        at_threshold = segmenter(threshold_db=level)
+        self.assertEqual(len(at_threshold.feed(speech(3) + silence(5))), 1)
+        above_threshold = segmenter(threshold_db=level + 0.01)
+        self.assertEqual(above_threshold.feed(speech(3) + silence(5)), [])
+        self.assertIsNone(above_threshold.flush())
+
+    def test_flush_closes_the_open_window(self):
+        vad = segmenter()
+
+        self.assertEqual(vad.feed(speech(10) + silence(2)), [])
+        window = vad.flush()
+
+        self.assertAlmostEqual(window.duration, seconds(12))
+        self.assertIsNone(vad.flush())
+
+    def test_chunking_of_the_input_does_not_matter(self):
+        audio = silence(13) + speech(30) + silence(7) + speech(2) + silence(9) + speech(70) + silence(6)
+        whole = segmenter()
+        expected = whole.feed(audio) + [whole.flush()]
+
+        for size in (1, 3, 319, 321, 1000):
+            with self.subTest(size=size):
+                vad = segmenter()
+                windows = []
+                for offset in range(0, len(audio), size):
+                    windows.extend(vad.feed(audio[offset:offset + size]))
+                windows.append(vad.flush())
+                self.assertEqual(windows, expected)
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ai_features.models import BlogPost
+
+URL = '/api/blog-posts/'
+
+
+class ListPaginationTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        for minute in range(5):
+            self.post(f'post {minute}', minutes_ago=10 - minute)
+
+    def post(self, title, minutes_ago=0):
+        post = BlogPost.objects.create(title=title, content='body ' * 50)
+        BlogPost.objects.filter(pk=post.pk).update(created_at=self.now - timedelta(minutes=minutes_ago))
+        return post
+
+    def titles(self, page):
+        return [post['title'] for post in page['posts']]
+
+    def test_pages_are_newest_first(self):
+        page = self.client.get(URL, {'page_size': 2}).json()
+
+        self.assertEqual(self.titles(page), ['post 4', 'post 3'])
+        self.assertIsNone(page['previous'])
+        self.assertIn('cursor=', page['next'])
+
+    def test_cursor_is_stable_across_inserts(self):
+        first = self.client.get(URL, {'page_size': 2}).json()
+        # New posts land at the head of the list, before the cursor
+        self.post('newer 1')
+        self.post('newer 2')
+
+        second = self.client.get(first['next']).json()
+        third = self.client.get(second['next']).json()
+
+        self.assertEqual(self.titles(second), ['post 2', 'post 1'])
+        self.assertEqual(self.titles(third), ['post 0'])
+        self.assertIsNone(third['next'])
+
+    def test_field_selection(self):
+        page = self.client.get(URL, {'page_size': 1, 'summary': 1}).json()
+        self.assertNotIn('content', page['posts'][0])
+
+        page = self.client.get(URL, {'page_size': 1, 'fields': 'id,title'}).json()
+        self.assertEqual(set(page['posts'][0]), {'id', 'title'})
+
+        response = self.client.get(URL, {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ListETagTests(TestCase):
+    def setUp(self):
+        self.post = BlogPost.objects.create(title='first', content='body')
+
+    def test_unchanged_list_returns_304(self):
+        response = self.client.get(URL)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        response = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_if_none_match_uses_weak_comparison(self):
+        etag = self.client.get(URL)['ETag']
+
+        for header in (etag[2:], f'"other", {etag}', '*'):
+            with self.subTest(header=header):
+                self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=header).status_code, 304)
+        self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH='W/"other"').status_code, 200)
+
+    def test_changes_and_other_pages_get_a_new_etag(self):
+        etag = self.client.get(URL)['ETag']
+
+        self.assertEqual(self.client.get(URL, {'summary': 1}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        BlogPost.objects.create(title='second', content='body')
+        response = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        self.post.title = 'edited'
+        self.post.save()
+        self.assertEqual(self.client.get(URL, HTTP_IF_NONE_MATCH=etag).status_code, 200)
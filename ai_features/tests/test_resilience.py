@@ -0,0 +1,265 @@
+import asyncio
+import threading
+import time
+from contextlib import ExitStack
+
+from django.test import SimpleTestCase
+
+from ai_features.services.resilience import (
+    CircuitBreaker, CircuitOpenError, SingleFlight, TokenBucket, UpstreamBusy, UpstreamGuard
+)
+from ai_features.services.title_suggestion_service import _GuardedStream
+
+
+class ClientError(Exception):
+    pass
+
+
+class SingleFlightTests(SimpleTestCase):
+    def run_concurrently(self, flight, func, callers=4):
+        results, errors = {}, {}
+        started = threading.Barrier(callers)
+
+        def call(index):
+            started.wait()
+            try:
+                results[index] = flight.do('key', func)
+            except Exception as e:
+                errors[index] = e
+
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_callers_share_one_call(self):
+        calls = []
+
+        def transcribe():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'segments': [{'text': 'hello'}]}
+
+        flight = SingleFlight()
+        results, errors = self.run_concurrently(flight, transcribe)
+
+        self.assertEqual(errors, {})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats(), {'leaders': 1, 'coalesced': 3, 'in_flight': 0})
+        self.assertTrue(all(result == {'segments': [{'text': 'hello'}]} for result in results.values()))
+
+    def test_every_caller_gets_its_own_copy(self):
+        def transcribe():
+            time.sleep(0.1)
+            return {'segments': [{'text': 'hello'}]}
+
+        results, _ = self.run_concurrently(SingleFlight(), transcribe)
+
+        self.assertEqual(len({id(result) for result in results.values()}), len(results))
+        self.assertEqual(len({id(result['segments']) for result in results.values()}), len(results))
+
+    def test_leader_mutation_does_not_reach_followers(self):
+        flight = SingleFlight()
+        follower = {}
+
+        def follow():
+            follower['result'] = flight.do('key', lambda: {'transcription_id': 'ran twice'})
+
+        thread = threading.Thread(target=follow)
+
+        def transcribe():
+            thread.start()
+            time.sleep(0.1)  # the follower is waiting by now
+            return {'transcription_id': None}
+
+        result = flight.do('key', transcribe)
+        # What the views do with the result they get back
+        result['transcription_id'] = 42
+        thread.join()
+
+        self.assertEqual(follower['result'], {'transcription_id': None})
+
+    def test_error_is_raised_to_every_caller(self):
+        def fail():
+            time.sleep(0.1)
+            raise ValueError('upstream down')
+
+        results, errors = self.run_concurrently(SingleFlight(), fail)
+
+        self.assertEqual(results, {})
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors.values()))
+
+    def test_later_calls_run_again(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+        self.assertEqual(flight.do('key', lambda: 2), 2)
+
+    def test_async_callers_share_one_call_and_get_copies(self):
+        calls = []
+
+        async def transcribe():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {'segments': []}
+
+        async def main():
+            flight = SingleFlight()
+            return await asyncio.gather(*(flight.ado('key', transcribe) for _ in range(3)))
+
+        results = asyncio.run(main())
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'segments': []}] * 3)
+        self.assertEqual(len({id(result) for result in results}), 3)
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_unlimited_rate_never_waits(self):
+        bucket = TokenBucket(0, 1)
+        self.assertEqual([bucket.reserve(0) for _ in range(100)], [0.0] * 100)
+
+    def test_burst_then_waits_then_refuses(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        self.assertEqual(bucket.reserve(0), 0.0)
+        self.assertEqual(bucket.reserve(0), 0.0)
+        wait = bucket.reserve(1.0)
+        self.assertGreater(wait, 0.05)
+        self.assertLessEqual(wait, 0.1)
+        # Not taken: the caller would have to wait longer than it is willing to
+        self.assertIsNone(bucket.reserve(0.05))
+
+
+class UpstreamGuardTests(SimpleTestCase):
+    def test_slot_counts_calls_and_in_flight(self):
+        guard = UpstreamGuard('test')
+        with guard.slot():
+            self.assertEqual(guard.in_flight, 1)
+        self.assertEqual(guard.in_flight, 0)
+        self.assertEqual(guard.stats()['calls'], 1)
+
+    def test_concurrency_limit_rejects_when_full(self):
+        guard = UpstreamGuard('test', concurrency=1, queue_timeout=0.05)
+        with guard.slot():
+            with self.assertRaises(UpstreamBusy):
+                with guard.slot():
+                    pass
+        self.assertEqual(guard.stats()['rejected_busy'], 1)
+        # The slot was given back
+        with guard.slot():
+            pass
+
+    def test_waiting_caller_gets_the_slot_when_it_frees_up(self):
+        guard = UpstreamGuard('test', concurrency=1, queue_timeout=1.0)
+        entered = threading.Event()
+
+        def hold():
+            with guard.slot():
+                entered.set()
+                time.sleep(0.1)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        entered.wait()
+        with guard.slot():
+            self.assertEqual(guard.in_flight, 1)
+        thread.join()
+
+    def test_failures_open_the_circuit(self):
+        guard = UpstreamGuard('test', failure_threshold=2, reset_timeout=60)
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                with guard.slot():
+                    raise RuntimeError('503')
+
+        self.assertEqual(guard.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError) as raised:
+            with guard.slot():
+                self.fail('call made through an open circuit')
+        self.assertGreater(raised.exception.retry_after, 0)
+
+    def test_ignored_errors_do_not_count(self):
+        guard = UpstreamGuard('test', failure_threshold=1)
+        with self.assertRaises(ClientError):
+            with guard.slot(ignore=(ClientError,)):
+                raise ClientError('400')
+
+        self.assertEqual(guard.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(guard.stats()['failures'], 0)
+
+    def test_trial_call_after_reset_timeout_closes_the_circuit(self):
+        guard = UpstreamGuard('test', failure_threshold=1, reset_timeout=0.05)
+        with self.assertRaises(RuntimeError):
+            with guard.slot():
+                raise RuntimeError('503')
+        time.sleep(0.06)
+
+        with guard.slot():
+            # Only one trial call while half open
+            with self.assertRaises(CircuitOpenError):
+                with guard.slot():
+                    pass
+        self.assertEqual(guard.breaker.state, CircuitBreaker.CLOSED)
+
+
+class FakeStream:
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.closed = False
+
+    def __iter__(self):
+        yield from self.chunks
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.closed = True
+
+
+class GuardedStreamTests(SimpleTestCase):
+    def open(self, guard, stream):
+        with ExitStack() as stack:
+            stack.enter_context(guard.slot())
+            return _GuardedStream(stream, stack.pop_all())
+
+    def test_slot_is_held_until_the_stream_is_consumed(self):
+        guard = UpstreamGuard('test', concurrency=1, queue_timeout=0.01)
+        upstream = FakeStream(['a', 'b'])
+        stream = self.open(guard, upstream)
+
+        self.assertEqual(guard.in_flight, 1)
+        with self.assertRaises(UpstreamBusy):
+            with guard.slot():
+                pass
+        self.assertEqual(list(stream), ['a', 'b'])
+        self.assertEqual(guard.in_flight, 0)
+        self.assertTrue(upstream.closed)
+        self.assertEqual(guard.stats()['calls'], 1)
+
+    def test_closing_early_is_a_success(self):
+        guard = UpstreamGuard('test', failure_threshold=1)
+        upstream = FakeStream(['a', 'b', 'c'])
+        stream = self.open(guard, upstream)
+
+        self.assertEqual(next(stream), 'a')
+        stream.close()
+        stream.close()
+
+        self.assertTrue(upstream.closed)
+        self.assertEqual(guard.in_flight, 0)
+        self.assertEqual(guard.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(guard.stats()['calls'], 1)
+
+    def test_failure_mid_stream_counts_against_the_breaker(self):
+        guard = UpstreamGuard('test', failure_threshold=1)
+        stream = self.open(guard, FakeStream(['a'], error=ConnectionError('reset')))
+
+        with self.assertRaises(ConnectionError):
+            list(stream)
+
+        self.assertEqual(guard.in_flight, 0)
+        self.assertEqual(guard.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(guard.stats()['failures'], 1)
@@ -0,0 +1,184 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from ai_features.models import UploadSession
+from ai_features.services.resumable_uploads import (
+    OffsetMismatch, ResumableUploadStore, UploadAlreadyFinalized, UploadIncomplete, _locked_partial
+)
+
+DATA = bytes(range(256)) * 40  # 10240 bytes
+
+
+class BrokenStream(io.BytesIO):
+    """Delivers `size` bytes, then fails like a client that went away."""
+
+    def __init__(self, data, size):
+        super().__init__(data)
+        self.size = size
+
+    def read(self, n=-1):
+        remaining = self.size - self.tell()
+        if remaining <= 0:
+            raise ConnectionResetError('client went away')
+        return super().read(min(n, remaining) if n >= 0 else remaining)
+
+
+class ResumableUploadStoreTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.store = ResumableUploadStore(ttl=0)
+
+    def append(self, session, offset, data, store=None):
+        return (store or self.store).append(session, offset, io.BytesIO(data), len(data))
+
+    def test_chunks_advance_the_offset(self):
+        session = self.store.create('call.wav', len(DATA))
+
+        self.assertEqual(self.append(session, 0, DATA[:4096]), 4096)
+        self.assertEqual(self.append(session, 4096, DATA[4096:8192]), 8192)
+        self.assertEqual(self.append(session, 8192, DATA[8192:]), len(DATA))
+
+        session.refresh_from_db()
+        self.assertEqual(session.received, len(DATA))
+
+    def test_chunk_at_the_wrong_offset_is_rejected(self):
+        session = self.store.create('call.wav', len(DATA))
+        self.append(session, 0, DATA[:1000])
+
+        for offset in (0, 500, 2000):
+            with self.assertRaises(OffsetMismatch) as raised:
+                self.append(session, offset, DATA[offset:offset + 100])
+            self.assertEqual(raised.exception.offset, 1000)
+        session.refresh_from_db()
+        self.assertEqual(session.received, 1000)
+
+    def test_interrupted_chunk_keeps_what_arrived(self):
+        session = self.store.create('call.wav', len(DATA))
+
+        offset = self.store.append(session, 0, BrokenStream(DATA, 3000), len(DATA))
+
+        self.assertEqual(offset, 3000)
+        self.assertEqual(self.append(session, 3000, DATA[3000:]), len(DATA))
+        upload = self.store.finalize(session)
+        with open(upload.path, 'rb') as stored:
+            self.assertEqual(stored.read(), DATA)
+        upload.close()
+
+    def test_finalize_moves_the_file_and_hashes_it(self):
+        session = self.store.create('call.wav', len(DATA))
+        self.append(session, 0, DATA)
+
+        upload = self.store.finalize(session)
+        self.addCleanup(upload.close)
+
+        self.assertEqual(upload.content_hash, hashlib.sha256(DATA).hexdigest())
+        self.assertEqual(upload.size, len(DATA))
+        self.assertEqual(upload.name, 'call.wav')
+        self.assertTrue(upload.storage_name.startswith('audio/'))
+        with open(upload.path, 'rb') as stored:
+            self.assertEqual(stored.read(), DATA)
+        self.assertFalse(os.path.exists(default_storage.path(session.partial_name)))
+        session.refresh_from_db()
+        self.assertEqual(session.status, UploadSession.STATUS_COMPLETED)
+
+    def test_chunks_seen_by_another_process_are_rehashed(self):
+        session = self.store.create('call.wav', len(DATA))
+        self.append(session, 0, DATA[:5000])
+        # A second worker (no running digest) takes the rest
+        other = ResumableUploadStore(ttl=0)
+        self.append(session, 5000, DATA[5000:], store=other)
+
+        upload = other.finalize(session)
+        self.addCleanup(upload.close)
+
+        self.assertEqual(upload.content_hash, hashlib.sha256(DATA).hexdigest())
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        session = self.store.create('call.wav', len(DATA))
+        self.append(session, 0, DATA[:100])
+
+        with self.assertRaises(UploadIncomplete):
+            self.store.finalize(session)
+        session.refresh_from_db()
+        self.assertEqual(session.status, UploadSession.STATUS_ACTIVE)
+
+    def test_finalized_upload_takes_no_more_chunks_or_finalizes(self):
+        session = self.store.create('call.wav', len(DATA))
+        self.append(session, 0, DATA)
+        self.store.finalize(session).close()
+
+        with self.assertRaises(UploadAlreadyFinalized):
+            self.store.finalize(session)
+        with self.assertRaises(UploadAlreadyFinalized):
+            self.append(session, len(DATA), b'more')
+
+
+class CrossProcessAppendTests(TransactionTestCase):
+    """Two stores share no in-process locks, like two server processes."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def append_in_thread(self, store, session, offset, data):
+        outcome = {}
+
+        def append():
+            try:
+                outcome['offset'] = store.append(UploadSession.objects.get(pk=session.pk), offset,
+                                                 io.BytesIO(data), len(data))
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=append)
+        thread.start()
+        return thread, outcome
+
+    def test_append_waits_for_a_writer_in_another_process_and_rechecks_the_offset(self):
+        session = ResumableUploadStore(ttl=0).create('call.wav', len(DATA))
+        path = default_storage.path(session.partial_name)
+
+        # The other process is midway through writing the first chunk
+        with _locked_partial(path) as partial:
+            thread, outcome = self.append_in_thread(ResumableUploadStore(ttl=0), session, 0, b'x' * 100)
+            thread.join(0.3)
+            self.assertTrue(thread.is_alive())
+            partial.write(DATA[:4096])
+            UploadSession.objects.filter(pk=session.pk).update(received=4096)
+        thread.join(5)
+
+        self.assertIsInstance(outcome.get('error'), OffsetMismatch)
+        self.assertEqual(outcome['error'].offset, 4096)
+        with open(path, 'rb') as stored:
+            self.assertEqual(stored.read(), DATA[:4096])
+
+    def test_chunk_racing_finalize_is_rejected(self):
+        store = ResumableUploadStore(ttl=0)
+        session = store.create('call.wav', len(DATA))
+        store.append(session, 0, io.BytesIO(DATA), len(DATA))
+
+        with _locked_partial(default_storage.path(session.partial_name)):
+            thread, outcome = self.append_in_thread(ResumableUploadStore(ttl=0), session, len(DATA), b'more')
+            thread.join(0.3)
+            self.assertTrue(thread.is_alive())
+            UploadSession.objects.filter(pk=session.pk).update(status=UploadSession.STATUS_COMPLETED)
+        thread.join(5)
+
+        self.assertIsInstance(outcome.get('error'), UploadAlreadyFinalized)
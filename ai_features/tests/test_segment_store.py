@@ -0,0 +1,82 @@
+from django.db import connection
+from django.test import TestCase
+
+from ai_features.models import AudioTranscription, TranscriptSegment
+from ai_features.services.segment_store import (
+    FTS_TABLE, compact_result, ensure_search_index, search_segments, store_segments
+)
+
+SEGMENTS = [
+    {'start': 0.0, 'end': 4.2, 'speaker': 'SPEAKER_00', 'text': 'Thanks for calling about your invoice'},
+    {'start': 4.2, 'end': 9.8, 'speaker': 'SPEAKER_01', 'text': 'The refund never reached my account'},
+    {'start': 9.8, 'end': 15.0, 'speaker': 'SPEAKER_00', 'text': 'I can see the refund was issued on Monday'},
+]
+
+
+class SegmentSearchTests(TestCase):
+    def setUp(self):
+        self.transcription = AudioTranscription.objects.create(audio_file='audio/call.wav')
+        store_segments(self.transcription.id, SEGMENTS)
+
+    def fts_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+            return cursor.fetchone()[0]
+
+    def test_migration_created_the_index(self):
+        self.assertIn(FTS_TABLE, connection.introspection.table_names())
+        self.assertEqual(self.fts_rows(), len(SEGMENTS))
+
+    def test_compact_result_moves_segments_out(self):
+        stored, segments = compact_result({'success': True, 'full_text': '...', 'segments': SEGMENTS})
+
+        self.assertEqual(segments, SEGMENTS)
+        self.assertNotIn('segments', stored)
+        self.assertEqual(stored['segments_count'], 3)
+
+    def test_query_matches_every_word_best_first(self):
+        hits = search_segments('refund issued')
+
+        self.assertEqual([hit['position'] for hit in hits], [2])
+        hit = hits[0]
+        self.assertEqual(hit['transcription_id'], self.transcription.id)
+        self.assertEqual(hit['speaker'], 'SPEAKER_00')
+        self.assertEqual(hit['timestamp'], '00:00:09.800')
+        # Snippets with highlighted terms come from FTS5, not the LIKE fallback
+        self.assertIn('[refund]', hit['snippet'])
+
+    def test_filters_by_transcription_and_speaker(self):
+        other = AudioTranscription.objects.create(audio_file='audio/other.wav')
+        store_segments(other.id, [{'start': 0, 'end': 1, 'speaker': 'SPEAKER_01', 'text': 'refund please'}])
+
+        self.assertEqual(len(search_segments('refund')), 3)
+        self.assertEqual(len(search_segments('refund', transcription_id=self.transcription.id)), 2)
+        hits = search_segments('refund', speaker='SPEAKER_01')
+        self.assertEqual({hit['transcription_id'] for hit in hits}, {self.transcription.id, other.id})
+
+    def test_query_syntax_is_treated_as_words(self):
+        self.assertEqual(search_segments('refund OR "invoice'), [])
+        self.assertEqual(search_segments('!!!'), [])
+        self.assertEqual(len(search_segments('REFUND*')), 2)
+
+    def test_updates_are_reindexed(self):
+        TranscriptSegment.objects.filter(transcription=self.transcription, position=0).update(
+            text='Thanks for calling about your parcel'
+        )
+
+        self.assertEqual(search_segments('invoice'), [])
+        self.assertEqual([hit['position'] for hit in search_segments('parcel')], [0])
+
+    def test_deleted_segments_leave_the_index(self):
+        store_segments(self.transcription.id, SEGMENTS[:1])
+        self.assertEqual(self.fts_rows(), 1)
+        self.assertEqual(search_segments('refund'), [])
+
+        self.transcription.delete()
+        self.assertEqual(self.fts_rows(), 0)
+        self.assertEqual(search_segments('invoice'), [])
+
+    def test_ensure_search_index_is_idempotent(self):
+        self.assertTrue(ensure_search_index())
+        self.assertEqual(self.fts_rows(), len(SEGMENTS))
+        self.assertEqual(len(search_segments('refund')), 2)
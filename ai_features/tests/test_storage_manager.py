@@ -0,0 +1,140 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from ai_features.models import AudioTranscription, UploadSession
+from ai_features.services.storage_manager import AudioStorageManager
+from ai_features.upload_handlers import StoredUploadedFile, build_storage_name
+
+HOUR = 3600
+
+
+class StorageTestCase(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, RESUMABLE_UPLOAD_TTL=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # The sweep also clears the legacy temp_uploads/ in the working directory
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(media_root)
+        self.manager = AudioStorageManager(orphan_grace=HOUR, retention_days=0)
+
+    def write(self, name, data=b'audio', age=0):
+        """Create a file in storage, last modified `age` seconds ago."""
+        path = default_storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as destination:
+            destination.write(data)
+        modified = time.time() - age
+        os.utime(path, (modified, modified))
+        return path
+
+    def stored_upload(self, data, file_name='call.wav'):
+        name = build_storage_name(file_name)
+        path = self.write(name, data)
+        upload = StoredUploadedFile(path=path, storage_name=name, name=file_name, content_type='audio/wav',
+                                    size=len(data), charset=None, content_hash=hashlib.sha256(data).hexdigest())
+        self.addCleanup(upload.close)
+        return upload
+
+
+class SweepTests(StorageTestCase):
+    def test_removes_old_unreferenced_audio_only(self):
+        orphan = self.write('audio/ab/' + 'a' * 64 + '.wav', age=2 * HOUR)
+        young = self.write('audio/ab/' + 'b' * 64 + '.wav', age=60)
+        kept_name = 'audio/ab/' + 'c' * 64 + '.wav'
+        kept = self.write(kept_name, age=2 * HOUR)
+        AudioTranscription.objects.create(audio_file=kept_name)
+
+        report = self.manager.sweep()
+
+        self.assertEqual(report['orphaned_audio'], {'files': 1, 'bytes': 5})
+        self.assertFalse(os.path.exists(orphan))
+        self.assertTrue(os.path.exists(young))
+        self.assertTrue(os.path.exists(kept))
+
+    def test_dry_run_reports_without_deleting(self):
+        orphan = self.write('audio/legacy_name.wav', age=2 * HOUR)
+
+        report = self.manager.sweep(dry_run=True)
+
+        self.assertEqual(report['orphaned_audio']['files'], 1)
+        self.assertTrue(os.path.exists(orphan))
+
+    def test_partial_uploads_of_active_sessions_are_kept(self):
+        abandoned = self.write('uploads/abandoned.part', age=2 * HOUR)
+        active = self.write('uploads/active.part', age=2 * HOUR)
+        UploadSession.objects.create(file_name='call.wav', partial_name='uploads/active.part', total_size=100)
+
+        report = self.manager.sweep()
+
+        self.assertEqual(report['partial_uploads']['files'], 1)
+        self.assertFalse(os.path.exists(abandoned))
+        self.assertTrue(os.path.exists(active))
+
+    def test_stale_chunk_directories_are_removed(self):
+        stale = self.write('audio/chunks_stale/chunk_0.wav')
+        self.write('audio/chunks_active/chunk_0.wav')
+        old = time.time() - 2 * HOUR
+        os.utime(os.path.dirname(stale), (old, old))
+
+        report = self.manager.sweep()
+
+        self.assertEqual(report['chunk_dirs']['files'], 1)
+        self.assertFalse(os.path.exists(os.path.dirname(stale)))
+        self.assertTrue(os.path.exists(default_storage.path('audio/chunks_active')))
+
+    def test_held_file_survives_past_the_grace_period(self):
+        path = self.write('audio/upload_in_flight.wav', age=2 * HOUR)
+
+        with self.manager.hold(path):
+            for _ in range(100):
+                if os.stat(path).st_mtime > time.time() - 60:
+                    break
+                time.sleep(0.01)
+            report = self.manager.sweep()
+            self.assertEqual(report['orphaned_audio']['files'], 0)
+            self.assertTrue(os.path.exists(path))
+
+        old = time.time() - 2 * HOUR
+        os.utime(path, (old, old))
+        self.manager.sweep()
+        self.assertFalse(os.path.exists(path))
+
+
+class AdoptTests(StorageTestCase):
+    def test_moves_upload_to_its_content_address(self):
+        data = b'RIFF recording'
+        upload = self.stored_upload(data)
+        original_path = upload.path
+
+        storage_name = self.manager.adopt(upload)
+
+        digest = hashlib.sha256(data).hexdigest()
+        self.assertEqual(storage_name, f'audio/{digest[:2]}/{digest}.wav')
+        self.assertEqual(upload.storage_name, storage_name)
+        self.assertEqual(upload.path, default_storage.path(storage_name))
+        self.assertFalse(os.path.exists(original_path))
+        with open(upload.path, 'rb') as stored:
+            self.assertEqual(stored.read(), data)
+
+    def test_same_content_is_stored_once(self):
+        first = self.stored_upload(b'same bytes', 'monday.WAV')
+        second = self.stored_upload(b'same bytes', 'tuesday.wav')
+
+        self.assertEqual(self.manager.adopt(first), self.manager.adopt(second))
+        self.assertEqual(self.manager.usage()['audio']['files'], 1)
+
+    def test_already_adopted_upload_is_left_alone(self):
+        upload = self.stored_upload(b'bytes')
+        storage_name = self.manager.adopt(upload)
+
+        self.assertEqual(self.manager.adopt(upload), storage_name)
+        self.assertTrue(os.path.exists(upload.path))
@@ -0,0 +1,73 @@
+import random
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ai_features.services import text_cleaning
+from ai_features.services.text_cleaning import BOUNDARY_SLACK, clean_content
+
+# Words, allowed punctuation, characters that are removed, and whitespace of every kind
+ALPHABET = ['word', 'naïve', 'ab', 'x', '.', ',', '!?', "it's", '’', '-', ':',
+            '😀', '#', '<b>', '©', ' ', '  ', '\t', '\n\n', ' ', '  ', 'a' * 40]
+
+
+def whole_text_reference(text, max_chars):
+    """Clean everything, then cut: what windowed cleaning must reproduce."""
+    cleaned = clean_content(text)
+    if len(cleaned) <= max_chars:
+        return cleaned
+    cut = cleaned.rfind(' ', 0, max_chars + 1)
+    if cut < max_chars * (1 - BOUNDARY_SLACK):
+        cut = max_chars
+    return cleaned[:cut].rstrip()
+
+
+def random_text(rng, tokens):
+    return ''.join(rng.choice(ALPHABET) for _ in range(tokens))
+
+
+class CleanContentTests(SimpleTestCase):
+    def test_cleaning(self):
+        self.assertEqual(clean_content('  Hello,\t<b>world</b>!!\n\nIt’s  “fine” 😀 '), 'Hello, bworldb!! It’s fine')
+        self.assertEqual(clean_content('😀 ## 😀'), '')
+        self.assertEqual(clean_content(''), '')
+
+    def test_limit_cuts_on_a_word_boundary(self):
+        self.assertEqual(clean_content('alpha beta gamma delta', 11), 'alpha beta')
+        self.assertEqual(clean_content('alpha beta gamma delta', 16), 'alpha beta gamma')
+        # No space within BOUNDARY_SLACK of the limit: the word is cut
+        self.assertEqual(clean_content('alpha beta gamma delta', 13), 'alpha beta ga')
+        self.assertEqual(clean_content('ab ' + 'c' * 30, 20), 'ab ' + 'c' * 17)
+
+    def test_windowed_cleaning_matches_whole_text_cleaning(self):
+        rng = random.Random(1234)
+        # Tiny windows so every input is cleaned in many steps, with splits landing
+        # inside whitespace runs, removed characters and words
+        for window in (1, 2, 3, 7, 64):
+            with mock.patch.object(text_cleaning, 'MIN_WINDOW', window):
+                for _ in range(200):
+                    text = random_text(rng, rng.randint(1, 120))
+                    max_chars = rng.randint(1, len(text) + 10)
+                    with self.subTest(window=window, text=text, max_chars=max_chars):
+                        self.assertEqual(clean_content(text, max_chars), whole_text_reference(text, max_chars))
+
+    def test_large_input_matches_whole_text_cleaning(self):
+        rng = random.Random(99)
+        text = random_text(rng, 200_000)
+
+        for max_chars in (100, 5000, 20_000):
+            with self.subTest(max_chars=max_chars):
+                self.assertEqual(clean_content(text, max_chars), whole_text_reference(text, max_chars))
+
+    def test_stops_reading_once_the_limit_is_reached(self):
+        text = 'word ' * 1_000_000
+        calls = []
+        original = text_cleaning._clean
+
+        def counting_clean(piece):
+            calls.append(len(piece))
+            return original(piece)
+
+        with mock.patch.object(text_cleaning, '_clean', counting_clean):
+            self.assertEqual(len(clean_content(text, 1000)), 999)
+        self.assertLess(sum(calls), 2 * text_cleaning.MIN_WINDOW)
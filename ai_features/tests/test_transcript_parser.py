@@ -0,0 +1,116 @@
+from django.test import SimpleTestCase
+
+from ai_features.services.transcript_parser import (
+    iter_segments, parse_json_transcript, parse_transcript, render_transcript
+)
+
+
+class LineFormatTests(SimpleTestCase):
+    def assertParsesAs(self, line, start, end, speaker, text):
+        segments, _ = parse_transcript(line)
+        self.assertEqual(len(segments), 1, segments)
+        segment = segments[0]
+        self.assertEqual(
+            (segment['start'], segment['end'], segment['speaker'], segment['text']),
+            (start, end, speaker, text),
+        )
+
+    def test_canonical(self):
+        self.assertParsesAs('[00:00:01.5 - 00:00:04] SPEAKER_00: Hello there', 1.5, 4.0, 'SPEAKER_00', 'Hello there')
+
+    def test_minutes_seconds_with_comma_fraction_and_en_dash(self):
+        self.assertParsesAs('[01:02,5 – 01:05] SPEAKER_00: Hi', 62.5, 65.0, 'SPEAKER_00', 'Hi')
+
+    def test_parentheses_and_to(self):
+        self.assertParsesAs('(0:01 to 0:05) Speaker 1: hey', 1.0, 5.0, 'Speaker 1', 'hey')
+
+    def test_dash_before_the_speaker(self):
+        self.assertParsesAs('[00:01 - 00:02] - Speaker 2: sure', 1.0, 2.0, 'Speaker 2', 'sure')
+
+    def test_speaker_first(self):
+        self.assertParsesAs('SPEAKER_00 (00:01-00:02): first', 1.0, 2.0, 'SPEAKER_00', 'first')
+        self.assertParsesAs('**SPEAKER_01** [00:03 - 00:04]: bold', 3.0, 4.0, 'SPEAKER_01', 'bold')
+
+    def test_timestamp_without_speaker(self):
+        self.assertParsesAs('[00:01 - 00:02] just words', 1.0, 2.0, 'UNKNOWN', 'just words')
+
+    def test_bullets_bold_labels_and_single_timestamps(self):
+        segments, speakers = parse_transcript('- [00:00:01] **SPEAKER_00**: one\n* [00:00:03] SPEAKER_01: two')
+
+        # A missing end is taken from the next segment's start, or the segment's own start at the end
+        self.assertEqual([(s['start'], s['end'], s['speaker'], s['text']) for s in segments],
+                         [(1.0, 3.0, 'SPEAKER_00', 'one'), (3.0, 3.0, 'SPEAKER_01', 'two')])
+        self.assertEqual(speakers, ['SPEAKER_00', 'SPEAKER_01'])
+
+    def test_wrapped_lines_continue_the_segment_and_markup_is_skipped(self):
+        segments, _ = parse_transcript(
+            '## Transcript\n```\n[00:00:01 - 00:00:02] SPEAKER_00: wrapped\ncontinues here\n---\n```'
+        )
+
+        self.assertEqual([s['text'] for s in segments], ['wrapped continues here'])
+
+    def test_speaker_only_lines_carry_on_from_the_previous_segment(self):
+        segments, _ = parse_transcript('[00:00:05 - 00:00:06] SPEAKER_00: a\nSPEAKER_01: b')
+
+        self.assertEqual([(s['start'], s['end'], s['speaker']) for s in segments],
+                         [(5.0, 6.0, 'SPEAKER_00'), (6.0, 6.0, 'SPEAKER_01')])
+
+    def test_lines_from_any_iterable(self):
+        segments = list(iter_segments(iter(['[00:00:00 - 00:00:01] SPEAKER_00: hi\n'])))
+
+        self.assertEqual(segments[0]['text'], 'hi')
+
+
+class SpeakersSummaryTests(SimpleTestCase):
+    def test_summary_lists_speakers_without_adding_a_segment(self):
+        segments, speakers = parse_transcript(
+            '[00:00:00 - 00:00:01] SPEAKER_00: hi\n\nSpeakers: SPEAKER_00, SPEAKER_01'
+        )
+
+        self.assertEqual(len(segments), 1)
+        self.assertEqual(segments[0]['text'], 'hi')
+        self.assertEqual(speakers, ['SPEAKER_00'])
+
+    def test_summary_is_used_when_no_segment_has_a_speaker(self):
+        for summary in ('Speakers: Alice, Bob', 'Speakers identified: Alice, Bob', 'Speaker: SPEAKER_00, SPEAKER_01'):
+            with self.subTest(summary=summary):
+                segments, speakers = parse_transcript(f'[00:00 - 00:01] hello\n{summary}')
+                self.assertEqual(len(segments), 1)
+                self.assertEqual(speakers, summary.split(': ')[1].split(', '))
+
+    def test_speaker_colon_text_is_an_utterance(self):
+        listed = []
+        segments = list(iter_segments(
+            ['[00:00:05 - 00:00:06] SPEAKER_00: hi', 'Speaker: Yes, I can hear you'], listed
+        ))
+
+        self.assertEqual(listed, [])
+        self.assertEqual([(s['speaker'], s['text']) for s in segments],
+                         [('SPEAKER_00', 'hi'), ('Speaker', 'Yes, I can hear you')])
+        self.assertEqual(segments[1]['start'], 6.0)
+
+
+class JsonTranscriptTests(SimpleTestCase):
+    def test_reads_numbers_and_timestamps(self):
+        segments, speakers = parse_json_transcript(
+            '{"segments": [{"start": 0, "end": 1.5, "speaker": "SPEAKER_00", "text": " hi "},'
+            ' {"start": "00:01.5", "speaker": "", "text": "ok"}]}'
+        )
+
+        self.assertEqual([(s['start'], s['end'], s['speaker'], s['text']) for s in segments],
+                         [(0.0, 1.5, 'SPEAKER_00', 'hi'), (1.5, 1.5, 'UNKNOWN', 'ok')])
+        self.assertEqual(speakers, ['SPEAKER_00'])
+
+    def test_unexpected_json_raises_value_error(self):
+        for text in ('not json', '{"segments": "none"}'):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    parse_json_transcript(text)
+
+    def test_rendered_transcript_parses_back(self):
+        segments, speakers = parse_json_transcript(
+            '[{"start": 1.25, "end": 3, "speaker": "SPEAKER_00", "text": "one"},'
+            ' {"start": 3, "end": 4.5, "speaker": "SPEAKER_01", "text": "two"}]'
+        )
+
+        self.assertEqual(parse_transcript(render_transcript(segments, speakers)), (segments, speakers))
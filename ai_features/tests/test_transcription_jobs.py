@@ -0,0 +1,155 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ai_features.models import AudioTranscription, TranscriptSegment
+from ai_features.services.transcription_jobs import TranscriptionJobQueue
+
+STALE_AFTER = 60
+
+
+class FakeService:
+    def __init__(self, result):
+        self.result = result
+
+    def transcribe_with_diarization(self, audio_file_path, progress_callback=None, **kwargs):
+        progress_callback('transcribing', 50)
+        return dict(self.result)
+
+
+class RecordingQueue(TranscriptionJobQueue):
+    """Records submitted jobs instead of running them on the pool."""
+
+    def __init__(self, result=None):
+        super().__init__(lambda: FakeService(result or {}), max_workers=1)
+        self._executor.shutdown()
+        self.submitted = []
+
+    def submit(self, transcription_id, audio_file_path, duration=None, content_hash=None):
+        with self._lock:
+            self._active.add(transcription_id)
+        self.submitted.append(transcription_id)
+
+
+@override_settings(TRANSCRIPTION_JOB_STALE_AFTER=STALE_AFTER, TRANSCRIPTION_JOB_MAX_ATTEMPTS=3)
+class TranscriptionJobQueueTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.queue = RecordingQueue()
+
+    def job(self, status=AudioTranscription.STATUS_PROCESSING, age=0, attempts=1, audio=True):
+        name = f'audio/job_{AudioTranscription.objects.count()}.wav'
+        if audio:
+            path = default_storage.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b'RIFF')
+        record = AudioTranscription.objects.create(audio_file=name, status=status, attempts=attempts)
+        AudioTranscription.objects.filter(pk=record.pk).update(updated_at=timezone.now() - timedelta(seconds=age))
+        record.refresh_from_db()
+        return record
+
+    def test_heartbeat_touches_only_this_processes_unfinished_jobs(self):
+        mine = self.job(age=30)
+        finished = self.job(status=AudioTranscription.STATUS_COMPLETED, age=30)
+        other = self.job(age=30)
+        self.queue._active.update({mine.pk, finished.pk})
+
+        self.queue.heartbeat()
+
+        for record, touched in ((mine, True), (finished, False), (other, False)):
+            before = record.updated_at
+            record.refresh_from_db()
+            self.assertEqual(record.updated_at > before, touched, record.pk)
+
+    def test_only_stale_jobs_of_other_processes_are_requeued(self):
+        stale = self.job(age=2 * STALE_AFTER)
+        pending = self.job(status=AudioTranscription.STATUS_PENDING, age=2 * STALE_AFTER)
+        self.job(age=STALE_AFTER // 2)
+        self.job(status=AudioTranscription.STATUS_COMPLETED, age=2 * STALE_AFTER)
+        running_here = self.job(age=2 * STALE_AFTER)
+        self.queue._active.add(running_here.pk)
+
+        self.assertEqual(self.queue.recover_orphaned(), 2)
+
+        self.assertEqual(sorted(self.queue.submitted), sorted([stale.pk, pending.pk]))
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.progress), (AudioTranscription.STATUS_PENDING, 0))
+        # Claimed rows are fresh again, so the next pass leaves them alone
+        self.assertEqual(self.queue.recover_orphaned(), 0)
+
+    def test_only_one_process_claims_a_stale_job(self):
+        stale = self.job(age=2 * STALE_AFTER)
+        other = RecordingQueue()
+
+        class RacingQueue(RecordingQueue):
+            def _stale_jobs(self):
+                jobs = super()._stale_jobs()
+                # Another process claims the job between our listing and our claim
+                other.recover_orphaned()
+                return jobs
+
+        racing = RacingQueue()
+
+        self.assertEqual(racing.recover_orphaned(), 0)
+        self.assertEqual(other.submitted, [stale.pk])
+        self.assertEqual(racing.submitted, [])
+
+    def test_job_with_missing_audio_fails(self):
+        record = self.job(age=2 * STALE_AFTER, audio=False)
+
+        self.assertEqual(self.queue.recover_orphaned(), 0)
+
+        record.refresh_from_db()
+        self.assertEqual(record.status, AudioTranscription.STATUS_FAILED)
+        self.assertIn('no longer available', record.error)
+        self.assertEqual(self.queue.submitted, [])
+
+    def test_job_fails_after_max_attempts(self):
+        retried = self.job(age=2 * STALE_AFTER, attempts=2)
+        exhausted = self.job(age=2 * STALE_AFTER, attempts=3)
+
+        self.assertEqual(self.queue.recover_orphaned(), 1)
+
+        self.assertEqual(self.queue.submitted, [retried.pk])
+        exhausted.refresh_from_db()
+        self.assertEqual(exhausted.status, AudioTranscription.STATUS_FAILED)
+        self.assertIn('interrupted 3 times', exhausted.error)
+
+    def test_each_run_counts_an_attempt(self):
+        queue = RecordingQueue({'success': True, 'full_text': 'hi', 'segments': [
+            {'start': 0.0, 'end': 1.0, 'speaker': 'SPEAKER_00', 'text': 'hi'},
+        ]})
+        record = self.job(status=AudioTranscription.STATUS_PENDING, attempts=0)
+        queue._active.add(record.pk)
+
+        # Workers close stale connections, which would end the test transaction
+        with mock.patch('ai_features.services.transcription_jobs.close_old_connections'):
+            queue._run(record.pk, default_storage.path(record.audio_file.name))
+
+        record.refresh_from_db()
+        self.assertEqual((record.status, record.progress, record.attempts),
+                         (AudioTranscription.STATUS_COMPLETED, 100, 1))
+        self.assertEqual(TranscriptSegment.objects.filter(transcription=record).count(), 1)
+        self.assertNotIn(record.pk, queue._active)
+
+    def test_failed_result_is_recorded(self):
+        queue = RecordingQueue({'success': False, 'error': 'upstream said no'})
+        record = self.job(status=AudioTranscription.STATUS_PENDING, attempts=0)
+
+        with mock.patch('ai_features.services.transcription_jobs.close_old_connections'):
+            queue._run(record.pk, default_storage.path(record.audio_file.name))
+
+        record.refresh_from_db()
+        self.assertEqual((record.status, record.error, record.attempts),
+                         (AudioTranscription.STATUS_FAILED, 'upstream said no', 1))
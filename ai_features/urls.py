@@ -1,17 +1,33 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Audio transcription endpoints
     path('transcribe/', views.transcribe_audio, name='transcribe_audio'),
+    path('transcribe/<uuid:job_id>/', views.transcription_job_status, name='transcription_job_status'),
     path('transcriptions/', views.transcription_history, name='transcription_history'),
+    path('transcriptions/search/', views.transcription_search, name='transcription_search'),
+    
+    # Resumable uploads: init, PUT chunks (HEAD/GET for the current offset), finalize
+    path('uploads/', views.upload_init, name='upload_init'),
+    path('uploads/<uuid:upload_id>/', views.upload_chunk, name='upload_chunk'),
+    path('uploads/<uuid:upload_id>/finalize/', views.upload_finalize, name='upload_finalize'),
     
     # Blog title suggestion endpoints
     path('suggest-titles/', views.suggest_titles, name='suggest_titles'),
+    path('suggest-titles/stream/', views.suggest_titles_stream, name='suggest_titles_stream'),
+    path('suggest-titles/batch/', views.suggest_titles_batch, name='suggest_titles_batch'),
+    
+    # Async variants for ASGI deployments (darwix_ai.asgi)
+    path('async/transcribe/', async_views.async_transcribe_audio, name='async_transcribe_audio'),
+    path('async/suggest-titles/', async_views.async_suggest_titles, name='async_suggest_titles'),
     
     # Blog post management
     path('blog-posts/', views.blog_posts, name='blog_posts'),
     
     # Health check
     path('health/', views.health_check, name='health_check'),
+    path('health/live/', views.liveness, name='liveness'),
+    path('health/ready/', views.readiness, name='readiness'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
@@ -1,34 +1,141 @@
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from rest_framework import status
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.parsers import MultiPartParser, FileUploadParser, JSONParser
 from rest_framework.response import Response
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-import tempfile
+from django.db import transaction
+import hashlib
+import json
+from dataclasses import replace
+import logging
+import math
 import os
-import shutil
 
-from .models import BlogPost, AudioTranscription
+from .metrics import registry, span
+from .models import BlogPost, AudioTranscription, UploadSession
 from .serializers import (
     BlogPostSerializer, 
     TitleSuggestionSerializer, 
-    AudioTranscriptionSerializer
+    TitleSuggestionBatchSerializer,
+    AudioTranscriptionSerializer,
+    UploadInitSerializer
 )
-from .services.transcription_service import AudioTranscriptionService
-from .services.title_suggestion_service import TitleSuggestionService
+from .pagination import CreatedAtCursorPagination, etag_matches, list_etag, select_fields
+from .upload_handlers import StoredUploadedFile, build_storage_name
+from .services.registry import service_registry
+from .services.segment_store import compact_result, search_segments, store_segments
+from .services.audio_probe import decoded_duration, probe_audio
+from .services.resilience import resilience_stats
+from .services.health_probes import get_health_prober
+from .services.resumable_uploads import OffsetMismatch, UploadAlreadyFinalized, UploadIncomplete
 
-# Lazy initialization functions
+logger = logging.getLogger(__name__)
+
+# Shared per process; built at startup (SERVICE_WARMUP) or on first use, see services/registry.py
 def get_transcription_service():
-    if not hasattr(get_transcription_service, '_service'):
-        get_transcription_service._service = AudioTranscriptionService()
-    return get_transcription_service._service
+    return service_registry.get('transcription')
+
+def get_job_queue():
+    return service_registry.get('job_queue')
+
+def get_transcription_cache():
+    if not settings.TRANSCRIPTION_CACHE_ENABLED:
+        return None
+    return service_registry.get('transcription_cache')
+
+def get_upload_store():
+    return service_registry.get('upload_store')
+
+def get_storage_manager():
+    return service_registry.get('storage')
 
 def get_title_service():
-    if not hasattr(get_title_service, '_service'):
-        get_title_service._service = TitleSuggestionService()
-    return get_title_service._service
+    return service_registry.get('title')
+
+def _wants_async(request):
+    """
+    Job mode is the default (TRANSCRIPTION_ASYNC_DEFAULT); clients can
+    override it per request with ?async=0/1 or an 'async' form field.
+    """
+    value = request.query_params.get('async', request.data.get('async'))
+    if value is None:
+        return settings.TRANSCRIPTION_ASYNC_DEFAULT
+    return str(value).lower() in ('1', 'true', 'yes')
+
+def _ensure_stored(uploaded_file):
+    """
+    Return the upload as a StoredUploadedFile in default storage. Uploads that
+    came through AudioStorageUploadHandler already are; others (e.g. when the
+    handler is disabled) are written to storage once, hashing in the same pass.
+    """
+    if isinstance(uploaded_file, StoredUploadedFile):
+        return uploaded_file
+    
+    storage_name = build_storage_name(uploaded_file.name)
+    destination_path = default_storage.path(storage_name)
+    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+    digest = hashlib.sha256()
+    with span('upload_write'), open(destination_path, 'wb') as destination:
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+            destination.write(chunk)
+    return StoredUploadedFile(
+        path=destination_path,
+        storage_name=storage_name,
+        name=uploaded_file.name,
+        content_type=uploaded_file.content_type,
+        size=uploaded_file.size,
+        charset=uploaded_file.charset,
+        content_hash=digest.hexdigest()
+    )
+
+# Validate file type (more lenient since Whisper handles many formats)
+ALLOWED_AUDIO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac', '.wma']
+
+def _check_audio_upload(file_name, size, max_size):
+    """Error message for an unsupported or oversized upload, else None."""
+    if os.path.splitext(file_name)[1].lower() not in ALLOWED_AUDIO_EXTENSIONS:
+        return f'Unsupported file type. Allowed: {", ".join(ALLOWED_AUDIO_EXTENSIONS)}'
+    if size > max_size:
+        return (f'File too large. Maximum size is {max_size / (1024*1024):.0f}MB. '
+                f'Your file is {size / (1024*1024):.1f}MB')
+    return None
+
+def _audio_fields(audio_info):
+    """AudioTranscription metadata fields from a probe_audio() result."""
+    if audio_info is None:
+        return {}
+    return {
+        'duration': audio_info.duration,
+        'sample_rate': audio_info.sample_rate or None,
+        'channels': audio_info.channels or None,
+        'audio_format': audio_info.format,
+    }
+
+def _unavailable_response(result):
+    # The upstream guard refused the call (circuit open or queue full)
+    return Response(result, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={'Retry-After': str(math.ceil(result['retry_after']))})
+
+def _job_status_payload(record):
+    payload = {
+        'success': record.status != AudioTranscription.STATUS_FAILED,
+        'job_id': str(record.job_id),
+        'transcription_id': record.id,
+        'status': record.status,
+        'progress': record.progress,
+    }
+    if record.status == AudioTranscription.STATUS_COMPLETED:
+        payload['result'] = record.result_payload()
+    elif record.status == AudioTranscription.STATUS_FAILED:
+        payload['error'] = record.error or 'Transcription failed'
+    return payload
 
 def home_view(request):
     """
@@ -53,95 +160,321 @@ def transcribe_audio(request):
                 'error': 'No audio file provided'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        audio_file = request.FILES['audio_file']
-        
-        # Validate file type (more lenient since Whisper handles many formats)
-        allowed_extensions = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac', '.wma']
-        file_extension = os.path.splitext(audio_file.name)[1].lower()
-        
-        if file_extension not in allowed_extensions:
+        # The upload handler has already streamed the file into its final storage
+        # location (and hashed it); anything else is stored here in one pass
+        audio_file = _ensure_stored(request.FILES['audio_file'])
+        # Single-request uploads are held to 25MB; larger files go through /api/uploads/
+        return _transcribe_stored_file(request, audio_file, max_size=25 * 1024 * 1024)
+    
+    except Exception as e:
+        logger.exception("Upload processing failed: %s", e)
+        return Response({
+            'success': False,
+            'error': f'Processing failed: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def _transcribe_stored_file(request, audio_file, max_size):
+    """
+    Validate, probe and transcribe an audio file that is already in storage
+    (a StoredUploadedFile). Shared by transcribe_audio and finalize_upload.
+    The stored file is removed again unless a transcription record keeps it.
+    """
+    keep_file = False
+    
+    try:
+        error = _check_audio_upload(audio_file.name, audio_file.size, max_size)
+        if error:
             return Response({
                 'success': False,
-                'error': f'Unsupported file type. Allowed: {", ".join(allowed_extensions)}'
+                'error': error
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Check file size (limit to 25MB for web upload)
-        max_size = 25 * 1024 * 1024  # 25MB
-        if audio_file.size > max_size:
+        logger.debug("Stored uploaded file at %s (%d bytes)", audio_file.path, audio_file.size)
+        
+        # Verify file was saved correctly
+        if not os.path.exists(audio_file.path):
             return Response({
                 'success': False,
-                'error': f'File too large. Maximum size is 25MB. Your file is {audio_file.size / (1024*1024):.1f}MB'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Create a safe temporary directory in the project folder
-        temp_dir = os.path.join(os.getcwd(), 'temp_uploads')
-        os.makedirs(temp_dir, exist_ok=True)
+                'error': 'Failed to save uploaded file'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-        # Save uploaded file to safe location with simple filename
-        import uuid
-        safe_filename = f"upload_{uuid.uuid4().hex[:8]}{file_extension}"
-        temp_file_path = os.path.join(temp_dir, safe_filename)
-        
-        try:
-            # Write file to safe location
-            with open(temp_file_path, 'wb') as temp_file:
-                for chunk in audio_file.chunks():
-                    temp_file.write(chunk)
-            
-            print(f"📁 Saved uploaded file to: {temp_file_path}")
-            print(f"📊 File size: {os.path.getsize(temp_file_path)} bytes")
-            
-            # Verify file was saved correctly
-            if not os.path.exists(temp_file_path):
+        # Duration, sample rate and channels from the container headers, so
+        # unusable files are rejected before anything is sent to Gemini
+        with span('audio_probe'):
+            audio_info = probe_audio(audio_file.path)
+        if audio_info is not None and audio_info.duration <= 0:
+            # Headers alone don't prove a file empty; only reject it once a decoder agrees
+            decoded = decoded_duration(audio_file.path)
+            if decoded is not None and decoded <= 0:
                 return Response({
                     'success': False,
-                    'error': 'Failed to save uploaded file'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-            # Process transcription using lazy-loaded service
-            transcription_service = get_transcription_service()
-            result = transcription_service.transcribe_with_diarization(temp_file_path)
+                    'error': 'The audio file contains no audio'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            audio_info = replace(audio_info, duration=decoded) if decoded is not None else None
+        if audio_info is not None:
+            max_duration = settings.TRANSCRIPTION_MAX_DURATION
+            if max_duration and audio_info.duration > max_duration:
+                return Response({
+                    'success': False,
+                    'error': f'Recording too long. Maximum is {max_duration:.0f} seconds. '
+                             f'Your file is {audio_info.duration:.0f} seconds'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        duration = audio_info.duration if audio_info is not None else None
+        
+        content_hash = audio_file.content_hash
+        
+        # Identical uploads reuse the stored result instead of calling the service
+        result_cache = get_transcription_cache()
+        if result_cache is not None:
+            cached_record = result_cache.lookup(content_hash)
+            if cached_record is not None:
+                logger.info("Cache hit for %s, reusing transcription %s", content_hash[:12], cached_record.id)
+                result = cached_record.result_payload()
+                result['transcription_id'] = cached_record.id
+                result['cached'] = True
+                return Response(result, status=status.HTTP_200_OK)
+        
+        if _wants_async(request):
+            # Job mode: the file moves to its content address and the worker reads it from there
+            get_storage_manager().adopt(audio_file)
+            keep_file = True
+            record = AudioTranscription.objects.create(
+                audio_file=audio_file.storage_name,
+                content_hash=content_hash,
+                status=AudioTranscription.STATUS_PENDING,
+                **_audio_fields(audio_info)
+            )
+            get_job_queue().submit(record.id, audio_file.path, duration=duration, content_hash=content_hash)
+            logger.info("Queued transcription job %s for %s", record.job_id, audio_file.storage_name)
             
-            # Save to database if successful
-            if result['success']:
-                try:
-                    # Reset file pointer for saving
-                    audio_file.seek(0)
-                    file_path = default_storage.save(
-                        f'audio/{audio_file.name}',
-                        ContentFile(audio_file.read())
-                    )
-                    
+            payload = _job_status_payload(record)
+            payload['status_url'] = reverse('transcription_job_status', args=[record.job_id])
+            return Response(payload, status=status.HTTP_202_ACCEPTED)
+        
+        # Process transcription using lazy-loaded service
+        transcription_service = get_transcription_service()
+        # Concurrent uploads of the same audio share one transcription. Each upload still
+        # gets its own record (pointing at the same stored file): the coalesced requests
+        # return before the leader has saved, and every response carries its own id
+        # No record refers to the upload until it is saved; keep the storage sweep off it meanwhile
+        with get_storage_manager().hold(audio_file.path):
+            result = transcription_service.transcribe_with_diarization(
+                audio_file.path, duration=duration, coalesce_key=content_hash
+            )
+        if result.get('retry_after') is not None:
+            return _unavailable_response(result)
+        
+        # Save to database if successful
+        if result['success']:
+            try:
+                # The model points at the file the transcription just read, stored
+                # once per content hash; segments go to their own table, the JSON
+                # keeps the rest
+                stored, segments = compact_result(result)
+                get_storage_manager().adopt(audio_file)
+                # May be shared with other transcriptions now; if the save fails the
+                # storage sweep removes it once nothing refers to it
+                keep_file = True
+                with span('db_save'), transaction.atomic():
                     transcription_record = AudioTranscription.objects.create(
-                        audio_file=file_path,
-                        transcription=result
+                        audio_file=audio_file.storage_name,
+                        content_hash=content_hash,
+                        transcription=stored,
+                        progress=100,
+                        **_audio_fields(audio_info)
                     )
-                    
-                    # Add database ID to response
-                    result['transcription_id'] = transcription_record.id
-                except Exception as e:
-                    print(f"Warning: Could not save to database: {e}")
-                    # Continue without saving to database
-            
-            return Response(result, status=status.HTTP_200_OK)
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                    print(f"🧹 Cleaned up uploaded file: {temp_file_path}")
-                except Exception as e:
-                    print(f"Warning: Could not clean up file: {e}")
+                    store_segments(transcription_record.id, segments)
+                if result_cache is not None:
+                    result_cache.store(content_hash, transcription_record, audio_file.size)
+                
+                # Add database ID to response
+                result['transcription_id'] = transcription_record.id
+            except Exception as e:
+                logger.warning("Could not save to database: %s", e)
+                # Continue without saving to database
+        
+        result['cached'] = False
+        return Response(result, status=status.HTTP_200_OK)
+        
+    finally:
+        # Rejected, duplicate or failed uploads don't keep their stored copy
+        if not keep_file:
+            try:
+                audio_file.discard()
+                logger.debug("Cleaned up uploaded file: %s", audio_file.path)
+            except Exception as e:
+                logger.warning("Could not clean up file: %s", e)
+
+def _upload_payload(session):
+    return {
+        'success': True,
+        'upload_id': str(session.upload_id),
+        'file_name': session.file_name,
+        'size': session.total_size,
+        'offset': session.received,
+        'status': session.status,
+        'chunk_size': settings.RESUMABLE_UPLOAD_CHUNK_SIZE,
+        'upload_url': reverse('upload_chunk', args=[session.upload_id]),
+        'finalize_url': reverse('upload_finalize', args=[session.upload_id]),
+    }
+
+def _upload_headers(session):
+    return {'Upload-Offset': str(session.received), 'Upload-Length': str(session.total_size)}
+
+def _get_upload_session(upload_id):
+    try:
+        return UploadSession.objects.get(upload_id=upload_id)
+    except UploadSession.DoesNotExist:
+        return None
+
+@api_view(['POST'])
+@parser_classes([JSONParser])
+def upload_init(request):
+    """
+    Start a resumable upload for a large audio file
+    
+    Expected input: {"file_name": "meeting.mp3", "size": 123456789}
+    Returns: upload_id, the URL to PUT chunks to and the largest chunk accepted
+    """
+    serializer = UploadInitSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({
+            'success': False,
+            'error': 'Invalid input data',
+            'details': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    file_name = serializer.validated_data['file_name']
+    size = serializer.validated_data['size']
+    error = _check_audio_upload(file_name, size, settings.RESUMABLE_UPLOAD_MAX_SIZE)
+    if error:
+        return Response({
+            'success': False,
+            'error': error
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    session = get_upload_store().create(file_name, size)
+    return Response(_upload_payload(session), status=status.HTTP_201_CREATED, headers=_upload_headers(session))
+
+@api_view(['GET', 'HEAD', 'PUT'])
+@parser_classes([])
+def upload_chunk(request, upload_id):
+    """
+    Send or resume a resumable upload
     
+    HEAD/GET: current offset (also in the Upload-Offset header), to resume from
+    PUT: raw bytes of the next chunk with an Upload-Offset header saying where
+    it starts. It is appended straight to disk; if the connection drops, the
+    bytes that arrived are kept. A wrong offset gets 409 with the current one.
+    """
+    session = _get_upload_session(upload_id)
+    if session is None:
+        return Response({
+            'success': False,
+            'error': 'Upload not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    if request.method != 'PUT':
+        return Response(_upload_payload(session), headers=_upload_headers(session))
+    
+    try:
+        offset = int(request.headers['Upload-Offset'])
+        length = int(request.headers.get('Content-Length') or 0)
+    except (KeyError, ValueError):
+        return Response({
+            'success': False,
+            'error': 'PUT needs integer Upload-Offset and Content-Length headers'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if length > settings.RESUMABLE_UPLOAD_CHUNK_SIZE:
+        return Response({
+            'success': False,
+            'error': f'Chunk too large. Maximum is {settings.RESUMABLE_UPLOAD_CHUNK_SIZE} bytes'
+        }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    if offset < 0 or offset + length > session.total_size:
+        return Response({
+            'success': False,
+            'error': f'Chunk at offset {offset} with {length} bytes goes past the declared size {session.total_size}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        if length:
+            get_upload_store().append(session, offset, request.stream, length)
+    except OffsetMismatch as e:
+        session.received = e.offset
+        return Response({
+            'success': False,
+            'error': f'Upload is at offset {e.offset}, not {offset}',
+            'offset': e.offset
+        }, status=status.HTTP_409_CONFLICT, headers=_upload_headers(session))
+    except UploadAlreadyFinalized as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_409_CONFLICT)
+    
+    return Response(_upload_payload(session), headers=_upload_headers(session))
+
+@api_view(['POST'])
+def upload_finalize(request, upload_id):
+    """
+    Finish a resumable upload and transcribe it
+    
+    Expected input: optional {"async": true/false}, as for /api/transcribe/
+    Returns: the same responses as /api/transcribe/ (202 with a status_url in
+    job mode); 409 if bytes are still missing
+    """
+    session = _get_upload_session(upload_id)
+    if session is None:
+        return Response({
+            'success': False,
+            'error': 'Upload not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        audio_file = get_upload_store().finalize(session)
+    except UploadIncomplete as e:
+        return Response({
+            'success': False,
+            'error': f'Upload incomplete: {e}',
+            'offset': session.received
+        }, status=status.HTTP_409_CONFLICT, headers=_upload_headers(session))
+    except UploadAlreadyFinalized as e:
+        return Response({
+            'success': False,
+            'error': str(e),
+            'transcription_id': session.transcription_id
+        }, status=status.HTTP_409_CONFLICT)
+    
+    try:
+        response = _transcribe_stored_file(request, audio_file, max_size=settings.RESUMABLE_UPLOAD_MAX_SIZE)
     except Exception as e:
-        print(f"❌ Upload processing failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Upload processing failed: %s", e)
         return Response({
             'success': False,
             'error': f'Processing failed: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    transcription_id = response.data.get('transcription_id') if isinstance(response.data, dict) else None
+    if transcription_id:
+        UploadSession.objects.filter(pk=session.pk).update(transcription_id=transcription_id)
+    return response
+
+@api_view(['GET'])
+def transcription_job_status(request, job_id):
+    """
+    Poll the status of a queued transcription job
+    
+    Returns: job status and progress, plus the result once completed
+    """
+    try:
+        record = AudioTranscription.objects.get(job_id=job_id)
+    except AudioTranscription.DoesNotExist:
+        return Response({
+            'success': False,
+            'error': 'Transcription job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response(_job_status_payload(record))
 
 @api_view(['POST'])
 @parser_classes([JSONParser])
@@ -166,7 +499,12 @@ def suggest_titles(request):
         
         # Generate title suggestions using lazy-loaded service
         title_service = get_title_service()
-        result = title_service.generate_title_suggestions(content)
+        result = title_service.generate_title_suggestions(
+            content,
+            use_cache=not serializer.validated_data['refresh']
+        )
+        if result.get('retry_after') is not None:
+            return _unavailable_response(result)
         
         return Response(result, status=status.HTTP_200_OK)
     
@@ -177,18 +515,125 @@ def suggest_titles(request):
             'suggestions': []
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+@api_view(['POST'])
+@parser_classes([JSONParser])
+def suggest_titles_stream(request):
+    """
+    Streaming variant of suggest_titles using server-sent events
+    
+    Expected input: {"content": "blog post content here"}
+    Returns: text/event-stream with one 'title' event per suggestion as soon as
+    it is generated, then a final 'done' (or 'error') event
+    """
+    serializer = TitleSuggestionSerializer(data=request.data)
+    
+    if not serializer.is_valid():
+        return Response({
+            'success': False,
+            'error': 'Invalid input data',
+            'details': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    content = serializer.validated_data['content']
+    use_cache = not serializer.validated_data['refresh']
+    title_service = get_title_service()
+    
+    def event_stream():
+        try:
+            for event in title_service.stream_title_suggestions(content, use_cache=use_cache):
+                yield _sse_event(event.pop('event'), event)
+        except Exception as e:
+            yield _sse_event('error', {'error': f'Title generation failed: {str(e)}'})
+    
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+@api_view(['POST'])
+@parser_classes([JSONParser])
+def suggest_titles_batch(request):
+    """
+    Endpoint for title suggestions over many contents in one call
+    
+    Expected input: {"contents": ["post 1", "post 2", ...], "max_concurrency": 4}
+    Returns: JSON with one result per content, in input order
+    """
+    try:
+        serializer = TitleSuggestionBatchSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'error': 'Invalid input data',
+                'details': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        title_service = get_title_service()
+        result = title_service.generate_title_suggestions_batch(
+            serializer.validated_data['contents'],
+            max_concurrency=serializer.validated_data.get('max_concurrency'),
+            use_cache=not serializer.validated_data['refresh']
+        )
+        
+        return Response(result, status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        return Response({
+            'success': False,
+            'error': f'Batch title generation failed: {str(e)}',
+            'results': []
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+def _paginated_list(request, queryset, serializer_class, key, heavy_fields, prefetch=None):
+    """
+    Shared GET handler for the list endpoints: field selection (heavy columns
+    are deferred in SQL, not just hidden), cursor pagination and ETag-based
+    conditional GET. prefetch maps a field to the related rows it renders,
+    fetched only when the field is selected.
+    """
+    try:
+        fields, deferred = select_fields(request, serializer_class, heavy_fields)
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    etag = list_etag(request, queryset)
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = etag
+        return response
+    
+    if deferred:
+        queryset = queryset.defer(*deferred)
+    for field, lookup in (prefetch or {}).items():
+        if field in fields:
+            queryset = queryset.prefetch_related(lookup)
+    paginator = CreatedAtCursorPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True, fields=fields)
+    
+    response = Response({
+        'success': True,
+        key: serializer.data,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link()
+    })
+    response['ETag'] = etag
+    return response
+
 @api_view(['GET', 'POST'])
 def blog_posts(request):
     """
     Endpoint for managing blog posts
     """
     if request.method == 'GET':
-        posts = BlogPost.objects.all().order_by('-created_at')
-        serializer = BlogPostSerializer(posts, many=True)
-        return Response({
-            'success': True,
-            'posts': serializer.data
-        })
+        return _paginated_list(request, BlogPost.objects.all(), BlogPostSerializer, 'posts', heavy_fields=['content'])
     
     elif request.method == 'POST':
         serializer = BlogPostSerializer(data=request.data)
@@ -209,44 +654,119 @@ def blog_posts(request):
 def transcription_history(request):
     """
     Get transcription history
+    
+    Cursor-paginated, newest first. Use ?summary=1 or ?fields=id,status,...
+    to leave out the transcription JSON.
+    """
+    return _paginated_list(
+        request,
+        AudioTranscription.objects.all(),
+        AudioTranscriptionSerializer,
+        'transcriptions',
+        heavy_fields=['transcription'],
+        prefetch={'transcription': 'segment_rows'}
+    )
+
+@api_view(['GET'])
+def transcription_search(request):
+    """
+    Full-text search over transcript segments
+    
+    Expected input: ?q=words (all must match), optional ?transcription_id=,
+    ?speaker= and ?limit=
+    Returns: matching segments with timestamps, best matches first
     """
-    transcriptions = AudioTranscription.objects.all().order_by('-created_at')
-    serializer = AudioTranscriptionSerializer(transcriptions, many=True)
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({
+            'success': False,
+            'error': 'Query parameter q is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        limit = int(request.query_params.get('limit', settings.LIST_PAGE_SIZE))
+        transcription_id = request.query_params.get('transcription_id')
+        transcription_id = int(transcription_id) if transcription_id else None
+    except ValueError:
+        return Response({
+            'success': False,
+            'error': 'limit and transcription_id must be integers'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, settings.LIST_MAX_PAGE_SIZE))
+    
+    results = search_segments(
+        query,
+        limit=limit,
+        transcription_id=transcription_id,
+        speaker=request.query_params.get('speaker') or None
+    )
     return Response({
         'success': True,
-        'transcriptions': serializer.data
+        'query': query,
+        'count': len(results),
+        'results': results
     })
 
 @api_view(['GET'])
 def health_check(request):
     """
     Health check endpoint
+    
+    Returns: the cached background probe results, plus cache, upstream and
+    coalescing stats. Nothing is built or called upstream here; services
+    that haven't been built yet report no stats.
     """
-    try:
-        transcription_service = get_transcription_service()
-        title_service = get_title_service()
-        
-        return Response({
-            'status': 'healthy',
-            'ffmpeg_required': False,  # No longer needed!
-            'services': {
-                'transcription': transcription_service.whisper_model is not None,
-                'diarization': transcription_service.diarization_pipeline is not None,
-                'title_generation': title_service.summarizer is not None or title_service.groq_client is not None
-            },
-            'notes': {
-                'transcription': 'Whisper with librosa audio processing',
-                'diarization': 'Requires HuggingFace token for speaker identification',
-                'title_generation': 'Uses Groq API with local BART fallback'
-            }
-        })
-    except Exception as e:
-        return Response({
-            'status': 'error',
-            'error': str(e),
-            'services': {
-                'transcription': False,
-                'diarization': False,
-                'title_generation': False
-            }
-        })
+    prober = get_health_prober()
+    ready, not_ready = prober.readiness(settings.HEALTH_READY_PROBES)
+    probes = prober.snapshot()
+    
+    result_cache = service_registry.peek('transcription_cache')
+    title_service = service_registry.peek('title')
+    title_cache = title_service.cache if title_service is not None else None
+    
+    return Response({
+        'status': 'healthy' if ready else 'unhealthy',
+        'not_ready': not_ready,
+        'ffmpeg_required': False,  # No longer needed!
+        'services': {
+            'transcription': probes['transcription']['status'] == 'ok',
+            'title_generation': probes['groq']['status'] == 'ok'
+        },
+        'transcription_backend': settings.TRANSCRIPTION_BACKEND,
+        'probes': probes,
+        'built_services': [name for name in ('transcription', 'title', 'job_queue') if service_registry.is_ready(name)],
+        'transcription_cache': result_cache.stats() if result_cache is not None else None,
+        'title_cache': title_cache.stats() if title_cache is not None else None,
+        **resilience_stats()
+    })
+
+@require_GET
+def liveness(request):
+    """
+    Liveness probe: the process is up and serving requests. Checks nothing else.
+    """
+    return JsonResponse({'status': 'alive'})
+
+@require_GET
+def readiness(request):
+    """
+    Readiness probe for load balancers
+    
+    Returns: 200 when the HEALTH_READY_PROBES (database and storage by
+    default) last passed, 503 otherwise. Reads the cached results of the
+    background prober only.
+    """
+    ready, not_ready = get_health_prober().readiness(settings.HEALTH_READY_PROBES)
+    if ready:
+        return JsonResponse({'status': 'ready'})
+    return JsonResponse({'status': 'not_ready', 'not_ready': not_ready}, status=503)
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus scrape endpoint
+    
+    Returns: latency histograms per instrumented phase (span) and per view,
+    in the Prometheus text exposition format
+    """
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,19 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'darwix_ai.settings')
+# Marks this process as a server, so AppConfig.ready runs the server-only startup work
+os.environ.setdefault('DARWIX_SERVER', 'asgi')
+
+django_application = get_asgi_application()
+
+# Imported once Django is set up; the WebSocket handlers use the app's settings and services
+from ai_features.streaming import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Django only speaks HTTP; WebSocket connections (live transcription) are routed separately
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -24,6 +24,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'ai_features.middleware.RequestTimingMiddleware',  # first, so it times the whole stack
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,6 +53,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'darwix_ai.wsgi.application'
+ASGI_APPLICATION = 'darwix_ai.asgi.application'
 
 DATABASES = {
     'default': {
@@ -99,11 +101,174 @@ REST_FRAMEWORK = {
     ],
 }
 
+CACHES = {
+    'default': {
+        # Point at django.core.cache.backends.redis.RedisCache to share caches across workers
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'darwix-ai'),
+    }
+}
+
 # AI Configuration
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 HUGGINGFACE_TOKEN = os.getenv('HUGGINGFACE_TOKEN')
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 
+# Transcription backend: 'gemini' (default), 'local' (Whisper + pyannote on CPU) or 'fake' for offline testing
+TRANSCRIPTION_BACKEND = os.getenv('TRANSCRIPTION_BACKEND', 'gemini')
+FAKE_TRANSCRIPTION_LATENCY = float(os.getenv('FAKE_TRANSCRIPTION_LATENCY', '0.5'))  # seconds
+
+# Local backend
+WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'base')
+WHISPER_BATCH_SIZE = int(os.getenv('WHISPER_BATCH_SIZE', '8'))  # 30s windows decoded per forward pass
+DIARIZATION_PIPELINE = os.getenv('DIARIZATION_PIPELINE', 'pyannote/speaker-diarization-3.1')
+LOCAL_TRANSCRIPTION_THREADS = int(os.getenv('LOCAL_TRANSCRIPTION_THREADS', '0'))  # torch threads, 0 = torch default
+
+# Background transcription jobs
+TRANSCRIPTION_JOB_WORKERS = int(os.getenv('TRANSCRIPTION_JOB_WORKERS', '4'))
+TRANSCRIPTION_ASYNC_DEFAULT = os.getenv('TRANSCRIPTION_ASYNC_DEFAULT', 'true').lower() in ('1', 'true', 'yes')
+# Seconds without a heartbeat after which a pending/processing job is taken to have lost its process
+# (restart, crash) and is queued again; 0 = never recover
+TRANSCRIPTION_JOB_STALE_AFTER = int(os.getenv('TRANSCRIPTION_JOB_STALE_AFTER', '300'))
+# Runs (first one plus recoveries) after which an interrupted job is failed instead of re-queued,
+# so audio that takes its process down doesn't do it forever
+TRANSCRIPTION_JOB_MAX_ATTEMPTS = int(os.getenv('TRANSCRIPTION_JOB_MAX_ATTEMPTS', '3'))
+
+# Gemini Files API polling: exponential backoff from POLL_INITIAL to POLL_MAX (seconds)
+GEMINI_POLL_INITIAL = float(os.getenv('GEMINI_POLL_INITIAL', '0.25'))
+GEMINI_POLL_MAX = float(os.getenv('GEMINI_POLL_MAX', '5.0'))
+GEMINI_PROCESSING_TIMEOUT = float(os.getenv('GEMINI_PROCESSING_TIMEOUT', '600'))
+# Ask Gemini for JSON segments (response_mime_type=application/json) instead of transcript lines
+GEMINI_JSON_OUTPUT = os.getenv('GEMINI_JSON_OUTPUT', 'false').lower() in ('1', 'true', 'yes')
+
+# Long recordings are split into overlapping windows and transcribed in parallel
+TRANSCRIPTION_CHUNK_THRESHOLD = float(os.getenv('TRANSCRIPTION_CHUNK_THRESHOLD', '600'))  # seconds, 0 = never chunk
+TRANSCRIPTION_CHUNK_SECONDS = float(os.getenv('TRANSCRIPTION_CHUNK_SECONDS', '300'))
+TRANSCRIPTION_CHUNK_OVERLAP = float(os.getenv('TRANSCRIPTION_CHUNK_OVERLAP', '15'))
+TRANSCRIPTION_CHUNK_WORKERS = int(os.getenv('TRANSCRIPTION_CHUNK_WORKERS', '4'))
+# Uploads whose headers report a longer recording are rejected before transcription
+TRANSCRIPTION_MAX_DURATION = float(os.getenv('TRANSCRIPTION_MAX_DURATION', '0'))  # seconds, 0 = no limit
+
+# Content-hash cache for transcription results (re-uploads of identical audio)
+TRANSCRIPTION_CACHE_ENABLED = os.getenv('TRANSCRIPTION_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+TRANSCRIPTION_CACHE_TTL = int(os.getenv('TRANSCRIPTION_CACHE_TTL', str(30 * 24 * 3600)))  # seconds, 0 = never expire
+TRANSCRIPTION_CACHE_MAX_ENTRIES = int(os.getenv('TRANSCRIPTION_CACHE_MAX_ENTRIES', '10000'))  # 0 = unbounded
+TRANSCRIPTION_CACHE_MAX_BYTES = int(os.getenv('TRANSCRIPTION_CACHE_MAX_BYTES', str(5 * 1024 ** 3)))  # audio bytes, 0 = unbounded
+
+# Title suggestion cache: in-process LRU in front of a shared Django cache alias
+TITLE_CACHE_ENABLED = os.getenv('TITLE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+TITLE_CACHE_ALIAS = os.getenv('TITLE_CACHE_ALIAS', 'default')
+TITLE_CACHE_MAX_ENTRIES = int(os.getenv('TITLE_CACHE_MAX_ENTRIES', '1024'))
+TITLE_CACHE_TTL = int(os.getenv('TITLE_CACHE_TTL', str(24 * 3600)))  # seconds, 0 = no expiry
+
+# Title generation input. Posts longer than TITLE_PROMPT_MAX_CHARS are condensed locally before the
+# Groq call: 'summarize' keeps their key sentences (services/extractive_summary.py), 'truncate' cuts them off
+TITLE_MAX_CONTENT_LENGTH = int(os.getenv('TITLE_MAX_CONTENT_LENGTH', '100000'))  # characters accepted by the API
+TITLE_PROMPT_MAX_CHARS = int(os.getenv('TITLE_PROMPT_MAX_CHARS', '8000'))
+TITLE_LONG_CONTENT_MODE = os.getenv('TITLE_LONG_CONTENT_MODE', 'summarize')
+TITLE_SUMMARY_CHUNK_CHARS = int(os.getenv('TITLE_SUMMARY_CHUNK_CHARS', '4000'))  # map step chunk size
+
+# Batch title generation and Groq retry/backoff
+TITLE_BATCH_MAX_ITEMS = int(os.getenv('TITLE_BATCH_MAX_ITEMS', '100'))
+TITLE_BATCH_CONCURRENCY = int(os.getenv('TITLE_BATCH_CONCURRENCY', '4'))
+TITLE_BATCH_MAX_CONCURRENCY = int(os.getenv('TITLE_BATCH_MAX_CONCURRENCY', '16'))
+GROQ_MAX_RETRIES = int(os.getenv('GROQ_MAX_RETRIES', '4'))
+GROQ_BACKOFF_BASE = float(os.getenv('GROQ_BACKOFF_BASE', '1.0'))  # seconds
+GROQ_BACKOFF_MAX = float(os.getenv('GROQ_BACKOFF_MAX', '30.0'))  # seconds
+
+# Groq endpoint and async client; point GROQ_BASE_URL at `manage.py fake_upstream` for load tests
+GROQ_BASE_URL = os.getenv('GROQ_BASE_URL') or None
+GROQ_TIMEOUT = float(os.getenv('GROQ_TIMEOUT', '60'))  # seconds
+GROQ_MAX_CONNECTIONS = int(os.getenv('GROQ_MAX_CONNECTIONS', '256'))  # in-flight Groq calls per client
+GROQ_MAX_KEEPALIVE = int(os.getenv('GROQ_MAX_KEEPALIVE', '256'))  # idle connections kept open per client
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv('GROQ_KEEPALIVE_EXPIRY', '60'))  # seconds an idle connection is kept
+GROQ_CONNECT_TIMEOUT = float(os.getenv('GROQ_CONNECT_TIMEOUT', '10'))  # seconds
+GROQ_HTTP2 = os.getenv('GROQ_HTTP2', 'true').lower() in ('1', 'true', 'yes')  # used when the h2 package is installed
+
+# Upstream limits per provider (services/resilience.py). QPS and concurrency 0 = unlimited; callers
+# that can't get a slot within the queue timeout get a 503 with Retry-After
+GROQ_QPS = float(os.getenv('GROQ_QPS', '0'))
+GROQ_BURST = float(os.getenv('GROQ_BURST', '10'))
+GROQ_CONCURRENCY = int(os.getenv('GROQ_CONCURRENCY', '0'))
+GROQ_QUEUE_TIMEOUT = float(os.getenv('GROQ_QUEUE_TIMEOUT', '10'))  # seconds
+GEMINI_QPS = float(os.getenv('GEMINI_QPS', '0'))
+GEMINI_BURST = float(os.getenv('GEMINI_BURST', '5'))
+GEMINI_CONCURRENCY = int(os.getenv('GEMINI_CONCURRENCY', '0'))
+GEMINI_QUEUE_TIMEOUT = float(os.getenv('GEMINI_QUEUE_TIMEOUT', '600'))  # seconds; Gemini calls are long
+# Consecutive failed calls that open a provider's circuit (0 = never), and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '30'))  # seconds
+
+# Background health probes behind /api/health/ready/ (services/health_probes.py). The endpoints
+# only read the cached results; HEALTH_READY_PROBES are the ones that must pass for readiness
+HEALTH_PROBE_INTERVAL = float(os.getenv('HEALTH_PROBE_INTERVAL', '15'))  # seconds between probe rounds
+HEALTH_PROBE_TIMEOUT = float(os.getenv('HEALTH_PROBE_TIMEOUT', '5'))  # seconds per probe
+HEALTH_READY_PROBES = [name.strip() for name in os.getenv('HEALTH_READY_PROBES', 'database,storage').split(',') if name.strip()]
+HEALTH_MIN_FREE_MB = int(os.getenv('HEALTH_MIN_FREE_MB', '100'))  # storage probe fails below this
+# Start the prober when a server starts (DARWIX_SERVER/runserver only); otherwise on the first health request
+HEALTH_PROBE_ON_STARTUP = os.getenv('HEALTH_PROBE_ON_STARTUP', 'true').lower() in ('1', 'true', 'yes')
+
+# Set by darwix_ai/wsgi.py and asgi.py before Django starts. Startup work for servers (warmup, background
+# threads) runs only when it is set, or under runserver; manage.py commands, tests and scripts skip it
+DARWIX_SERVER = os.getenv('DARWIX_SERVER', '')
+
+# Services built at startup (AppConfig.ready) instead of on the first request. Off by default so
+# manage.py commands and idle workers start fast; servers can set e.g. groq_http,title,transcription
+SERVICE_WARMUP = [name.strip() for name in os.getenv('SERVICE_WARMUP', '').split(',') if name.strip()]
+
+# Threads that run blocking work (Gemini, file I/O, DB) behind the async endpoints
+ASYNC_BLOCKING_WORKERS = int(os.getenv('ASYNC_BLOCKING_WORKERS', '32'))
+
+# Live transcription over WebSocket (/ws/transcribe/, ASGI only; ai_features/streaming.py). Audio is
+# cut into windows at pauses in speech and each window is transcribed by TRANSCRIPTION_BACKEND
+STREAM_DEFAULT_SAMPLE_RATE = int(os.getenv('STREAM_DEFAULT_SAMPLE_RATE', '16000'))  # when the client doesn't say
+STREAM_VAD_THRESHOLD_DB = float(os.getenv('STREAM_VAD_THRESHOLD_DB', '-45'))  # dBFS; louder 20ms frames count as speech
+STREAM_SILENCE_MS = int(os.getenv('STREAM_SILENCE_MS', '600'))  # pause that closes a window
+STREAM_MAX_WINDOW_SECONDS = float(os.getenv('STREAM_MAX_WINDOW_SECONDS', '10'))  # windows are cut here even mid-speech
+STREAM_MIN_SPEECH_MS = int(os.getenv('STREAM_MIN_SPEECH_MS', '250'))  # windows with less speech are dropped
+STREAM_MAX_PENDING_WINDOWS = int(os.getenv('STREAM_MAX_PENDING_WINDOWS', '4'))  # per connection; reading pauses beyond this
+
+# List endpoints (cursor pagination)
+LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', '50'))
+LIST_MAX_PAGE_SIZE = int(os.getenv('LIST_MAX_PAGE_SIZE', '200'))
+
 # File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
+# Audio uploads are streamed straight into MEDIA_ROOT/audio/ by AudioStorageUploadHandler;
+# other uploads keep Django's default memory/temporary-file handling.
+FILE_UPLOAD_HANDLERS = [
+    'ai_features.upload_handlers.AudioStorageUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+STREAMING_UPLOAD_URL_NAMES = ['transcribe_audio', 'async_transcribe_audio']
+# Resumable uploads (/api/uploads/): chunks are appended straight to disk, so the size limit
+# doesn't depend on request memory
+RESUMABLE_UPLOAD_MAX_SIZE = int(os.getenv('RESUMABLE_UPLOAD_MAX_SIZE', str(500 * 1024 * 1024)))  # bytes
+RESUMABLE_UPLOAD_CHUNK_SIZE = int(os.getenv('RESUMABLE_UPLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))  # max bytes per PUT
+RESUMABLE_UPLOAD_TTL = int(os.getenv('RESUMABLE_UPLOAD_TTL', str(24 * 3600)))  # seconds an idle upload is kept, 0 = forever
+# Storage lifecycle (services/storage_manager.py): kept audio is stored once per content hash, and a
+# background sweep removes files nothing refers to (crashed requests, abandoned uploads)
+STORAGE_SWEEP_INTERVAL = int(os.getenv('STORAGE_SWEEP_INTERVAL', '0'))  # seconds between sweeps in server processes, 0 = off (run storage_gc instead)
+STORAGE_ORPHAN_GRACE = int(os.getenv('STORAGE_ORPHAN_GRACE', '3600'))  # seconds; younger unreferenced files may still be in use
+AUDIO_RETENTION_DAYS = int(os.getenv('AUDIO_RETENTION_DAYS', '0'))  # delete audio of older transcriptions (transcripts stay), 0 = keep
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(2.5 * 1024 * 1024)  # 2.5MB, larger non-audio uploads spill to disk
 DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
+
+# Latency metrics (/api/metrics/) and logging
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+METRICS_RESPONSE_TIMINGS = os.getenv('METRICS_RESPONSE_TIMINGS', 'false').lower() in ('1', 'true', 'yes')  # Server-Timing header
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()  # ai_features loggers; DEBUG adds per-request detail
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'ai_features': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
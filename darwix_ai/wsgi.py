@@ -2,5 +2,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'darwix_ai.settings')
+# Marks this process as a server, so AppConfig.ready runs the server-only startup work
+os.environ.setdefault('DARWIX_SERVER', 'wsgi')
 
 application = get_wsgi_application()